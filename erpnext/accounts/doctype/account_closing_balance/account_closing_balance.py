@@ -37,10 +37,12 @@ class AccountClosingBalance(Document):
 	pass
 
 
-def make_closing_entries(closing_entries, voucher_name, company, closing_date):
+def make_closing_entries(closing_entries, voucher_name, company, closing_date, accounts=None):
 	accounting_dimensions = get_accounting_dimensions()
 
-	previous_closing_entries = get_previous_closing_entries(company, closing_date, accounting_dimensions)
+	previous_closing_entries = get_previous_closing_entries(
+		company, closing_date, accounting_dimensions, accounts=accounts
+	)
 	combined_entries = closing_entries + previous_closing_entries
 
 	merged_entries = aggregate_with_last_account_closing_balance(combined_entries, accounting_dimensions)
@@ -109,7 +111,7 @@ def generate_key(entry, accounting_dimensions):
 	return tuple(key), key_values
 
 
-def get_previous_closing_entries(company, closing_date, accounting_dimensions):
+def get_previous_closing_entries(company, closing_date, accounting_dimensions, accounts=None):
 	entries = []
 	last_period_closing_voucher = frappe.db.get_all(
 		"Period Closing Voucher",
@@ -141,6 +143,9 @@ def get_previous_closing_entries(company, closing_date, accounting_dimensions):
 		query = query.where(
 			account_closing_balance.period_closing_voucher == last_period_closing_voucher[0].name
 		)
+		if accounts:
+			query = query.where(account_closing_balance.account.isin(accounts))
+
 		entries = query.run(as_dict=1)
 
 	return entries
@@ -0,0 +1,237 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import datetime
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, cstr, flt, get_first_day, now, rounded
+from frappe.utils.background_jobs import is_job_enqueued
+
+REBUILD_JOB_ID = "rebuild_account_period_balances"
+BALANCE_FIELDS = ("debit", "credit", "debit_in_account_currency", "credit_in_account_currency")
+
+
+class AccountPeriodBalance(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		account: DF.Link | None
+		company: DF.Link | None
+		cost_center: DF.Link | None
+		credit: DF.Currency
+		credit_in_account_currency: DF.Currency
+		debit: DF.Currency
+		debit_in_account_currency: DF.Currency
+		party: DF.DynamicLink | None
+		party_type: DF.Link | None
+		period_start_date: DF.Date | None
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Account Period Balance", ["company", "account", "period_start_date"])
+	frappe.db.add_index("Account Period Balance", ["party_type", "party"])
+
+
+def is_account_period_balance_enabled() -> bool:
+	return bool(
+		frappe.db.get_single_value("Accounts Settings", "maintain_account_period_balances", cache=True)
+	)
+
+
+def can_use_account_period_balances() -> bool:
+	return is_account_period_balance_enabled() and not is_job_enqueued(REBUILD_JOB_ID)
+
+
+def enqueue_rebuild_account_period_balances():
+	frappe.enqueue(
+		"erpnext.accounts.doctype.account_period_balance.account_period_balance.rebuild_account_period_balances",
+		queue="long",
+		timeout=7200,
+		job_id=REBUILD_JOB_ID,
+		deduplicate=True,
+		enqueue_after_commit=True,
+		now=frappe.flags.in_test,
+	)
+
+
+def rebuild_account_period_balances():
+	"""Rebuild the balances of every company from its GL Entries, run when the store is enabled."""
+	if not is_account_period_balance_enabled():
+		return
+
+	for company in frappe.get_all("Company", pluck="name"):
+		rebuild_company_balances(company)
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+
+def rebuild_company_balances(company):
+	from erpnext.accounts.utils import get_currency_precision
+
+	precision = get_currency_precision()
+	frappe.db.delete("Account Period Balance", {"company": company})
+
+	balances = frappe.db.sql(
+		"""
+		select
+			account, party_type, party, cost_center,
+			extract(year from posting_date) as year, extract(month from posting_date) as month,
+			sum(round(debit, %(precision)s)) as debit,
+			sum(round(credit, %(precision)s)) as credit,
+			sum(round(debit_in_account_currency, %(precision)s)) as debit_in_account_currency,
+			sum(round(credit_in_account_currency, %(precision)s)) as credit_in_account_currency
+		from `tabGL Entry`
+		where company = %(company)s and is_cancelled = 0
+		group by account, party_type, party, cost_center, year, month
+		""",
+		{"company": company, "precision": precision},
+		as_dict=True,
+	)
+
+	insert_balance_rows(
+		[
+			(
+				company,
+				d.account,
+				d.party_type,
+				d.party,
+				d.cost_center,
+				datetime.date(cint(d.year), cint(d.month), 1),
+				*(d[fieldname] for fieldname in BALANCE_FIELDS),
+			)
+			for d in balances
+		]
+	)
+
+
+def insert_balance_rows(rows):
+	if not rows:
+		return
+
+	timestamp = now()
+	user = frappe.session.user
+
+	frappe.db.bulk_insert(
+		"Account Period Balance",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"company",
+			"account",
+			"party_type",
+			"party",
+			"cost_center",
+			"period_start_date",
+			*BALANCE_FIELDS,
+		],
+		values=[(frappe.generate_hash(length=10), timestamp, timestamp, user, user, *row) for row in rows],
+	)
+
+
+def update_account_period_balances(gl_entries, cancel=False):
+	"""Add the active GL Entries to the balances of their periods, or remove them on `cancel`.
+
+	Every posting, cancellation and deletion of GL Entries passes through here, so the ledger version
+	of their companies is reset here too. Amounts are rounded per entry like `get_balance_on`, so both
+	give the same balance.
+	"""
+	from erpnext.accounts.utils import clear_ledger_version, get_currency_precision
+
+	if not gl_entries:
+		return
+
+	for company in {gle.get("company") for gle in gl_entries}:
+		clear_ledger_version(company)
+
+	if not is_account_period_balance_enabled():
+		return
+
+	precision = get_currency_precision()
+	sign = -1 if cancel else 1
+
+	balances = {}
+	for gle in gl_entries:
+		if gle.get("is_cancelled"):
+			continue
+
+		key = (
+			gle.get("company"),
+			gle.get("account"),
+			gle.get("party_type") or None,
+			gle.get("party") or None,
+			gle.get("cost_center") or None,
+			get_first_day(gle.get("posting_date")),
+		)
+
+		amounts = balances.setdefault(key, dict.fromkeys(BALANCE_FIELDS, 0.0))
+		for fieldname in BALANCE_FIELDS:
+			amounts[fieldname] += sign * rounded(
+				flt(gle.get(fieldname), 9), precision, rounding_method="Commercial Rounding"
+			)
+
+	# sorted to lock the balance rows in the same order across transactions
+	new_rows = []
+	for key in sorted(balances, key=lambda key: tuple(cstr(value) for value in key)):
+		name = get_balance_row(*key)
+		if name:
+			set_clause = ", ".join(
+				f"{fieldname} = {fieldname} + %({fieldname})s" for fieldname in BALANCE_FIELDS
+			)
+			frappe.db.sql(
+				f"update `tabAccount Period Balance` set {set_clause} where name = %(name)s",
+				{**balances[key], "name": name},
+			)
+		else:
+			new_rows.append((*key, *balances[key].values()))
+
+	insert_balance_rows(new_rows)
+
+
+def get_balance_row(company, account, party_type, party, cost_center, period_start_date):
+	balance = frappe.qb.DocType("Account Period Balance")
+	query = (
+		frappe.qb.from_(balance)
+		.select(balance.name)
+		.where(
+			(balance.company == company)
+			& (balance.account == account)
+			& (balance.period_start_date == period_start_date)
+		)
+		.limit(1)
+		.for_update()
+	)
+
+	for fieldname, value in (("party_type", party_type), ("party", party), ("cost_center", cost_center)):
+		query = query.where(balance[fieldname] == value if value else balance[fieldname].isnull())
+
+	name = query.run()
+	return name[0][0] if name else None
+
+
+def cancel_account_period_balances(voucher_type, voucher_no, conditions=None):
+	"""Remove the active GL Entries of the voucher from the balances, before they are cancelled or deleted."""
+	gle = frappe.qb.DocType("GL Entry")
+	query = (
+		frappe.qb.from_(gle)
+		.select(gle.company, gle.account, gle.party_type, gle.party, gle.cost_center, gle.posting_date)
+		.select(*BALANCE_FIELDS)
+		.where((gle.voucher_type == voucher_type) & (gle.voucher_no == voucher_no) & (gle.is_cancelled == 0))
+	)
+
+	if conditions is not None:
+		query = query.where(conditions)
+
+	update_account_period_balances(query.run(as_dict=True), cancel=True)
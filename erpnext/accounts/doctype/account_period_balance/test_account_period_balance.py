@@ -0,0 +1,43 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+from frappe.utils import add_months, flt, get_first_day, today
+
+from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.utils import get_balance_on
+
+
+class TestAccountPeriodBalance(FrappeTestCase):
+	@change_settings("Accounts Settings", {"maintain_account_period_balances": 1})
+	def test_balance_on_with_period_balances(self):
+		account = "_Test Bank - _TC"
+		previous_month = add_months(today(), -1)
+
+		backdated_je = make_journal_entry(
+			account, "_Test Cash - _TC", 100, posting_date=previous_month, submit=True
+		)
+		make_journal_entry(account, "_Test Cash - _TC", 50, submit=True)
+
+		self.assertTrue(
+			frappe.db.exists(
+				"Account Period Balance",
+				{"account": account, "period_start_date": get_first_day(previous_month)},
+			)
+		)
+		self.assertEqual(get_balance_on(account), get_gl_balance(account))
+		self.assertEqual(get_balance_on(account, previous_month), get_gl_balance(account, previous_month))
+
+		backdated_je.cancel()
+		self.assertEqual(get_balance_on(account), get_gl_balance(account))
+		self.assertEqual(get_balance_on(account, previous_month), get_gl_balance(account, previous_month))
+
+
+def get_gl_balance(account, date=None):
+	filters = {"account": account, "is_cancelled": 0}
+	if date:
+		filters["posting_date"] = ("<=", date)
+
+	balance = frappe.get_all("GL Entry", filters=filters, fields=["sum(debit) - sum(credit) as balance"])
+	return flt(balance[0].balance)
@@ -22,6 +22,10 @@ class AccountsSettings(Document):
 	if TYPE_CHECKING:
 		from frappe.types import DF
 
+		from erpnext.accounts.doctype.bulk_gl_posting_voucher_type.bulk_gl_posting_voucher_type import (
+			BulkGLPostingVoucherType,
+		)
+
 		acc_frozen_upto: DF.Date | None
 		add_taxes_from_item_tax_template: DF.Check
 		allow_multi_currency_invoices_against_single_party_account: DF.Check
@@ -33,6 +37,7 @@ class AccountsSettings(Document):
 		book_deferred_entries_based_on: DF.Literal["Days", "Months"]
 		book_deferred_entries_via_journal_entry: DF.Check
 		book_tax_discount_loss: DF.Check
+		bulk_gl_posting_voucher_types: DF.Table[BulkGLPostingVoucherType]
 		calculate_depr_using_total_days: DF.Check
 		check_supplier_invoice_uniqueness: DF.Check
 		create_pr_in_draft_status: DF.Check
@@ -46,7 +51,11 @@ class AccountsSettings(Document):
 		frozen_accounts_modifier: DF.Link | None
 		general_ledger_remarks_length: DF.Int
 		ignore_account_closing_balance: DF.Check
+		maintain_account_period_balances: DF.Check
+		maintain_payment_ledger_balances: DF.Check
 		make_payment_via_journal_entry: DF.Check
+		match_payments_by_reference_and_amount: DF.Check
+		max_lines_per_consolidated_invoice: DF.Int
 		merge_similar_account_heads: DF.Check
 		over_billing_allowance: DF.Currency
 		post_change_gl_entries: DF.Check
@@ -87,6 +96,9 @@ class AccountsSettings(Document):
 		if old_doc.acc_frozen_upto != self.acc_frozen_upto:
 			self.validate_pending_reposts()
 
+		self.validate_account_period_balances()
+		self.validate_payment_ledger_balances()
+
 		if clear_cache:
 			frappe.clear_cache()
 
@@ -111,6 +123,26 @@ class AccountsSettings(Document):
 				validate_fields_for_doctype=False,
 			)
 
+	def validate_account_period_balances(self):
+		if self.maintain_account_period_balances and self.has_value_changed(
+			"maintain_account_period_balances"
+		):
+			from erpnext.accounts.doctype.account_period_balance.account_period_balance import (
+				enqueue_rebuild_account_period_balances,
+			)
+
+			enqueue_rebuild_account_period_balances()
+
+	def validate_payment_ledger_balances(self):
+		if self.maintain_payment_ledger_balances and self.has_value_changed(
+			"maintain_payment_ledger_balances"
+		):
+			from erpnext.accounts.doctype.payment_ledger_balance.payment_ledger_balance import (
+				enqueue_rebuild_payment_ledger_balances,
+			)
+
+			enqueue_rebuild_payment_ledger_balances()
+
 	def validate_pending_reposts(self):
 		if self.acc_frozen_upto:
 			check_pending_reposting(self.acc_frozen_upto)
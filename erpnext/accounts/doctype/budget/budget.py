@@ -7,10 +7,14 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.utils import add_months, flt, fmt_money, get_last_day, getdate
 
+from erpnext.accounts.doctype.account_period_balance.account_period_balance import (
+	can_use_account_period_balances,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 )
 from erpnext.accounts.utils import get_fiscal_year
+from erpnext.utilities.regional import temporary_flag
 
 
 class BudgetError(frappe.ValidationError):
@@ -139,10 +143,52 @@ class Budget(Document):
 	def before_naming(self):
 		self.naming_series = f"{{{frappe.scrub(self.budget_against)}}}./.{self.fiscal_year}/.###"
 
+	def on_change(self):
+		clear_budget_cache()
+
+
+def get_budget_cache():
+	"""Budget records and monthly distributions read in this request, cleared when a Budget changes."""
+	if frappe.flags.budget_cache is None:
+		frappe.flags.budget_cache = {}
+
+	return frappe.flags.budget_cache
+
+
+def clear_budget_cache():
+	frappe.flags.budget_cache = None
+
+
+def validate_expenses_against_budget(args_list):
+	"""Validate the rows of a document against budget in one pass.
+
+	Expenses and commitments do not change while the rows are validated, so each aggregate is read
+	once per account and budget against, and the ordered and requested amounts of all the items of
+	the document with a single query.
+	"""
+	args_list = [frappe._dict(args) for args in args_list]
+	if not args_list or not has_budget():
+		return
+
+	item_codes = sorted({args.item_code for args in args_list if args.get("item_code")})
+	with temporary_flag("budget_expenses", frappe._dict({"item_codes": item_codes})):
+		for args in args_list:
+			validate_expense_against_budget(args)
+
+
+def has_budget(fiscal_year=None, company=None):
+	cache = get_budget_cache()
+	key = ("has_budget", fiscal_year, company)
+	if key not in cache:
+		filters = {"fiscal_year": fiscal_year, "company": company} if fiscal_year else {}
+		cache[key] = bool(frappe.get_all("Budget", filters=filters, limit=1))
+
+	return cache[key]
+
 
 def validate_expense_against_budget(args, expense_amount=0):
 	args = frappe._dict(args)
-	if not frappe.get_all("Budget", limit=1):
+	if not has_budget():
 		return
 
 	if args.get("company") and not args.fiscal_year:
@@ -151,7 +197,7 @@ def validate_expense_against_budget(args, expense_amount=0):
 			"Company", args.get("company"), "exception_budget_approver_role"
 		)
 
-	if not frappe.get_cached_value("Budget", {"fiscal_year": args.fiscal_year, "company": args.company}):  # nosec
+	if not has_budget(args.fiscal_year, args.company):
 		return
 
 	if not args.account:
@@ -184,43 +230,55 @@ def validate_expense_against_budget(args, expense_amount=0):
 		):
 			doctype = dimension.get("document_type")
 
-			if frappe.get_cached_value("DocType", doctype, "is_tree"):
-				lft, rgt = frappe.get_cached_value(doctype, args.get(budget_against), ["lft", "rgt"])
-				condition = f"""and exists(select name from `tab{doctype}`
-					where lft<={lft} and rgt>={rgt} and name=b.{budget_against})"""  # nosec
-				args.is_tree = True
-			else:
-				condition = f"and b.{budget_against}={frappe.db.escape(args.get(budget_against))}"
-				args.is_tree = False
-
+			args.is_tree = bool(frappe.get_cached_value("DocType", doctype, "is_tree"))
 			args.budget_against_field = budget_against
 			args.budget_against_doctype = doctype
 
-			budget_records = frappe.db.sql(
-				f"""
-				select
-					b.{budget_against} as budget_against, ba.budget_amount, b.monthly_distribution,
-					ifnull(b.applicable_on_material_request, 0) as for_material_request,
-					ifnull(applicable_on_purchase_order, 0) as for_purchase_order,
-					ifnull(applicable_on_booking_actual_expenses,0) as for_actual_expenses,
-					b.action_if_annual_budget_exceeded, b.action_if_accumulated_monthly_budget_exceeded,
-					b.action_if_annual_budget_exceeded_on_mr, b.action_if_accumulated_monthly_budget_exceeded_on_mr,
-					b.action_if_annual_budget_exceeded_on_po, b.action_if_accumulated_monthly_budget_exceeded_on_po
-				from
-					`tabBudget` b, `tabBudget Account` ba
-				where
-					b.name=ba.parent and b.fiscal_year=%s
-					and ba.account=%s and b.docstatus=1
-					{condition}
-			""",
-				(args.fiscal_year, args.account),
-				as_dict=True,
-			)  # nosec
-
+			budget_records = get_budget_records(args)
 			if budget_records:
 				validate_budget_records(args, budget_records, expense_amount)
 
 
+def get_budget_records(args):
+	budget_against = args.budget_against_field
+	key = ("budget_records", args.fiscal_year, args.account, budget_against, args.get(budget_against))
+
+	cache = get_budget_cache()
+	if key in cache:
+		return cache[key]
+
+	doctype = args.budget_against_doctype
+	if args.is_tree:
+		lft, rgt = frappe.get_cached_value(doctype, args.get(budget_against), ["lft", "rgt"])
+		condition = f"""and exists(select name from `tab{doctype}`
+			where lft<={lft} and rgt>={rgt} and name=b.{budget_against})"""  # nosec
+	else:
+		condition = f"and b.{budget_against}={frappe.db.escape(args.get(budget_against))}"
+
+	cache[key] = frappe.db.sql(
+		f"""
+		select
+			b.{budget_against} as budget_against, ba.budget_amount, b.monthly_distribution,
+			ifnull(b.applicable_on_material_request, 0) as for_material_request,
+			ifnull(applicable_on_purchase_order, 0) as for_purchase_order,
+			ifnull(applicable_on_booking_actual_expenses,0) as for_actual_expenses,
+			b.action_if_annual_budget_exceeded, b.action_if_accumulated_monthly_budget_exceeded,
+			b.action_if_annual_budget_exceeded_on_mr, b.action_if_accumulated_monthly_budget_exceeded_on_mr,
+			b.action_if_annual_budget_exceeded_on_po, b.action_if_accumulated_monthly_budget_exceeded_on_po
+		from
+			`tabBudget` b, `tabBudget Account` ba
+		where
+			b.name=ba.parent and b.fiscal_year=%s
+			and ba.account=%s and b.docstatus=1
+			{condition}
+	""",
+		(args.fiscal_year, args.account),
+		as_dict=True,
+	)  # nosec
+
+	return cache[key]
+
+
 def validate_budget_records(args, budget_records, expense_amount):
 	for budget in budget_records:
 		if flt(budget.budget_amount):
@@ -257,18 +315,23 @@ def validate_budget_records(args, budget_records, expense_amount):
 
 def compare_expense_with_budget(args, budget_amount, action_for, action, budget_against, amount=0):
 	args.actual_expense, args.requested_amount, args.ordered_amount = get_actual_expense(args), 0, 0
+	# requested and ordered amounts are only read when they count, or to be shown in the error
+	commitments_included = not amount
 	if not amount:
-		args.requested_amount, args.ordered_amount = get_requested_amount(args), get_ordered_amount(args)
-
 		if args.get("doctype") == "Material Request" and args.for_material_request:
+			args.requested_amount, args.ordered_amount = get_requested_amount(args), get_ordered_amount(args)
 			amount = args.requested_amount + args.ordered_amount
 
 		elif args.get("doctype") == "Purchase Order" and args.for_purchase_order:
+			args.ordered_amount = get_ordered_amount(args)
 			amount = args.ordered_amount
 
 	total_expense = args.actual_expense + amount
 
 	if total_expense > budget_amount:
+		if commitments_included:
+			args.requested_amount, args.ordered_amount = get_requested_amount(args), get_ordered_amount(args)
+
 		if args.actual_expense > budget_amount:
 			error_tense = _("is already")
 			diff = args.actual_expense - budget_amount
@@ -397,32 +460,50 @@ def get_requested_amount(args):
 	item_code = args.get("item_code")
 	condition = get_other_condition(args, "Material Request")
 
-	data = frappe.db.sql(
-		""" select ifnull((sum(child.stock_qty - child.ordered_qty) * rate), 0) as amount
-		from `tabMaterial Request Item` child, `tabMaterial Request` parent where parent.name = child.parent and
-		child.item_code = %s and parent.docstatus = 1 and child.stock_qty > child.ordered_qty and {} and
-		parent.material_request_type = 'Purchase' and parent.status != 'Stopped'""".format(condition),
-		item_code,
-		as_list=1,
-	)
+	def get_amounts(item_codes):
+		return frappe.db.sql(
+			""" select child.item_code, ifnull((sum(child.stock_qty - child.ordered_qty) * rate), 0) as amount
+			from `tabMaterial Request Item` child, `tabMaterial Request` parent where parent.name = child.parent and
+			child.item_code in %(item_codes)s and parent.docstatus = 1 and child.stock_qty > child.ordered_qty and {} and
+			parent.material_request_type = 'Purchase' and parent.status != 'Stopped'
+			group by child.item_code""".format(condition),
+			{"item_codes": item_codes},
+		)
 
-	return data[0][0] if data else 0
+	return get_item_amount("requested_amount", item_code, condition, get_amounts)
 
 
 def get_ordered_amount(args):
 	item_code = args.get("item_code")
 	condition = get_other_condition(args, "Purchase Order")
 
-	data = frappe.db.sql(
-		f""" select ifnull(sum(child.amount - child.billed_amt), 0) as amount
-		from `tabPurchase Order Item` child, `tabPurchase Order` parent where
-		parent.name = child.parent and child.item_code = %s and parent.docstatus = 1 and child.amount > child.billed_amt
-		and parent.status != 'Closed' and {condition}""",
-		item_code,
-		as_list=1,
-	)
+	def get_amounts(item_codes):
+		return frappe.db.sql(
+			f""" select child.item_code, ifnull(sum(child.amount - child.billed_amt), 0) as amount
+			from `tabPurchase Order Item` child, `tabPurchase Order` parent where
+			parent.name = child.parent and child.item_code in %(item_codes)s and parent.docstatus = 1
+			and child.amount > child.billed_amt and parent.status != 'Closed' and {condition}
+			group by child.item_code""",
+			{"item_codes": item_codes},
+		)
 
-	return data[0][0] if data else 0
+	return get_item_amount("ordered_amount", item_code, condition, get_amounts)
+
+
+def get_item_amount(amount_type, item_code, condition, get_amounts):
+	"""Amount of the item, read for all the items of the document when validating it in one pass."""
+	expenses = frappe.flags.budget_expenses
+	if not expenses:
+		return dict(get_amounts([item_code])).get(item_code, 0) if item_code else 0
+
+	key = (amount_type, condition, item_code)
+	if key not in expenses:
+		item_codes = expenses.item_codes if item_code in expenses.item_codes else [item_code]
+		amounts = dict(get_amounts(item_codes)) if item_code else {}
+		for d in item_codes:
+			expenses[(amount_type, condition, d)] = amounts.get(d, 0)
+
+	return expenses[key]
 
 
 def get_other_condition(args, for_doc):
@@ -448,6 +529,86 @@ def get_actual_expense(args):
 	if not args.budget_against_doctype:
 		args.budget_against_doctype = frappe.unscrub(args.budget_against_field)
 
+	budget_against_field = args.get("budget_against_field")
+	key = (
+		"actual_expense",
+		args.company,
+		args.fiscal_year,
+		args.account,
+		budget_against_field,
+		args.get(budget_against_field),
+		args.get("month_end_date"),
+	)
+
+	expenses = frappe.flags.budget_expenses
+	if expenses and key in expenses:
+		return expenses[key]
+
+	if budget_against_field == "cost_center" and can_use_period_balances_for_expense(args.fiscal_year):
+		amount = get_actual_expense_from_period_balances(args)
+	else:
+		amount = get_actual_expense_from_gl_entries(args)
+
+	if expenses:
+		expenses[key] = amount
+
+	return amount
+
+
+def can_use_period_balances_for_expense(fiscal_year):
+	"""Account Period Balances are monthly, so they can only be used for fiscal years of whole months."""
+	if not can_use_account_period_balances():
+		return False
+
+	year_start_date, year_end_date = frappe.get_cached_value(
+		"Fiscal Year", fiscal_year, ["year_start_date", "year_end_date"]
+	)
+	return getdate(year_start_date).day == 1 and getdate(year_end_date) == getdate(
+		get_last_day(year_end_date)
+	)
+
+
+def get_actual_expense_from_period_balances(args):
+	year_start_date, year_end_date = frappe.get_cached_value(
+		"Fiscal Year", args.fiscal_year, ["year_start_date", "year_end_date"]
+	)
+	to_date = (
+		min(getdate(args.month_end_date), getdate(year_end_date)) if args.month_end_date else year_end_date
+	)
+
+	if args.is_tree:
+		lft, rgt = frappe.get_cached_value("Cost Center", args.cost_center, ["lft", "rgt"])
+		condition = """and exists(select name from `tabCost Center`
+			where lft>=%(lft)s and rgt<=%(rgt)s and name=apb.cost_center)"""
+	else:
+		lft = rgt = None
+		condition = "and apb.cost_center = %(cost_center)s"
+
+	return flt(
+		frappe.db.sql(
+			f"""
+		select sum(apb.debit) - sum(apb.credit)
+		from `tabAccount Period Balance` apb
+		where
+			apb.account = %(account)s
+			and apb.company = %(company)s
+			and apb.period_start_date between %(from_date)s and %(to_date)s
+			{condition}
+	""",
+			{
+				"account": args.account,
+				"company": args.company,
+				"cost_center": args.cost_center,
+				"from_date": year_start_date,
+				"to_date": to_date,
+				"lft": lft,
+				"rgt": rgt,
+			},
+		)[0][0]
+	)  # nosec
+
+
+def get_actual_expense_from_gl_entries(args):
 	budget_against_field = args.get("budget_against_field")
 	condition1 = " and gle.posting_date <= %(month_end_date)s" if args.get("month_end_date") else ""
 
@@ -488,16 +649,7 @@ def get_actual_expense(args):
 
 
 def get_accumulated_monthly_budget(monthly_distribution, posting_date, fiscal_year, annual_budget):
-	distribution = {}
-	if monthly_distribution:
-		for d in frappe.db.sql(
-			"""select mdp.month, mdp.percentage_allocation
-			from `tabMonthly Distribution Percentage` mdp, `tabMonthly Distribution` md
-			where mdp.parent=md.name and md.fiscal_year=%s""",
-			fiscal_year,
-			as_dict=1,
-		):
-			distribution.setdefault(d.month, d.percentage_allocation)
+	distribution = get_monthly_distribution(fiscal_year) if monthly_distribution else {}
 
 	dt = frappe.get_cached_value("Fiscal Year", fiscal_year, "year_start_date")
 	accumulated_percentage = 0.0
@@ -513,6 +665,25 @@ def get_accumulated_monthly_budget(monthly_distribution, posting_date, fiscal_ye
 	return annual_budget * accumulated_percentage / 100
 
 
+def get_monthly_distribution(fiscal_year):
+	cache = get_budget_cache()
+	key = ("monthly_distribution", fiscal_year)
+	if key not in cache:
+		distribution = {}
+		for d in frappe.db.sql(
+			"""select mdp.month, mdp.percentage_allocation
+			from `tabMonthly Distribution Percentage` mdp, `tabMonthly Distribution` md
+			where mdp.parent=md.name and md.fiscal_year=%s""",
+			fiscal_year,
+			as_dict=1,
+		):
+			distribution.setdefault(d.month, d.percentage_allocation)
+
+		cache[key] = distribution
+
+	return cache[key]
+
+
 def get_item_details(args):
 	cost_center, expense_account = None, None
 
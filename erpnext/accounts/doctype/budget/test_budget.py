@@ -4,12 +4,24 @@
 import unittest
 
 import frappe
+from frappe.tests.utils import change_settings
 from frappe.utils import now_datetime, nowdate
 
-from erpnext.accounts.doctype.budget.budget import BudgetError, get_actual_expense
+from erpnext.accounts.doctype.account_period_balance.account_period_balance import (
+	rebuild_account_period_balances,
+)
+from erpnext.accounts.doctype.budget.budget import (
+	BudgetError,
+	get_actual_expense,
+	get_actual_expense_from_gl_entries,
+	get_ordered_amount,
+	get_other_condition,
+	get_requested_amount,
+)
 from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
 from erpnext.accounts.utils import get_fiscal_year
 from erpnext.buying.doctype.purchase_order.test_purchase_order import create_purchase_order
+from erpnext.utilities.regional import temporary_flag
 
 test_dependencies = ["Monthly Distribution"]
 
@@ -56,6 +68,120 @@ class TestBudget(unittest.TestCase):
 		budget.load_from_db()
 		budget.cancel()
 
+	@change_settings("Accounts Settings", {"maintain_account_period_balances": 1})
+	def test_monthly_budget_crossed_stop_with_period_balances(self):
+		rebuild_account_period_balances()
+		set_total_expense_zero(nowdate(), "cost_center")
+
+		budget = make_budget(budget_against="Cost Center")
+
+		jv = make_journal_entry(
+			"_Test Account Cost for Goods Sold - _TC",
+			"_Test Bank - _TC",
+			1000,
+			"_Test Cost Center - _TC",
+			posting_date=nowdate(),
+			submit=True,
+		)
+
+		args = frappe._dict(
+			{
+				"account": "_Test Account Cost for Goods Sold - _TC",
+				"cost_center": "_Test Cost Center - _TC",
+				"company": "_Test Company",
+				"fiscal_year": get_fiscal_year(nowdate())[0],
+				"budget_against_field": "cost_center",
+			}
+		)
+		self.assertEqual(get_actual_expense(args), get_actual_expense_from_gl_entries(args))
+
+		frappe.db.set_value("Budget", budget.name, "action_if_accumulated_monthly_budget_exceeded", "Stop")
+
+		# only crosses the budget with the expense of the voucher being submitted
+		jv2 = make_journal_entry(
+			"_Test Account Cost for Goods Sold - _TC",
+			"_Test Bank - _TC",
+			40000,
+			"_Test Cost Center - _TC",
+			posting_date=nowdate(),
+		)
+
+		self.assertRaises(BudgetError, jv2.submit)
+
+		budget.load_from_db()
+		budget.cancel()
+		jv.cancel()
+
+	def test_committed_amounts_read_for_all_items(self):
+		item_codes = ["_Test Item", "_Test Item 2"]
+		fiscal_year = get_fiscal_year(nowdate())[0]
+
+		mr = frappe.get_doc(
+			{
+				"doctype": "Material Request",
+				"material_request_type": "Purchase",
+				"transaction_date": nowdate(),
+				"company": "_Test Company",
+				"items": [
+					{
+						"item_code": item_code,
+						"qty": 1,
+						"uom": "_Test UOM",
+						"warehouse": "_Test Warehouse - _TC",
+						"schedule_date": nowdate(),
+						"rate": 100,
+						"expense_account": "_Test Account Cost for Goods Sold - _TC",
+						"cost_center": "_Test Cost Center - _TC",
+					}
+					for item_code in item_codes
+				],
+			}
+		)
+		mr.set_missing_values()
+		mr.submit()
+
+		purchase_orders = []
+		for item_code in item_codes:
+			po = create_purchase_order(item_code=item_code, transaction_date=nowdate(), do_not_save=True)
+			po.items[0].expense_account = "_Test Account Cost for Goods Sold - _TC"
+			po.insert()
+			po.submit()
+			purchase_orders.append(po)
+
+		args = frappe._dict(
+			{
+				"expense_account": "_Test Account Cost for Goods Sold - _TC",
+				"cost_center": "_Test Cost Center - _TC",
+				"fiscal_year": fiscal_year,
+				"budget_against_field": "cost_center",
+			}
+		)
+
+		for amount_type, for_doc, get_amount in (
+			("requested_amount", "Material Request", get_requested_amount),
+			("ordered_amount", "Purchase Order", get_ordered_amount),
+		):
+			expected = {
+				item_code: get_amount(frappe._dict(args, item_code=item_code)) for item_code in item_codes
+			}
+			self.assertTrue(all(expected.values()))
+
+			with temporary_flag("budget_expenses", frappe._dict({"item_codes": item_codes})):
+				self.assertEqual(
+					get_amount(frappe._dict(args, item_code=item_codes[0])), expected[item_codes[0]]
+				)
+
+				# the amount of the other item of the document is read with the first one
+				condition = get_other_condition(args, for_doc)
+				self.assertEqual(
+					frappe.flags.budget_expenses.get((amount_type, condition, item_codes[1])),
+					expected[item_codes[1]],
+				)
+
+		for po in purchase_orders:
+			po.cancel()
+		mr.cancel()
+
 	def test_exception_approver_role(self):
 		set_total_expense_zero(nowdate(), "cost_center")
 
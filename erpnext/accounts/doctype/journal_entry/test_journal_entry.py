@@ -410,6 +410,49 @@ class TestJournalEntry(unittest.TestCase):
 		account_balance = get_balance_on(account="_Test Bank - _TC", cost_center=cost_center)
 		self.assertEqual(expected_account_balance, account_balance)
 
+	def test_bulk_gl_posting(self):
+		from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+
+		settings = frappe.get_doc("Accounts Settings")
+		settings.append("bulk_gl_posting_voucher_types", {"document_type": "Journal Entry"})
+		settings.save()
+		self.addCleanup(self.reset_bulk_gl_posting_voucher_types)
+
+		si = create_sales_invoice(rate=300)
+		jv = make_journal_entry("_Test Bank - _TC", "Debtors - _TC", 100, save=False)
+		jv.multi_currency = 0
+		jv.accounts[1].party_type = "Customer"
+		jv.accounts[1].party = si.customer
+		jv.accounts[1].reference_type = "Sales Invoice"
+		jv.accounts[1].reference_name = si.name
+		jv.submit()
+
+		gl_entries = frappe.get_all(
+			"GL Entry",
+			filters={"voucher_type": "Journal Entry", "voucher_no": jv.name, "is_cancelled": 0},
+			fields=["account", "debit", "credit", "docstatus"],
+			order_by="account",
+		)
+		self.assertEqual(
+			[(d.account, d.debit, d.credit, d.docstatus) for d in gl_entries],
+			[("Debtors - _TC", 0, 100, 1), ("_Test Bank - _TC", 100, 0, 1)],
+		)
+		self.assertTrue(
+			frappe.db.exists("Payment Ledger Entry", {"voucher_no": jv.name, "against_voucher_no": si.name})
+		)
+
+		si.reload()
+		self.assertEqual(si.outstanding_amount, 200)
+
+		jv.cancel()
+		si.reload()
+		self.assertEqual(si.outstanding_amount, 300)
+
+	def reset_bulk_gl_posting_voucher_types(self):
+		settings = frappe.get_doc("Accounts Settings")
+		settings.set("bulk_gl_posting_voucher_types", [])
+		settings.save()
+
 	def test_repost_accounting_entries(self):
 		from erpnext.accounts.doctype.cost_center.test_cost_center import create_cost_center
 
@@ -56,6 +56,11 @@ class MonthlyDistribution(Document):
 		if flt(total, 2) != 100.0:
 			frappe.throw(_("Percentage Allocation should be equal to 100%") + f" ({flt(total, 2)!s}%)")
 
+	def on_change(self):
+		from erpnext.accounts.doctype.budget.budget import clear_budget_cache
+
+		clear_budget_cache()
+
 
 def get_periodwise_distribution_data(distribution_id, period_list, periodicity):
 	doc = frappe.get_doc("Monthly Distribution", distribution_id)
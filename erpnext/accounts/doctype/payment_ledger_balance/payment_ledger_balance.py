@@ -0,0 +1,179 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Sum
+from frappe.utils import now
+from frappe.utils.background_jobs import is_job_enqueued
+
+REBUILD_JOB_ID = "rebuild_payment_ledger_balances"
+
+
+class PaymentLedgerBalance(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		account: DF.Link | None
+		account_type: DF.Literal["Receivable", "Payable"]
+		company: DF.Link | None
+		outstanding: DF.Currency
+		outstanding_in_account_currency: DF.Currency
+		party: DF.DynamicLink | None
+		party_type: DF.Link | None
+		voucher_no: DF.DynamicLink | None
+		voucher_type: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Payment Ledger Balance", ["company", "account"])
+	# the account implies the company, kept short to fit the index key length
+	frappe.db.add_unique(
+		"Payment Ledger Balance",
+		["voucher_no", "voucher_type", "account", "party"],
+		constraint_name="unique_voucher_account_party",
+	)
+	frappe.db.add_index("Payment Ledger Balance", ["party_type", "party"])
+
+
+def is_payment_ledger_balance_enabled() -> bool:
+	return bool(
+		frappe.db.get_single_value("Accounts Settings", "maintain_payment_ledger_balances", cache=True)
+	)
+
+
+def can_use_payment_ledger_balances() -> bool:
+	return is_payment_ledger_balance_enabled() and not is_job_enqueued(REBUILD_JOB_ID)
+
+
+def enqueue_rebuild_payment_ledger_balances():
+	frappe.enqueue(
+		"erpnext.accounts.doctype.payment_ledger_balance.payment_ledger_balance.rebuild_payment_ledger_balances",
+		queue="long",
+		timeout=7200,
+		job_id=REBUILD_JOB_ID,
+		deduplicate=True,
+		enqueue_after_commit=True,
+		now=frappe.flags.in_test,
+	)
+
+
+def rebuild_payment_ledger_balances():
+	"""Rebuild the open balances of every company from its Payment Ledger Entries."""
+	if not is_payment_ledger_balance_enabled():
+		return
+
+	for company in frappe.get_all("Company", pluck="name"):
+		frappe.db.delete("Payment Ledger Balance", {"company": company})
+
+		ple = frappe.qb.DocType("Payment Ledger Entry")
+		insert_balance_rows(get_open_balances(ple.company == company))
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+
+def get_open_balances(condition):
+	"""Outstanding of each voucher per account and party, for the vouchers which are not settled."""
+	ple = frappe.qb.DocType("Payment Ledger Entry")
+	query = (
+		frappe.qb.from_(ple)
+		.select(
+			ple.company,
+			ple.account,
+			ple.account_type,
+			ple.party_type,
+			ple.party,
+			ple.against_voucher_type,
+			ple.against_voucher_no,
+			Sum(ple.amount).as_("outstanding"),
+			Sum(ple.amount_in_account_currency).as_("outstanding_in_account_currency"),
+		)
+		.where((ple.delinked == 0) & condition)
+		.groupby(
+			ple.company,
+			ple.account,
+			ple.account_type,
+			ple.party_type,
+			ple.party,
+			ple.against_voucher_type,
+			ple.against_voucher_no,
+		)
+		.having((Sum(ple.amount) != 0) | (Sum(ple.amount_in_account_currency) != 0))
+	)
+
+	return query.run()
+
+
+def insert_balance_rows(rows):
+	if not rows:
+		return
+
+	timestamp = now()
+	user = frappe.session.user
+
+	frappe.db.bulk_insert(
+		"Payment Ledger Balance",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"company",
+			"account",
+			"account_type",
+			"party_type",
+			"party",
+			"voucher_type",
+			"voucher_no",
+			"outstanding",
+			"outstanding_in_account_currency",
+		],
+		values=[(frappe.generate_hash(length=10), timestamp, timestamp, user, user, *row) for row in rows],
+	)
+
+
+def update_payment_ledger_balances(vouchers):
+	"""Recompute the balances of the (voucher_type, voucher_no) from their Payment Ledger Entries.
+
+	Balances are recomputed rather than adjusted, so every path that creates, delinks or deletes
+	entries only has to pass the vouchers the entries are against.
+	"""
+	if not vouchers or not is_payment_ledger_balance_enabled():
+		return
+
+	voucher_types = sorted({voucher_type for voucher_type, _voucher_no in vouchers})
+	voucher_nos = sorted({voucher_no for _voucher_type, voucher_no in vouchers})
+
+	ple = frappe.qb.DocType("Payment Ledger Entry")
+	condition = ple.against_voucher_type.isin(voucher_types) & ple.against_voucher_no.isin(voucher_nos)
+
+	# lock the entries of the vouchers before replacing their balances, so that concurrent updates
+	# of the same vouchers run one after the other and read the entries committed by each other
+	frappe.qb.from_(ple).select(ple.name).where(condition).for_update().run()
+
+	frappe.db.delete(
+		"Payment Ledger Balance",
+		{"voucher_type": ("in", voucher_types), "voucher_no": ("in", voucher_nos)},
+	)
+	insert_balance_rows(get_open_balances(condition))
+
+
+def get_against_vouchers(voucher_type, voucher_no):
+	"""Vouchers the Payment Ledger Entries of the voucher are against, to update once they are deleted."""
+	ple = frappe.qb.DocType("Payment Ledger Entry")
+	return (
+		frappe.qb.from_(ple)
+		.select(ple.against_voucher_type, ple.against_voucher_no)
+		.distinct()
+		.where((ple.voucher_type == voucher_type) & (ple.voucher_no == voucher_no))
+	).run()
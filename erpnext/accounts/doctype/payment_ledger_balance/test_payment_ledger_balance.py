@@ -0,0 +1,47 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+
+from erpnext.accounts.doctype.payment_entry.payment_entry import get_payment_entry
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.accounts.utils import unlink_ref_doc_from_payment_entries
+
+
+class TestPaymentLedgerBalance(FrappeTestCase):
+	@change_settings("Accounts Settings", {"maintain_payment_ledger_balances": 1})
+	def test_balances_follow_payments(self):
+		si = create_sales_invoice(qty=1, rate=100)
+		self.assertEqual(get_outstanding(si.name), 100)
+
+		pe = get_payment_entry(si.doctype, si.name, party_amount=40, bank_account="_Test Cash - _TC")
+		pe.insert().submit()
+		self.assertEqual(get_outstanding(si.name), 60)
+		self.assertIsNone(get_outstanding(pe.name))
+
+		settling_pe = get_payment_entry(si.doctype, si.name, bank_account="_Test Cash - _TC")
+		settling_pe.insert().submit()
+		self.assertIsNone(get_outstanding(si.name))
+
+		settling_pe.cancel()
+		self.assertEqual(get_outstanding(si.name), 60)
+
+	@change_settings("Accounts Settings", {"maintain_payment_ledger_balances": 1})
+	def test_balances_after_reference_removal(self):
+		si = create_sales_invoice(qty=1, rate=100)
+		pe = get_payment_entry(si.doctype, si.name, bank_account="_Test Cash - _TC")
+		pe.insert().submit()
+		self.assertIsNone(get_outstanding(si.name))
+
+		# the payment becomes an unallocated advance and the invoice is open again
+		unlink_ref_doc_from_payment_entries(si)
+		self.assertEqual(get_outstanding(si.name), 100)
+		self.assertEqual(get_outstanding(pe.name), -100)
+
+
+def get_outstanding(voucher_no):
+	balances = frappe.get_all(
+		"Payment Ledger Balance", filters={"voucher_no": voucher_no}, pluck="outstanding"
+	)
+	return sum(balances) if balances else None
@@ -1,6 +1,7 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors
 # For license information, please see license.txt
 
+from collections import deque
 
 import frappe
 from frappe import _, msgprint, qb
@@ -424,37 +425,30 @@ class PaymentReconciliation(Document):
 			"Company", self.company, "exchange_gain_loss_account"
 		)
 
-		entries = []
-		for pay in args.get("payments"):
+		payments, invoices = args.get("payments"), args.get("invoices")
+		for pay in payments:
 			pay.update({"unreconciled_amount": pay.get("amount")})
-			for inv in args.get("invoices"):
-				if pay.get("amount") >= inv.get("outstanding_amount"):
-					res = self.get_allocated_entry(pay, inv, inv["outstanding_amount"])
-					pay["amount"] = flt(pay.get("amount")) - flt(inv.get("outstanding_amount"))
-					inv["outstanding_amount"] = 0
-				else:
-					res = self.get_allocated_entry(pay, inv, pay["amount"])
-					inv["outstanding_amount"] = flt(inv.get("outstanding_amount")) - flt(pay.get("amount"))
-					pay["amount"] = 0
-
-				inv["exchange_rate"] = invoice_exchange_map.get(inv.get("invoice_number"))
-				if pay.get("reference_type") in ["Sales Invoice", "Purchase Invoice"]:
-					pay["exchange_rate"] = invoice_exchange_map.get(pay.get("reference_name"))
-
-				res.difference_amount = self.get_difference_amount(pay, inv, res["allocated_amount"])
-				res.difference_account = default_exchange_gain_loss_account
-				res.exchange_rate = inv.get("exchange_rate")
-				res.update({"gain_loss_posting_date": pay.get("posting_date")})
-
-				if pay.get("amount") == 0:
-					entries.append(res)
-					break
-				elif inv.get("outstanding_amount") == 0:
-					entries.append(res)
-					continue
 
-			else:
-				break
+		payment_references, invoice_references = {}, {}
+		if frappe.db.get_single_value("Accounts Settings", "match_payments_by_reference_and_amount"):
+			payment_references, invoice_references = self.get_reference_numbers(payments, invoices)
+
+		entries = []
+		for pay, inv, allocated_amount, unadjusted_amount in match_payments_to_invoices(
+			payments, invoices, payment_references, invoice_references
+		):
+			res = self.get_allocated_entry(pay, inv, allocated_amount)
+			res.amount = unadjusted_amount
+
+			inv["exchange_rate"] = invoice_exchange_map.get(inv.get("invoice_number"))
+			if pay.get("reference_type") in ["Sales Invoice", "Purchase Invoice"]:
+				pay["exchange_rate"] = invoice_exchange_map.get(pay.get("reference_name"))
+
+			res.difference_amount = self.get_difference_amount(pay, inv, res["allocated_amount"])
+			res.difference_account = default_exchange_gain_loss_account
+			res.exchange_rate = inv.get("exchange_rate")
+			res.update({"gain_loss_posting_date": pay.get("posting_date")})
+			entries.append(res)
 
 		self.set("allocation", [])
 		for entry in entries:
@@ -462,6 +456,53 @@ class PaymentReconciliation(Document):
 				row = self.append("allocation", {})
 				row.update(entry)
 
+	def get_reference_numbers(self, payments, invoices):
+		"""Reference numbers of the payments by their index, and indexes of the invoices by their
+		number and the party's reference for them (Customer's Purchase Order or Supplier Invoice No)."""
+		reference_fields = {
+			"Payment Entry": "reference_no",
+			"Journal Entry": "cheque_no",
+		}
+		invoice_reference_fields = {
+			"Sales Invoice": "po_no",
+			"Purchase Invoice": "bill_no",
+			"Journal Entry": "bill_no",
+		}
+
+		references = {}
+		for doctype, fieldname in reference_fields.items():
+			names = {d.get("reference_name") for d in payments if d.get("reference_type") == doctype}
+			if names:
+				references[doctype] = frappe._dict(
+					frappe.get_all(
+						doctype, filters={"name": ("in", list(names))}, fields=["name", fieldname], as_list=1
+					)
+				)
+
+		payment_references = {}
+		for idx, pay in enumerate(payments):
+			reference_no = references.get(pay.get("reference_type"), {}).get(pay.get("reference_name"))
+			if reference_no and reference_no.strip():
+				payment_references[idx] = reference_no.strip().casefold()
+
+		invoice_references = {}
+		for doctype, fieldname in invoice_reference_fields.items():
+			names = {d.get("invoice_number") for d in invoices if d.get("invoice_type") == doctype}
+			if names:
+				references[doctype] = frappe._dict(
+					frappe.get_all(
+						doctype, filters={"name": ("in", list(names))}, fields=["name", fieldname], as_list=1
+					)
+				)
+
+		for idx, inv in enumerate(invoices):
+			party_reference = references.get(inv.get("invoice_type"), {}).get(inv.get("invoice_number"))
+			for reference_no in {inv.get("invoice_number"), party_reference}:
+				if reference_no and reference_no.strip():
+					invoice_references.setdefault(reference_no.strip().casefold(), []).append(idx)
+
+		return payment_references, invoice_references
+
 	def update_dimension_values_in_allocated_entries(self, res):
 		for x in self.dimensions:
 			dimension = x.fieldname
@@ -735,6 +776,87 @@ class PaymentReconciliation(Document):
 		return conditions
 
 
+def match_payments_to_invoices(payments, invoices, payment_references=None, invoice_references=None):
+	"""Allocate the payments to the invoices, first in first out.
+
+	Payments with a reference number are first allocated to the invoices in `invoice_references`
+	for it, then to an invoice with exactly the same outstanding. Invoices are looked up by
+	reference and amount, and settled invoices are not visited again, so matching is linear.
+
+	Returns (payment, invoice, allocated amount, payment amount before the allocation) in the
+	order of the payments and, for each payment, in the order it was allocated.
+	"""
+	allocations = []
+
+	def allocate(pay_idx, inv_idx):
+		pay, inv = payments[pay_idx], invoices[inv_idx]
+		unadjusted_amount = pay.get("amount")
+
+		if pay.get("amount") >= inv.get("outstanding_amount"):
+			allocated_amount = inv["outstanding_amount"]
+			pay["amount"] = flt(pay.get("amount")) - flt(inv.get("outstanding_amount"))
+			inv["outstanding_amount"] = 0
+		else:
+			allocated_amount = pay["amount"]
+			inv["outstanding_amount"] = flt(inv.get("outstanding_amount")) - flt(pay.get("amount"))
+			pay["amount"] = 0
+
+		allocations.append((pay_idx, inv_idx, allocated_amount, unadjusted_amount))
+
+	def is_open(inv_idx):
+		return invoices[inv_idx].get("outstanding_amount") > 0
+
+	if payment_references and invoice_references:
+		invoices_by_reference = {
+			reference_no: deque(indexes) for reference_no, indexes in invoice_references.items()
+		}
+		for pay_idx, reference_no in sorted(payment_references.items()):
+			queue = invoices_by_reference.get(reference_no)
+			while queue and payments[pay_idx].get("amount") > 0:
+				if is_open(queue[0]):
+					allocate(pay_idx, queue[0])
+				if not is_open(queue[0]):
+					queue.popleft()
+
+		invoices_by_amount = {}
+		for inv_idx, inv in enumerate(invoices):
+			if is_open(inv_idx):
+				invoices_by_amount.setdefault(inv.get("outstanding_amount"), deque()).append(inv_idx)
+
+		for pay_idx, pay in enumerate(payments):
+			queue = invoices_by_amount.get(pay.get("amount"))
+			while queue and invoices[queue[0]].get("outstanding_amount") != pay.get("amount"):
+				queue.popleft()
+
+			if queue:
+				allocate(pay_idx, queue.popleft())
+
+	inv_idx = 0
+	for pay_idx, pay in enumerate(payments):
+		if not pay.get("amount"):
+			continue
+
+		while inv_idx < len(invoices):
+			if invoices[inv_idx].get("outstanding_amount") == 0:
+				inv_idx += 1
+				continue
+
+			allocate(pay_idx, inv_idx)
+			if pay.get("amount") == 0:
+				break
+
+			inv_idx += 1
+		else:
+			break
+
+	# stable, so allocations of a payment stay in the order the payment was consumed
+	allocations.sort(key=lambda d: d[0])
+	return [
+		(payments[pay_idx], invoices[inv_idx], allocated_amount, unadjusted_amount)
+		for pay_idx, inv_idx, allocated_amount, unadjusted_amount in allocations
+	]
+
+
 def reconcile_dr_cr_note(dr_cr_notes, company, active_dimensions=None):
 	for inv in dr_cr_notes:
 		voucher_type = "Credit Note" if inv.voucher_type == "Sales Invoice" else "Debit Note"
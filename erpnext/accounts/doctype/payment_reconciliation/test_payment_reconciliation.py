@@ -478,6 +478,39 @@ class TestPaymentReconciliation(FrappeTestCase):
 		self.assertEqual(len(pr.get("payments")), 0)
 		self.assertEqual(pr.get("invoices")[0].get("outstanding_amount"), 165)
 
+	@change_settings("Accounts Settings", {"match_payments_by_reference_and_amount": 1})
+	def test_allocation_by_reference_and_amount(self):
+		si1 = self.create_sales_invoice(qty=1, rate=100)
+		si2 = self.create_sales_invoice(qty=1, rate=200, do_not_submit=True)
+		si2.po_no = "PO-REF-1"
+		si2.save().submit()
+		si3 = self.create_sales_invoice(qty=1, rate=50)
+
+		pe1 = self.create_payment_entry(amount=200)
+		pe1.reference_no = "po-ref-1"
+		pe1.save().submit()
+		pe2 = self.create_payment_entry(amount=50).save().submit()
+		pe3 = self.create_payment_entry(amount=100).save().submit()
+
+		pr = self.create_payment_reconciliation()
+		pr.get_unreconciled_entries()
+		invoices = [x.as_dict() for x in pr.get("invoices")]
+		payments = [x.as_dict() for x in pr.get("payments")]
+		pr.allocate_entries(frappe._dict({"invoices": invoices, "payments": payments}))
+
+		allocations = {
+			(row.reference_name, row.invoice_number, row.allocated_amount) for row in pr.allocation
+		}
+		self.assertEqual(
+			allocations,
+			{(pe1.name, si2.name, 200), (pe2.name, si3.name, 50), (pe3.name, si1.name, 100)},
+		)
+
+		pr.reconcile()
+		for si in (si1, si2, si3):
+			si.reload()
+			self.assertEqual(si.outstanding_amount, 0)
+
 	def test_payment_against_journal(self):
 		transaction_date = nowdate()
 
@@ -2,6 +2,8 @@
 # License: GNU General Public License v3. See license.txt
 
 
+import json
+
 import frappe
 from frappe import _
 from frappe.query_builder.functions import Sum
@@ -13,6 +15,9 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 from erpnext.accounts.utils import get_account_currency, get_fiscal_year, validate_fiscal_year
 from erpnext.controllers.accounts_controller import AccountsController
 
+# ledger accounts closed by each background job
+ACCOUNTS_PER_CHUNK = 500
+
 
 class PeriodClosingVoucher(AccountsController):
 	# begin: auto-generated types
@@ -23,9 +28,11 @@ class PeriodClosingVoucher(AccountsController):
 	if TYPE_CHECKING:
 		from frappe.types import DF
 
+		account_ranges: DF.LongText | None
 		amended_from: DF.Link | None
 		closing_account_head: DF.Link
 		company: DF.Link
+		completed_account_ranges: DF.LongText | None
 		error_message: DF.Text | None
 		fiscal_year: DF.Link
 		gle_processing_status: DF.Literal["In Progress", "Completed", "Failed"]
@@ -41,14 +48,7 @@ class PeriodClosingVoucher(AccountsController):
 
 	def on_submit(self):
 		self.db_set("gle_processing_status", "In Progress")
-		get_opening_entries = False
-
-		if not frappe.db.exists(
-			"Period Closing Voucher", {"company": self.company, "docstatus": 1, "name": ("!=", self.name)}
-		):
-			get_opening_entries = True
-
-		self.make_gl_entries(get_opening_entries=get_opening_entries)
+		self.make_gl_entries(get_opening_entries=self.is_first_closing())
 
 	def on_cancel(self):
 		self.validate_future_closing_vouchers()
@@ -162,56 +162,209 @@ class PeriodClosingVoucher(AccountsController):
 			frappe.throw(_("Previous Year is not closed, please close it first"))
 
 	def make_gl_entries(self, get_opening_entries=False):
-		gl_entries = self.get_gl_entries()
-		closing_entries = self.get_grouped_gl_entries(get_opening_entries=get_opening_entries)
-		if len(gl_entries + closing_entries) > 3000:
+		"""Close the accounts in ranges, each posted in its own job and merged once all are done.
+
+		The ranges are saved on the voucher at the first run, so a resumed closing gets the same ranges
+		even if accounts were changed since, and the chunks which completed before a failure are skipped.
+		A single range is closed in the current transaction.
+		"""
+		chunks = self.get_account_chunks()
+		if not self.account_ranges:
+			self.db_set("account_ranges", json.dumps(chunks), update_modified=False)
+
+		pending_chunks = self.get_pending_chunks(chunks)
+		if not pending_chunks:
+			process_closing_account_entries(self.name, get_opening_entries, in_background=False)
+			return
+
+		if len(chunks) == 1:
+			process_closing_chunk(self.name, chunks[0], get_opening_entries, in_background=False)
+			return
+
+		frappe.msgprint(
+			_("The GL Entries will be processed in the background, it can take a few minutes."),
+			alert=True,
+		)
+
+		for accounts in pending_chunks:
 			frappe.enqueue(
-				process_gl_entries,
-				gl_entries=gl_entries,
-				voucher_name=self.name,
+				process_closing_chunk,
+				queue="long",
 				timeout=3000,
+				job_id=f"period_closing_voucher::{self.name}::{get_chunk_key(accounts)}",
+				deduplicate=True,
+				enqueue_after_commit=True,
+				now=frappe.flags.in_test,
+				voucher_name=self.name,
+				accounts=accounts,
+				get_opening_entries=get_opening_entries,
 			)
 
-			frappe.enqueue(
-				process_closing_entries,
-				gl_entries=gl_entries,
-				closing_entries=closing_entries,
-				voucher_name=self.name,
-				company=self.company,
-				closing_date=self.posting_date,
-				timeout=3000,
+	@frappe.whitelist()
+	def resume_gl_processing(self):
+		"""Retry the chunks of a failed closing, the ones already posted are not processed again."""
+		if self.docstatus != 1 or self.gle_processing_status != "Failed":
+			frappe.throw(_("Only the failed Period Closing Vouchers can be resumed"))
+
+		self.db_set({"gle_processing_status": "In Progress", "error_message": None})
+		self.make_gl_entries(get_opening_entries=self.is_first_closing())
+
+	def is_first_closing(self):
+		return not frappe.db.exists(
+			"Period Closing Voucher", {"company": self.company, "docstatus": 1, "name": ("!=", self.name)}
+		)
+
+	def get_pending_chunks(self, chunks=None):
+		completed_chunks = get_completed_chunks(self.name)
+		return [
+			accounts
+			for accounts in (chunks or self.get_account_chunks())
+			if get_chunk_key(accounts) not in completed_chunks
+		]
+
+	def get_account_chunks(self):
+		"""Ledger accounts of the company in tree order, split into ranges of ACCOUNTS_PER_CHUNK.
+
+		The closing account is left out, it gets entries from every chunk and is closed in the merge.
+		Returns the ranges saved on the voucher once the closing has started.
+		"""
+		if self.account_ranges:
+			return json.loads(self.account_ranges)
+
+		accounts = frappe.get_all(
+			"Account",
+			filters={"company": self.company, "is_group": 0, "name": ("!=", self.closing_account_head)},
+			order_by="lft",
+			pluck="name",
+		)
+
+		return [
+			accounts[i : i + ACCOUNTS_PER_CHUNK] for i in range(0, len(accounts), ACCOUNTS_PER_CHUNK)
+		] or [[]]
+
+	def process_accounts(self, accounts, get_opening_entries=False):
+		"""Post the closing GL Entries and Account Closing Balances of one range of accounts.
+
+		The GL Entries of the range balance on their own against the closing account, so a range
+		which is already posted can be skipped, and its closing balances are replaced.
+		"""
+		from erpnext.accounts.doctype.account_closing_balance.account_closing_balance import (
+			make_closing_entries,
+		)
+		from erpnext.accounts.general_ledger import make_gl_entries
+
+		if not accounts:
+			return
+
+		gl_entries = self.get_gl_entries(accounts)
+		if gl_entries and not self.are_gl_entries_posted(accounts):
+			make_gl_entries(gl_entries, merge_entries=False)
+
+		frappe.db.delete(
+			"Account Closing Balance", {"period_closing_voucher": self.name, "account": ("in", accounts)}
+		)
+
+		closing_entries = [
+			entry
+			for entry in gl_entries + self.get_grouped_gl_entries(get_opening_entries, accounts)
+			if entry.account != self.closing_account_head
+		]
+		if closing_entries:
+			make_closing_entries(
+				closing_entries, self.name, self.company, self.posting_date, accounts=accounts
 			)
 
-			frappe.msgprint(
-				_("The GL Entries will be processed in the background, it can take a few minutes."),
-				alert=True,
+	def are_gl_entries_posted(self, accounts):
+		return frappe.db.exists(
+			"GL Entry",
+			{
+				"voucher_type": "Period Closing Voucher",
+				"voucher_no": self.name,
+				"account": ("in", accounts),
+				"is_cancelled": 0,
+			},
+		)
+
+	def process_closing_account(self, get_opening_entries=False):
+		"""Merge the closing account entries posted by every chunk into its closing balances."""
+		from erpnext.accounts.doctype.account_closing_balance.account_closing_balance import (
+			make_closing_entries,
+		)
+
+		accounts = [self.closing_account_head]
+		frappe.db.delete(
+			"Account Closing Balance", {"period_closing_voucher": self.name, "account": ("in", accounts)}
+		)
+
+		closing_entries = self.get_posted_closing_account_entries() + self.get_grouped_gl_entries(
+			get_opening_entries, accounts
+		)
+		if closing_entries:
+			make_closing_entries(
+				closing_entries, self.name, self.company, self.posting_date, accounts=accounts
 			)
-		else:
-			process_gl_entries(gl_entries, self.name)
-			process_closing_entries(gl_entries, closing_entries, self.name, self.company, self.posting_date)
 
-	def get_grouped_gl_entries(self, get_opening_entries=False):
+	def get_posted_closing_account_entries(self):
+		gl_entry = frappe.qb.DocType("GL Entry")
+		query = frappe.qb.from_(gl_entry).select(
+			gl_entry.company,
+			gl_entry.account,
+			gl_entry.account_currency,
+			gl_entry.cost_center,
+			gl_entry.project,
+			gl_entry.finance_book,
+			Sum(gl_entry.debit).as_("debit"),
+			Sum(gl_entry.credit).as_("credit"),
+			Sum(gl_entry.debit_in_account_currency).as_("debit_in_account_currency"),
+			Sum(gl_entry.credit_in_account_currency).as_("credit_in_account_currency"),
+		)
+
+		dimension_fields = ["cost_center", "project", "finance_book"]
+		for dimension in get_accounting_dimensions():
+			query = query.select(gl_entry[dimension])
+			dimension_fields.append(dimension)
+
+		entries = (
+			query.where(
+				(gl_entry.voucher_type == "Period Closing Voucher")
+				& (gl_entry.voucher_no == self.name)
+				& (gl_entry.account == self.closing_account_head)
+				& (gl_entry.is_cancelled == 0)
+			)
+			.groupby(*[gl_entry[dimension] for dimension in dimension_fields])
+			.run(as_dict=1)
+		)
+
+		for entry in entries:
+			entry.is_period_closing_voucher_entry = 1
+
+		return entries
+
+	def get_grouped_gl_entries(self, get_opening_entries=False, accounts=None):
 		closing_entries = []
 		for acc in self.get_balances_based_on_dimensions(
-			group_by_account=True, for_aggregation=True, get_opening_entries=get_opening_entries
+			group_by_account=True,
+			for_aggregation=True,
+			get_opening_entries=get_opening_entries,
+			accounts=accounts,
 		):
 			closing_entries.append(self.get_closing_entries(acc))
 
 		return closing_entries
 
-	def get_gl_entries(self):
+	def get_gl_entries(self, accounts=None):
 		gl_entries = []
 
 		# pl account
 		for acc in self.get_balances_based_on_dimensions(
-			group_by_account=True, report_type="Profit and Loss"
+			group_by_account=True, report_type="Profit and Loss", accounts=accounts
 		):
 			if flt(acc.bal_in_company_currency):
 				gl_entries.append(self.get_gle_for_pl_account(acc))
 
 		# closing liability account
 		for acc in self.get_balances_based_on_dimensions(
-			group_by_account=False, report_type="Profit and Loss"
+			group_by_account=False, report_type="Profit and Loss", accounts=accounts
 		):
 			if flt(acc.bal_in_company_currency):
 				gl_entries.append(self.get_gle_for_closing_account(acc))
@@ -301,9 +454,14 @@ class PeriodClosingVoucher(AccountsController):
 			gl_entry.update({dimension: acc.get(dimension)})
 
 	def get_balances_based_on_dimensions(
-		self, group_by_account=False, report_type=None, for_aggregation=False, get_opening_entries=False
+		self,
+		group_by_account=False,
+		report_type=None,
+		for_aggregation=False,
+		get_opening_entries=False,
+		accounts=None,
 	):
-		"""Get balance for dimension-wise pl accounts"""
+		"""Get balance for dimension-wise pl accounts, optionally restricted to the given accounts"""
 
 		qb_dimension_fields = ["cost_center", "finance_book", "project"]
 
@@ -322,7 +480,12 @@ class PeriodClosingVoucher(AccountsController):
 		if report_type:
 			account_filters.update({"report_type": report_type})
 
+		if accounts:
+			account_filters.update({"name": ("in", accounts)})
+
 		accounts = frappe.get_all("Account", filters=account_filters, pluck="name")
+		if not accounts:
+			return []
 
 		gl_entry = frappe.qb.DocType("GL Entry")
 		query = frappe.qb.from_(gl_entry).select(gl_entry.account, gl_entry.account_currency)
@@ -349,6 +512,8 @@ class PeriodClosingVoucher(AccountsController):
 			(gl_entry.company == self.company)
 			& (gl_entry.is_cancelled == 0)
 			& (gl_entry.account.isin(accounts))
+			# entries posted by this voucher before a resume
+			& (gl_entry.voucher_no != self.name)
 		)
 
 		if get_opening_entries:
@@ -373,30 +538,124 @@ class PeriodClosingVoucher(AccountsController):
 		return query.run(as_dict=1)
 
 
-def process_gl_entries(gl_entries, voucher_name):
-	from erpnext.accounts.general_ledger import make_gl_entries
+def get_chunk_key(accounts):
+	return f"{accounts[0]}..{accounts[-1]}" if accounts else ""
+
+
+def get_completed_chunks(voucher_name, for_update=False):
+	completed_ranges = frappe.db.get_value(
+		"Period Closing Voucher", voucher_name, "completed_account_ranges", for_update=for_update
+	)
+	return set(json.loads(completed_ranges or "[]"))
+
+
+def record_completed_chunk(voucher_name, accounts):
+	"""Add the range to the completed ranges of the voucher, in the transaction which posted it."""
+	completed_chunks = get_completed_chunks(voucher_name, for_update=True)
+	completed_chunks.add(get_chunk_key(accounts))
+
+	frappe.db.set_value(
+		"Period Closing Voucher",
+		voucher_name,
+		"completed_account_ranges",
+		json.dumps(sorted(completed_chunks)),
+		update_modified=False,
+	)
+
+	return completed_chunks
+
+
+def process_closing_chunk(voucher_name, accounts, get_opening_entries=False, in_background=True):
+	"""Close one range of accounts, and merge the closing account once every range is closed.
+
+	Outside a background job the errors are raised, the transaction belongs to the caller.
+	"""
+	pcv = frappe.get_doc("Period Closing Voucher", voucher_name)
 
 	try:
-		if gl_entries:
-			make_gl_entries(gl_entries, merge_entries=False)
-		frappe.db.set_value("Period Closing Voucher", voucher_name, "gle_processing_status", "Completed")
+		pcv.process_accounts(accounts, get_opening_entries=get_opening_entries)
+		completed_chunks = record_completed_chunk(voucher_name, accounts)
 	except Exception as e:
+		if not in_background:
+			raise
+
 		frappe.db.rollback()
 		frappe.log_error(e)
-		frappe.db.set_value("Period Closing Voucher", voucher_name, "gle_processing_status", "Failed")
+		frappe.db.set_value(
+			"Period Closing Voucher",
+			voucher_name,
+			{"gle_processing_status": "Failed", "error_message": frappe.get_traceback()},
+		)
+		return
+
+	if in_background and not frappe.flags.in_test:
+		frappe.db.commit()
 
+	# ranges recorded by an earlier run of the voucher are not counted
+	chunk_keys = {get_chunk_key(accounts) for accounts in pcv.get_account_chunks()}
+	completed, total_chunks = len(completed_chunks & chunk_keys), len(chunk_keys)
 
-def process_closing_entries(gl_entries, closing_entries, voucher_name, company, closing_date):
-	from erpnext.accounts.doctype.account_closing_balance.account_closing_balance import (
-		make_closing_entries,
+	frappe.publish_progress(
+		completed * 100 / total_chunks,
+		title=_("Closing Accounts"),
+		doctype="Period Closing Voucher",
+		docname=voucher_name,
+		description=_("{0} of {1} account ranges closed").format(completed, total_chunks),
 	)
 
+	if completed < total_chunks:
+		return
+
+	if in_background:
+		enqueue_closing_account_entries(voucher_name, get_opening_entries)
+	else:
+		process_closing_account_entries(voucher_name, get_opening_entries, in_background=False)
+
+
+def enqueue_closing_account_entries(voucher_name, get_opening_entries=False):
+	frappe.enqueue(
+		process_closing_account_entries,
+		queue="long",
+		timeout=3000,
+		job_id=f"period_closing_voucher::{voucher_name}::closing_account",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		now=frappe.flags.in_test,
+		voucher_name=voucher_name,
+		get_opening_entries=get_opening_entries,
+	)
+
+
+def process_closing_account_entries(voucher_name, get_opening_entries=False, in_background=True):
+	pcv = frappe.get_doc("Period Closing Voucher", voucher_name)
+
+	if pending_chunks := pcv.get_pending_chunks():
+		frappe.db.set_value(
+			"Period Closing Voucher",
+			voucher_name,
+			{
+				"gle_processing_status": "Failed",
+				"error_message": _("Account ranges not closed: {0}").format(
+					", ".join(get_chunk_key(accounts) for accounts in pending_chunks)
+				),
+			},
+		)
+		return
+
 	try:
-		if gl_entries + closing_entries:
-			make_closing_entries(gl_entries + closing_entries, voucher_name, company, closing_date)
+		pcv.process_closing_account(get_opening_entries=get_opening_entries)
+		frappe.db.set_value("Period Closing Voucher", voucher_name, "gle_processing_status", "Completed")
 	except Exception as e:
+		if not in_background:
+			raise
+
 		frappe.db.rollback()
 		frappe.log_error(e)
+		frappe.db.set_value(
+			"Period Closing Voucher",
+			voucher_name,
+			{"gle_processing_status": "Failed", "error_message": frappe.get_traceback()},
+		)
 
 
 def make_reverse_gl_entries(voucher_type, voucher_no):
@@ -2,13 +2,19 @@
 # License: GNU General Public License v3. See license.txt
 
 
+import json
 import unittest
+from unittest.mock import patch
 
 import frappe
 from frappe.utils import today
 
 from erpnext.accounts.doctype.finance_book.test_finance_book import create_finance_book
 from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.doctype.period_closing_voucher.period_closing_voucher import (
+	get_chunk_key,
+	process_closing_account_entries,
+)
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
 from erpnext.accounts.utils import get_fiscal_year
 
@@ -64,6 +70,33 @@ class TestPeriodClosingVoucher(unittest.TestCase):
 		self.assertEqual(pcv.gle_processing_status, "Completed")
 		self.assertEqual(pcv_gle, expected_gle)
 
+	def test_opening_balances_from_closing_balance(self):
+		from erpnext.accounts.report.financial_statements import get_opening_balance_differences
+
+		frappe.db.sql("delete from `tabGL Entry` where company='Test PCV Company'")
+		frappe.db.sql("delete from `tabPeriod Closing Voucher` where company='Test PCV Company'")
+		frappe.db.sql("delete from `tabAccount Closing Balance` where company='Test PCV Company'")
+
+		company = create_company()
+		cost_center = create_cost_center("Test Cost Center 1")
+
+		for posting_date, amount in (("2021-03-15", 400), ("2021-04-15", 250)):
+			jv = make_journal_entry(
+				posting_date=posting_date,
+				amount=amount,
+				account1="Cash - TPC",
+				account2="Sales - TPC",
+				cost_center=cost_center,
+				save=False,
+			)
+			jv.company = company
+			jv.save()
+			jv.submit()
+
+		self.make_period_closing_voucher(posting_date="2021-03-31")
+
+		self.assertEqual(get_opening_balance_differences(company, "2021-05-01"), [])
+
 	def test_cost_center_wise_posting(self):
 		frappe.db.sql("delete from `tabGL Entry` where company='Test PCV Company'")
 		frappe.db.sql("delete from `tabPeriod Closing Voucher` where company='Test PCV Company'")
@@ -317,6 +350,113 @@ class TestPeriodClosingVoucher(unittest.TestCase):
 		repost_doc.posting_date = today()
 		repost_doc.save()
 
+	def test_closing_in_account_chunks(self):
+		frappe.db.sql("delete from `tabGL Entry` where company='Test PCV Company'")
+		frappe.db.sql("delete from `tabPeriod Closing Voucher` where company='Test PCV Company'")
+		frappe.db.sql("delete from `tabAccount Closing Balance` where company='Test PCV Company'")
+
+		company = create_company()
+		cost_center = create_cost_center("Test Cost Center 1")
+
+		for amount, account1, account2 in (
+			(400, "Cash - TPC", "Sales - TPC"),
+			(600, "Cost of Goods Sold - TPC", "Cash - TPC"),
+		):
+			jv = make_journal_entry(
+				posting_date="2021-03-15",
+				amount=amount,
+				account1=account1,
+				account2=account2,
+				cost_center=cost_center,
+				save=False,
+			)
+			jv.company = company
+			jv.save()
+			jv.submit()
+
+		with patch(
+			"erpnext.accounts.doctype.period_closing_voucher.period_closing_voucher.ACCOUNTS_PER_CHUNK", 2
+		):
+			pcv = self.make_period_closing_voucher(posting_date="2021-03-31")
+			chunks = pcv.get_account_chunks()
+			self.assertGreater(len(chunks), 1)
+
+			pcv.reload()
+			self.assertEqual(pcv.gle_processing_status, "Completed")
+			self.assertEqual(
+				set(json.loads(pcv.completed_account_ranges)),
+				{get_chunk_key(accounts) for accounts in chunks},
+			)
+			self.assertFalse(pcv.get_pending_chunks())
+
+			# the closing account is not merged while a range is not recorded as closed
+			pcv.db_set("completed_account_ranges", json.dumps([get_chunk_key(chunks[0])]))
+			process_closing_account_entries(pcv.name)
+			pcv.reload()
+			self.assertEqual(pcv.gle_processing_status, "Failed")
+			self.assertIn(get_chunk_key(chunks[-1]), pcv.error_message)
+
+			# an account added after the failure does not shift the ranges of the resumed closing
+			frappe.get_doc(
+				{
+					"doctype": "Account",
+					"account_name": "PCV Range Account",
+					"is_group": 0,
+					"company": company,
+					"root_type": "Asset",
+					"report_type": "Balance Sheet",
+					"parent_account": "Current Assets - TPC",
+				}
+			).insert(ignore_if_duplicate=True)
+			pcv.resume_gl_processing()
+
+		pcv.reload()
+		self.assertEqual(pcv.gle_processing_status, "Completed")
+		self.assertEqual(pcv.get_account_chunks(), chunks)
+		self.assertEqual(
+			set(json.loads(pcv.completed_account_ranges)), {get_chunk_key(accounts) for accounts in chunks}
+		)
+
+		surplus_account = pcv.closing_account_head
+		expected_gle = (
+			("Cost of Goods Sold - TPC", 0.0, 600.0),
+			(surplus_account, 200.0, 0.0),
+			("Sales - TPC", 400.0, 0.0),
+		)
+
+		def get_pcv_gle():
+			return frappe.db.sql(
+				"""
+				select account, sum(debit), sum(credit) from `tabGL Entry`
+				where voucher_no=%s group by account order by account
+			""",
+				(pcv.name),
+			)
+
+		self.assertEqual(get_pcv_gle(), expected_gle)
+
+		closing_balance = frappe.db.get_value(
+			"Account Closing Balance",
+			{
+				"account": surplus_account,
+				"period_closing_voucher": pcv.name,
+				"is_period_closing_voucher_entry": 1,
+			},
+			["sum(debit)", "sum(credit)"],
+		)
+		self.assertEqual(closing_balance, (200.0, 0.0))
+
+		# processing a range again, as on resume, does not post it twice
+		pcv.process_accounts(["Sales - TPC", "Cost of Goods Sold - TPC"])
+		pcv.process_closing_account()
+		self.assertEqual(get_pcv_gle(), expected_gle)
+		self.assertEqual(
+			frappe.db.count(
+				"Account Closing Balance", {"period_closing_voucher": pcv.name, "account": "Sales - TPC"}
+			),
+			2,
+		)
+
 	def make_period_closing_voucher(self, posting_date=None, submit=True):
 		surplus_account = create_account()
 		cost_center = create_cost_center("Test Cost Center 1")
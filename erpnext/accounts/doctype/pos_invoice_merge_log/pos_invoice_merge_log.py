@@ -8,7 +8,8 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 from frappe.model.mapper import map_child_doc, map_doc
-from frappe.utils import cint, flt, get_time, getdate, nowdate, nowtime
+from frappe.query_builder.functions import Count
+from frappe.utils import cint, create_batch, flt, get_time, getdate, nowdate, nowtime
 from frappe.utils.background_jobs import enqueue, is_job_enqueued
 from frappe.utils.scheduler import is_scheduler_inactive
 
@@ -111,10 +112,18 @@ class POSInvoiceMergeLog(Document):
 					frappe.throw(msg)
 
 	def on_submit(self):
-		pos_invoice_docs = [frappe.get_cached_doc("POS Invoice", d.pos_invoice) for d in self.pos_invoices]
+		pos_invoices = [d.pos_invoice for d in self.pos_invoices]
+		is_return = dict(
+			frappe.get_all(
+				"POS Invoice",
+				filters={"name": ("in", pos_invoices)},
+				fields=["name", "is_return"],
+				as_list=1,
+			)
+		)
 
-		returns = [d for d in pos_invoice_docs if d.get("is_return") == 1]
-		sales = [d for d in pos_invoice_docs if d.get("is_return") == 0]
+		returns = [d for d in pos_invoices if is_return.get(d) == 1]
+		sales = [d for d in pos_invoices if is_return.get(d) == 0]
 
 		sales_invoice, credit_note = "", ""
 		if returns:
@@ -124,12 +133,10 @@ class POSInvoiceMergeLog(Document):
 			sales_invoice = self.process_merging_into_sales_invoice(sales)
 
 		self.save()  # save consolidated_sales_invoice & consolidated_credit_note ref in merge log
-		self.update_pos_invoices(pos_invoice_docs, sales_invoice, credit_note)
+		self.update_pos_invoices(pos_invoices, sales_invoice, credit_note)
 
 	def on_cancel(self):
-		pos_invoice_docs = [frappe.get_cached_doc("POS Invoice", d.pos_invoice) for d in self.pos_invoices]
-
-		self.update_pos_invoices(pos_invoice_docs)
+		self.update_pos_invoices([d.pos_invoice for d in self.pos_invoices])
 		self.serial_and_batch_bundle_reference_for_pos_invoice()
 		self.cancel_linked_invoices()
 
@@ -168,7 +175,13 @@ class POSInvoiceMergeLog(Document):
 		return credit_note.name
 
 	def merge_pos_invoice_into(self, invoice, data):
+		"""Fold the POS Invoices in `data` into `invoice`.
+
+		Invoices are loaded one at a time and rows are aggregated in dicts by their keys, so memory
+		and time grow with the number of distinct rows rather than with the number of invoices.
+		"""
 		items, payments, taxes = [], [], []
+		items_by_key, payments_by_key, taxes_by_key = {}, {}, {}
 
 		loyalty_amount_sum, loyalty_points_sum = 0, 0
 
@@ -177,7 +190,7 @@ class POSInvoiceMergeLog(Document):
 
 		loyalty_amount_sum, loyalty_points_sum, idx = 0, 0, 1
 
-		for doc in data:
+		for doc in get_pos_invoice_docs(data):
 			map_doc(doc, invoice, table_map={"doctype": invoice.doctype})
 
 			if doc.redeem_loyalty_points:
@@ -187,25 +200,15 @@ class POSInvoiceMergeLog(Document):
 				loyalty_amount_sum += doc.loyalty_amount
 
 			for item in doc.get("items"):
-				found = False
-				for i in items:
-					if (
-						i.item_code == item.item_code
-						and not i.serial_and_batch_bundle
-						and not i.serial_no
-						and not i.batch_no
-						and i.uom == item.uom
-						and i.net_rate == item.net_rate
-						and i.warehouse == item.warehouse
-					):
-						found = True
-						i.qty = i.qty + item.qty
-						i.amount = i.amount + item.net_amount
-						i.net_amount = i.amount
-						i.base_amount = i.base_amount + item.base_net_amount
-						i.base_net_amount = i.base_amount
-
-				if not found:
+				key = (item.item_code, item.uom, item.net_rate, item.warehouse, item.item_tax_template)
+				i = items_by_key.get(key)
+				if i is not None:
+					i.qty = i.qty + item.qty
+					i.amount = i.amount + item.net_amount
+					i.net_amount = i.amount
+					i.base_amount = i.base_amount + item.base_net_amount
+					i.base_net_amount = i.base_amount
+				else:
 					item.rate = item.net_rate
 					item.amount = item.net_amount
 					item.base_amount = item.base_net_amount
@@ -215,17 +218,19 @@ class POSInvoiceMergeLog(Document):
 						si_item.serial_and_batch_bundle = item.serial_and_batch_bundle
 					items.append(si_item)
 
+					# rows with serial or batch nos are never merged into
+					if not (si_item.serial_and_batch_bundle or si_item.serial_no or si_item.batch_no):
+						items_by_key[key] = si_item
+
 			for tax in doc.get("taxes"):
-				found = False
-				for t in taxes:
-					if t.account_head == tax.account_head and t.cost_center == tax.cost_center:
-						t.tax_amount = flt(t.tax_amount) + flt(tax.tax_amount_after_discount_amount)
-						t.base_tax_amount = flt(t.base_tax_amount) + flt(
-							tax.base_tax_amount_after_discount_amount
-						)
-						update_item_wise_tax_detail(t, tax)
-						found = True
-				if not found:
+				t = taxes_by_key.get((tax.account_head, tax.cost_center))
+				if t is not None:
+					t.tax_amount = flt(t.tax_amount) + flt(tax.tax_amount_after_discount_amount)
+					t.base_tax_amount = flt(t.base_tax_amount) + flt(
+						tax.base_tax_amount_after_discount_amount
+					)
+					update_item_wise_tax_detail(t, tax)
+				else:
 					tax.charge_type = "Actual"
 					tax.idx = idx
 					idx += 1
@@ -234,16 +239,16 @@ class POSInvoiceMergeLog(Document):
 					tax.base_tax_amount = tax.base_tax_amount_after_discount_amount
 					tax.item_wise_tax_detail = tax.item_wise_tax_detail
 					taxes.append(tax)
+					taxes_by_key[(tax.account_head, tax.cost_center)] = tax
 
 			for payment in doc.get("payments"):
-				found = False
-				for pay in payments:
-					if pay.account == payment.account and pay.mode_of_payment == payment.mode_of_payment:
-						pay.amount = flt(pay.amount) + flt(payment.amount)
-						pay.base_amount = flt(pay.base_amount) + flt(payment.base_amount)
-						found = True
-				if not found:
+				pay = payments_by_key.get((payment.account, payment.mode_of_payment))
+				if pay is not None:
+					pay.amount = flt(pay.amount) + flt(payment.amount)
+					pay.base_amount = flt(pay.base_amount) + flt(payment.base_amount)
+				else:
 					payments.append(payment)
+					payments_by_key[(payment.account, payment.mode_of_payment)] = payment
 
 			rounding_adjustment += doc.rounding_adjustment
 			rounded_total += doc.rounded_total
@@ -300,9 +305,8 @@ class POSInvoiceMergeLog(Document):
 
 		return sales_invoice
 
-	def update_pos_invoices(self, invoice_docs, sales_invoice="", credit_note=""):
-		for doc in invoice_docs:
-			doc.load_from_db()
+	def update_pos_invoices(self, pos_invoices, sales_invoice="", credit_note=""):
+		for doc in get_pos_invoice_docs(pos_invoices):
 			doc.update(
 				{
 					"consolidated_invoice": None
@@ -328,6 +332,12 @@ class POSInvoiceMergeLog(Document):
 			si.cancel()
 
 
+def get_pos_invoice_docs(pos_invoices):
+	"""Yield the POS Invoices one at a time, so that only the aggregated rows stay in memory."""
+	for name in pos_invoices:
+		yield frappe.get_doc("POS Invoice", name)
+
+
 def update_item_wise_tax_detail(consolidate_tax_row, tax_row):
 	consolidated_tax_detail = json.loads(consolidate_tax_row.item_wise_tax_detail)
 	tax_row_detail = json.loads(tax_row.item_wise_tax_detail)
@@ -459,22 +469,76 @@ def split_invoices(invoices):
 	return _invoices
 
 
+def split_invoices_by_lines(invoices, max_lines):
+	"""
+	Splits invoices into groups whose consolidated invoices have at most `max_lines` item rows.
+	Consolidation never adds rows, so the item rows of the POS Invoices are counted.
+	Sales come first, so that a return is never merged before the invoice it is against.
+	"""
+	if not (max_lines and invoices):
+		return [invoices]
+
+	item = frappe.qb.DocType("POS Invoice Item")
+	line_count = {}
+	for names in create_batch([d.pos_invoice for d in invoices], 1000):
+		line_count.update(
+			frappe.qb.from_(item)
+			.select(item.parent, Count(item.name))
+			.where(item.parent.isin(names))
+			.groupby(item.parent)
+			.run()
+		)
+
+	groups, group, lines = [], [], 0
+	for d in sorted(invoices, key=lambda d: cint(d.is_return)):
+		if group and lines + line_count.get(d.pos_invoice, 0) > max_lines:
+			groups.append(group)
+			group, lines = [], 0
+
+		group.append(d)
+		lines += line_count.get(d.pos_invoice, 0)
+
+	groups.append(group)
+	return groups
+
+
 def create_merge_logs(invoice_by_customer, closing_entry=None):
 	try:
-		for customer, invoices in invoice_by_customer.items():
-			for _invoices in split_invoices(invoices):
-				merge_log = frappe.new_doc("POS Invoice Merge Log")
-				merge_log.posting_date = (
-					getdate(closing_entry.get("posting_date")) if closing_entry else nowdate()
-				)
-				merge_log.posting_time = (
-					get_time(closing_entry.get("posting_time")) if closing_entry else nowtime()
+		max_lines = cint(
+			frappe.db.get_single_value("Accounts Settings", "max_lines_per_consolidated_invoice")
+		)
+		invoice_groups = [
+			(customer, group)
+			for customer, invoices in invoice_by_customer.items()
+			for _invoices in split_invoices(invoices)
+			for group in split_invoices_by_lines(_invoices, max_lines)
+		]
+
+		for count, (customer, _invoices) in enumerate(invoice_groups, 1):
+			merge_log = frappe.new_doc("POS Invoice Merge Log")
+			merge_log.posting_date = (
+				getdate(closing_entry.get("posting_date")) if closing_entry else nowdate()
+			)
+			merge_log.posting_time = (
+				get_time(closing_entry.get("posting_time")) if closing_entry else nowtime()
+			)
+			merge_log.customer = customer
+			merge_log.pos_closing_entry = closing_entry.get("name") if closing_entry else None
+			merge_log.set("pos_invoices", _invoices)
+			merge_log.save(ignore_permissions=True)
+			merge_log.submit()
+
+			if closing_entry:
+				frappe.publish_progress(
+					count * 100 / len(invoice_groups),
+					title=_("Consolidating POS Invoices..."),
+					doctype="POS Closing Entry",
+					docname=closing_entry.get("name"),
+					description=_("{0} of {1} consolidated invoices created").format(
+						count, len(invoice_groups)
+					),
 				)
-				merge_log.customer = customer
-				merge_log.pos_closing_entry = closing_entry.get("name") if closing_entry else None
-				merge_log.set("pos_invoices", _invoices)
-				merge_log.save(ignore_permissions=True)
-				merge_log.submit()
+
 		if closing_entry:
 			closing_entry.set_status(update=True, status="Submitted")
 			closing_entry.db_set("error_message", "")
@@ -53,6 +53,39 @@ class TestPOSInvoiceMergeLog(unittest.TestCase):
 			frappe.db.sql("delete from `tabPOS Profile`")
 			frappe.db.sql("delete from `tabPOS Invoice`")
 
+	@change_settings("Accounts Settings", {"max_lines_per_consolidated_invoice": 2})
+	def test_consolidated_invoice_max_lines(self):
+		frappe.db.sql("delete from `tabPOS Invoice`")
+
+		try:
+			_, _ = init_user_and_profile()
+
+			pos_invoices = []
+			for rate in (100, 200, 300):
+				pos_inv = create_pos_invoice(rate=rate, do_not_submit=1)
+				pos_inv.append(
+					"payments", {"mode_of_payment": "Cash", "account": "Cash - _TC", "amount": rate}
+				)
+				pos_inv.submit()
+				pos_invoices.append(pos_inv)
+
+			consolidate_pos_invoices()
+
+			for pos_inv in pos_invoices:
+				pos_inv.load_from_db()
+
+			# one item row per invoice, so the third invoice goes into a second consolidated invoice
+			self.assertEqual(pos_invoices[0].consolidated_invoice, pos_invoices[1].consolidated_invoice)
+			self.assertNotEqual(pos_invoices[1].consolidated_invoice, pos_invoices[2].consolidated_invoice)
+			self.assertEqual(
+				len(frappe.get_doc("Sales Invoice", pos_invoices[0].consolidated_invoice).items), 2
+			)
+
+		finally:
+			frappe.set_user("Administrator")
+			frappe.db.sql("delete from `tabPOS Profile`")
+			frappe.db.sql("delete from `tabPOS Invoice`")
+
 	def test_consolidated_credit_note_creation(self):
 		frappe.db.sql("delete from `tabPOS Invoice`")
 
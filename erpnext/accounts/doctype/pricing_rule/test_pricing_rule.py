@@ -1376,6 +1376,41 @@ class TestPricingRule(unittest.TestCase):
 		debit_note.delete()
 		pi.cancel()
 
+	def test_pricing_rule_index_refreshed_on_change(self):
+		from erpnext.accounts.doctype.pricing_rule.utils import get_pricing_rule_index
+
+		pricing_rule = make_pricing_rule(selling=1, discount_percentage=10, title="_Test Pricing Rule")
+
+		index = get_pricing_rule_index("selling")
+		self.assertIn("_Test Item", index["item_code"]["values"])
+
+		args = frappe._dict(
+			{
+				"item_code": "_Test Item",
+				"company": "_Test Company",
+				"price_list": "_Test Price List",
+				"currency": "_Test Currency",
+				"doctype": "Sales Order",
+				"conversion_rate": 1,
+				"price_list_currency": "_Test Currency",
+				"plc_conversion_rate": 1,
+				"order_type": "Sales",
+				"customer": "_Test Customer",
+				"name": None,
+				"transaction_date": frappe.utils.nowdate(),
+			}
+		)
+		self.assertEqual(get_item_details(args).get("discount_percentage"), 10)
+
+		pricing_rule.discount_percentage = 20
+		pricing_rule.save()
+		self.assertEqual(get_item_details(args).get("discount_percentage"), 20)
+
+		pricing_rule.disable = 1
+		pricing_rule.save()
+		self.assertIsNone(get_pricing_rule_index("selling"))
+		self.assertFalse(get_item_details(args).get("discount_percentage"))
+
 
 test_dependencies = ["UTM Campaign"]
 
@@ -10,7 +10,7 @@ import math
 
 import frappe
 from frappe import _, bold
-from frappe.utils import cint, flt, fmt_money, get_link_to_form, getdate, today
+from frappe.utils import cint, cstr, flt, fmt_money, get_link_to_form, getdate, today
 
 from erpnext.setup.doctype.item_group.item_group import get_child_item_groups
 from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
@@ -23,16 +23,29 @@ class MultiplePricingRuleConflict(frappe.ValidationError):
 
 apply_on_table = {"Item Code": "items", "Item Group": "item_groups", "Brand": "brands"}
 
+SELLING_DOCTYPES = [
+	"Quotation",
+	"Quotation Item",
+	"Sales Order",
+	"Sales Order Item",
+	"Delivery Note",
+	"Delivery Note Item",
+	"Sales Invoice",
+	"Sales Invoice Item",
+	"POS Invoice",
+	"POS Invoice Item",
+]
+
 
 def get_pricing_rules(args, doc=None):
 	pricing_rules = []
-	values = {}
 
-	if not frappe.db.exists("Pricing Rule", {"disable": 0, args.transaction_type: 1}):
+	pricing_rule_index = get_pricing_rule_index(args.transaction_type)
+	if not pricing_rule_index:
 		return
 
 	for apply_on in ["Item Code", "Item Group", "Brand"]:
-		pricing_rules.extend(_get_pricing_rules(apply_on, args, values))
+		pricing_rules.extend(_get_pricing_rules(apply_on, args, pricing_rule_index))
 		if pricing_rules and pricing_rules[0].has_priority:
 			continue
 
@@ -99,78 +112,180 @@ def filter_pricing_rule_based_on_condition(pricing_rules, doc=None):
 	return filtered_pricing_rules
 
 
-def _get_pricing_rules(apply_on, args, values):
+def _get_pricing_rules(apply_on, args, pricing_rule_index):
 	apply_on_field = frappe.scrub(apply_on)
 
 	if not args.get(apply_on_field):
 		return []
 
-	child_doc = f"`tabPricing Rule {apply_on}`"
+	index = pricing_rule_index[apply_on_field]
+	pricing_rules = {}
 
-	conditions = item_variant_condition = item_conditions = ""
-	values[apply_on_field] = args.get(apply_on_field)
-	if apply_on_field in ["item_code", "brand"]:
-		item_conditions = f"{child_doc}.{apply_on_field}= %({apply_on_field})s"
+	def add_pricing_rules(values, match_uom=False):
+		for value in values:
+			for pricing_rule in index["values"].get(value, []):
+				if match_uom and args.get("uom") and pricing_rule.uom not in (args.uom, None, ""):
+					continue
 
-		if apply_on_field == "item_code":
-			if args.get("uom", None):
-				item_conditions += (
-					" and ({child_doc}.uom='{item_uom}' or IFNULL({child_doc}.uom, '')='')".format(
-						child_doc=child_doc, item_uom=args.get("uom")
-					)
-				)
-			if "variant_of" not in args:
-				args.variant_of = frappe.get_cached_value("Item", args.item_code, "variant_of")
+				pricing_rules[id(pricing_rule)] = pricing_rule
 
-			if args.variant_of:
-				item_variant_condition = f" or {child_doc}.item_code=%(variant_of)s "
-				values["variant_of"] = args.variant_of
+	if apply_on_field == "item_code":
+		add_pricing_rules([args.item_code], match_uom=True)
+
+		if "variant_of" not in args:
+			args.variant_of = frappe.get_cached_value("Item", args.item_code, "variant_of")
+
+		if args.variant_of:
+			add_pricing_rules([args.variant_of])
 	elif apply_on_field == "item_group":
-		item_conditions = _get_tree_conditions(args, "Item Group", child_doc, False)
-		if args.get("uom", None):
-			item_conditions += " and ({child_doc}.uom='{item_uom}' or IFNULL({child_doc}.uom, '')='')".format(
-				child_doc=child_doc, item_uom=args.get("uom")
-			)
+		add_pricing_rules(get_parent_tree_values("Item Group", args.item_group), match_uom=True)
+	else:
+		add_pricing_rules([args.get(apply_on_field)])
 
-	conditions += get_other_conditions(conditions, values, args)
-	warehouse_conditions = _get_tree_conditions(args, "Warehouse", "`tabPricing Rule`")
-	if warehouse_conditions:
-		warehouse_conditions = f" and {warehouse_conditions}"
+	for pricing_rule in index["other"].get(args.get(apply_on_field), []):
+		pricing_rules[id(pricing_rule)] = pricing_rule
 
 	if not args.price_list:
 		args.price_list = None
 
-	conditions += " and ifnull(`tabPricing Rule`.for_price_list, '') in (%(price_list)s, '')"
-	values["price_list"] = args.get("price_list")
-
-	pricing_rules = (
-		frappe.db.sql(
-			"""select `tabPricing Rule`.*,
-			{child_doc}.{apply_on_field}, {child_doc}.uom
-		from `tabPricing Rule`, {child_doc}
-		where ({item_conditions} or (`tabPricing Rule`.apply_rule_on_other is not null
-			and `tabPricing Rule`.{apply_on_other_field}=%({apply_on_field})s) {item_variant_condition})
-			and {child_doc}.parent = `tabPricing Rule`.name
-			and `tabPricing Rule`.disable = 0 and
-			`tabPricing Rule`.{transaction_type} = 1 {warehouse_cond} {conditions}
-		order by `tabPricing Rule`.priority desc,
-			`tabPricing Rule`.name desc""".format(
-				child_doc=child_doc,
-				apply_on_field=apply_on_field,
-				item_conditions=item_conditions,
-				item_variant_condition=item_variant_condition,
-				transaction_type=args.transaction_type,
-				warehouse_cond=warehouse_conditions,
-				apply_on_other_field=f"other_{apply_on_field}",
-				conditions=conditions,
-			),
-			values,
+	# rows are shared with the cached index, copy them before they are modified
+	pricing_rules = [
+		frappe._dict(pricing_rule)
+		for pricing_rule in pricing_rules.values()
+		if is_pricing_rule_applicable(pricing_rule, args)
+	]
+
+	return sorted(pricing_rules, key=lambda d: (cstr(d.priority), d.name), reverse=True)
+
+
+def is_pricing_rule_applicable(pricing_rule, args):
+	"""Check the party, date, warehouse and price list conditions of the pricing rule."""
+	for field in ["company", "customer", "supplier", "campaign", "sales_partner"]:
+		if pricing_rule.get(field) not in (args.get(field) or "", "", None):
+			return False
+
+	for parenttype in ["Customer Group", "Territory", "Supplier Group", "Warehouse"]:
+		field = frappe.scrub(parenttype)
+		if (
+			args.get(field)
+			and pricing_rule.get(field)
+			and pricing_rule.get(field) not in get_parent_tree_values(parenttype, args.get(field))
+		):
+			return False
+
+	if args.get("transaction_date"):
+		transaction_date = getdate(args.transaction_date)
+		if pricing_rule.valid_from and getdate(pricing_rule.valid_from) > transaction_date:
+			return False
+
+		if pricing_rule.valid_upto and getdate(pricing_rule.valid_upto) < transaction_date:
+			return False
+
+	if args.get("doctype") in SELLING_DOCTYPES:
+		if not pricing_rule.selling:
+			return False
+	elif not pricing_rule.buying:
+		return False
+
+	return pricing_rule.for_price_list in (args.price_list, "", None)
+
+
+def get_pricing_rule_index(transaction_type):
+	"""Active pricing rules of the transaction type, indexed by the value they apply on.
+
+	{
+	        "item_code": {
+	                "values": {item_code: [pricing rule rows]},
+	                "other": {other_item_code: [pricing rule rows]},
+	        },
+	        "item_group": ...,
+	        "brand": ...,
+	}
+
+	The index is cached with the count and last modified time of the active pricing rules, and
+	is rebuilt when they change. Returns None if there are no active pricing rules.
+	"""
+	version = frappe.db.sql(
+		f"""select count(*), max(modified) from `tabPricing Rule`
+		where disable = 0 and `{transaction_type}` = 1"""
+	)[0]
+
+	if not version[0]:
+		return None
+
+	version = (version[0], str(version[1]))
+	cached_index = frappe.cache().hget("pricing_rule_index", transaction_type)
+	if cached_index and cached_index[0] == version:
+		return cached_index[1]
+
+	index = build_pricing_rule_index(transaction_type)
+	frappe.cache().hset("pricing_rule_index", transaction_type, (version, index))
+
+	return index
+
+
+def build_pricing_rule_index(transaction_type):
+	index = {}
+
+	for apply_on in ["Item Code", "Item Group", "Brand"]:
+		apply_on_field = frappe.scrub(apply_on)
+		child_doc = f"`tabPricing Rule {apply_on}`"
+
+		values, other_values = {}, {}
+		for pricing_rule in frappe.db.sql(
+			f"""select `tabPricing Rule`.*, {child_doc}.{apply_on_field}, {child_doc}.uom
+			from `tabPricing Rule`, {child_doc}
+			where {child_doc}.parent = `tabPricing Rule`.name
+				and `tabPricing Rule`.disable = 0
+				and `tabPricing Rule`.`{transaction_type}` = 1""",
 			as_dict=1,
+		):
+			values.setdefault(pricing_rule.get(apply_on_field), []).append(pricing_rule)
+
+			if pricing_rule.apply_rule_on_other is not None:
+				other_values.setdefault(pricing_rule.get(f"other_{apply_on_field}"), []).append(pricing_rule)
+
+		index[apply_on_field] = {"values": values, "other": other_values}
+
+	return index
+
+
+def clear_pricing_rule_index():
+	frappe.cache().delete_value("pricing_rule_index")
+
+
+def get_parent_tree_values(parenttype, value):
+	"""Value and its parents in the tree, including the root for groups."""
+	if not frappe.flags.parent_tree_values:
+		frappe.flags.parent_tree_values = {}
+
+	key = (parenttype, value)
+	if key not in frappe.flags.parent_tree_values:
+		try:
+			lft, rgt = frappe.db.get_value(parenttype, value, ["lft", "rgt"])
+		except TypeError:
+			frappe.throw(_("Invalid {0}").format(value))
+
+		parent_values = frappe.get_all(
+			parenttype, filters={"lft": ("<=", lft), "rgt": (">=", rgt)}, pluck="name"
 		)
-		or []
-	)
 
-	return pricing_rules
+		if parenttype in ["Customer Group", "Item Group", "Territory"]:
+			parent_field = f"parent_{frappe.scrub(parenttype)}"
+			root_name = frappe.db.get_list(
+				parenttype,
+				{"is_group": 1, parent_field: ("is", "not set")},
+				"name",
+				as_list=1,
+				ignore_permissions=True,
+			)
+
+			if root_name and root_name[0][0]:
+				parent_values.append(root_name[0][0])
+
+		frappe.flags.parent_tree_values[key] = set(parent_values)
+
+	return frappe.flags.parent_tree_values[key]
 
 
 def apply_multiple_pricing_rules(pricing_rules):
@@ -244,18 +359,7 @@ def get_other_conditions(conditions, values, args):
 			and ifnull(`tabPricing Rule`.valid_upto, '2500-12-31')"""
 		values["transaction_date"] = args.get("transaction_date")
 
-	if args.get("doctype") in [
-		"Quotation",
-		"Quotation Item",
-		"Sales Order",
-		"Sales Order Item",
-		"Delivery Note",
-		"Delivery Note Item",
-		"Sales Invoice",
-		"Sales Invoice Item",
-		"POS Invoice",
-		"POS Invoice Item",
-	]:
+	if args.get("doctype") in SELLING_DOCTYPES:
 		conditions += """ and ifnull(`tabPricing Rule`.selling, 0) = 1"""
 	else:
 		conditions += """ and ifnull(`tabPricing Rule`.buying, 0) = 1"""
@@ -10,6 +10,9 @@ from frappe.utils import cint, cstr, flt, formatdate, get_link_to_form, getdate,
 
 import erpnext
 from erpnext.accounts.deferred_revenue import validate_service_stop_date
+from erpnext.accounts.doctype.account_period_balance.account_period_balance import (
+	cancel_account_period_balances,
+)
 from erpnext.accounts.doctype.gl_entry.gl_entry import update_outstanding_amt
 from erpnext.accounts.doctype.repost_accounting_ledger.repost_accounting_ledger import (
 	validate_docs_for_deferred_accounting,
@@ -842,6 +845,11 @@ class PurchaseInvoice(BuyingController):
 		if rows:
 			# cancel gl entries
 			gle = qb.DocType("GL Entry")
+			for purchase_receipt in purchase_receipts:
+				cancel_account_period_balances(
+					"Purchase Receipt", purchase_receipt, gle.voucher_detail_no.isin(rows)
+				)
+
 			gle_update_query = (
 				qb.update(gle)
 				.set(gle.is_cancelled, 1)
@@ -11,6 +11,10 @@ from frappe.utils import cint, flt, formatdate, get_link_to_form, getdate, now
 from frappe.utils.dashboard import cache_source
 
 import erpnext
+from erpnext.accounts.doctype.account_period_balance.account_period_balance import (
+	cancel_account_period_balances,
+	update_account_period_balances,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 )
@@ -18,8 +22,15 @@ from erpnext.accounts.doctype.accounting_dimension_filter.accounting_dimension_f
 	get_dimension_filter_map,
 )
 from erpnext.accounts.doctype.accounting_period.accounting_period import ClosedAccountingPeriod
-from erpnext.accounts.doctype.budget.budget import validate_expense_against_budget
-from erpnext.accounts.utils import create_payment_ledger_entry
+from erpnext.accounts.doctype.budget.budget import (
+	validate_expense_against_budget,
+	validate_expenses_against_budget,
+)
+from erpnext.accounts.utils import (
+	create_payment_ledger_entries_in_bulk,
+	create_payment_ledger_entry,
+	insert_ledger_entries,
+)
 from erpnext.exceptions import InvalidAccountDimensionError, MandatoryAccountDimensionError
 
 
@@ -38,13 +49,21 @@ def make_gl_entries(
 			validate_disabled_accounts(gl_map)
 			gl_map = process_gl_map(gl_map, merge_entries)
 			if gl_map and len(gl_map) > 1:
-				create_payment_ledger_entry(
-					gl_map,
-					cancel=0,
-					adv_adj=adv_adj,
-					update_outstanding=update_outstanding,
-					from_repost=from_repost,
-				)
+				if use_bulk_gl_posting(gl_map[0].voucher_type):
+					create_payment_ledger_entries_in_bulk(
+						gl_map,
+						adv_adj=adv_adj,
+						update_outstanding=update_outstanding,
+						from_repost=from_repost,
+					)
+				else:
+					create_payment_ledger_entry(
+						gl_map,
+						cancel=0,
+						adv_adj=adv_adj,
+						update_outstanding=update_outstanding,
+						from_repost=from_repost,
+					)
 				save_entries(gl_map, adv_adj, update_outstanding, from_repost)
 			# Post GL Map process there may no be any GL Entries
 			elif gl_map:
@@ -382,9 +401,19 @@ def save_entries(gl_map, adv_adj, update_outstanding, from_repost=False):
 		if gl_map[0]["voucher_type"] != "Period Closing Voucher":
 			validate_against_pcv(is_opening, gl_map[0]["posting_date"], gl_map[0]["company"])
 
-	for entry in gl_map:
-		validate_allowed_dimensions(entry, dimension_filter_map)
-		make_entry(entry, adv_adj, update_outstanding, from_repost)
+	if gl_map and use_bulk_gl_posting(gl_map[0]["voucher_type"]):
+		for entry in gl_map:
+			validate_allowed_dimensions(entry, dimension_filter_map)
+		make_entries_in_bulk(gl_map, adv_adj, update_outstanding, from_repost)
+	else:
+		for entry in gl_map:
+			validate_allowed_dimensions(entry, dimension_filter_map)
+			make_entry(entry, adv_adj, update_outstanding, from_repost)
+
+		# once for the voucher, before the budget check which reads the balances when they are maintained
+		update_account_period_balances(gl_map)
+		if gl_map and not from_repost and gl_map[0]["voucher_type"] != "Period Closing Voucher":
+			validate_expenses_against_budget(gl_map)
 
 
 def make_entry(args, adv_adj, update_outstanding, from_repost=False):
@@ -397,8 +426,70 @@ def make_entry(args, adv_adj, update_outstanding, from_repost=False):
 	gle.flags.notify_update = False
 	gle.submit()
 
-	if not from_repost and gle.voucher_type != "Period Closing Voucher":
-		validate_expense_against_budget(args)
+
+def use_bulk_gl_posting(voucher_type) -> bool:
+	return any(
+		d.document_type == voucher_type
+		for d in frappe.get_cached_doc("Accounts Settings").get("bulk_gl_posting_voucher_types")
+	)
+
+
+def make_entries_in_bulk(gl_map, adv_adj, update_outstanding, from_repost=False):
+	"""Post the GL Entries of a voucher with one multi-row insert.
+
+	Every entry is validated in memory like `GLEntry.validate`. The checks of `GLEntry.on_update`
+	which read the accounts or the ledger run once per account, and the outstanding is updated
+	once per referenced voucher instead of once per entry.
+	"""
+	from erpnext.accounts.doctype.gl_entry.gl_entry import (
+		update_outstanding_amt,
+		validate_balance_type,
+		validate_frozen_account,
+	)
+
+	gl_entries = []
+	for entry in gl_map:
+		gle = frappe.new_doc("GL Entry")
+		gle.update(entry)
+		gle.flags.from_repost = from_repost
+		gle.autoname()
+		gle.run_method("validate")
+		gl_entries.append(gle)
+
+	insert_ledger_entries(gl_entries)
+	update_account_period_balances(gl_entries)
+
+	voucher_type, voucher_no = gl_map[0]["voucher_type"], gl_map[0]["voucher_no"]
+	if from_repost or voucher_type == "Period Closing Voucher":
+		return
+
+	for account, gle in {gle.account: gle for gle in gl_entries}.items():
+		gle.validate_account_details(adv_adj)
+		validate_balance_type(account, adv_adj)
+		validate_frozen_account(account, adv_adj)
+
+	for gle in gl_entries:
+		gle.validate_dimensions_for_pl_and_bs()
+
+	is_exchange_gain_loss_journal = (
+		voucher_type == "Journal Entry"
+		and frappe.get_cached_value("Journal Entry", voucher_no, "voucher_type") == "Exchange Gain Or Loss"
+	)
+	if (update_outstanding or "Yes") == "Yes" and not (
+		is_exchange_gain_loss_journal or frappe.flags.is_reverse_depr_entry
+	):
+		vouchers = dict.fromkeys(
+			(gle.account, gle.party_type, gle.party, gle.against_voucher_type, gle.against_voucher)
+			for gle in gl_entries
+			if gle.against_voucher_type in ["Journal Entry", "Sales Invoice", "Purchase Invoice", "Fees"]
+			and gle.against_voucher
+			and frappe.get_cached_value("Account", gle.account, "account_type")
+			not in ["Receivable", "Payable"]
+		)
+		for voucher in vouchers:
+			update_outstanding_amt(*voucher)
+
+	validate_expenses_against_budget(gl_map)
 
 
 def validate_cwip_accounts(gl_map):
@@ -655,31 +746,36 @@ def make_reverse_gl_entries(
 			# Only cancel GL entries for unlinked reference using `voucher_detail_no`
 			gle = frappe.qb.DocType("GL Entry")
 			for x in gl_entries:
+				conditions = (
+					(gle.company == x.company)
+					& (gle.account == x.account)
+					& (gle.party_type == x.party_type)
+					& (gle.party == x.party)
+					& (gle.voucher_type == x.voucher_type)
+					& (gle.voucher_no == x.voucher_no)
+					& (gle.against_voucher_type == x.against_voucher_type)
+					& (gle.against_voucher == x.against_voucher)
+					& (gle.voucher_detail_no == x.voucher_detail_no)
+				)
 				query = (
 					frappe.qb.update(gle)
 					.set(gle.modified, now())
 					.set(gle.modified_by, frappe.session.user)
-					.where(
-						(gle.company == x.company)
-						& (gle.account == x.account)
-						& (gle.party_type == x.party_type)
-						& (gle.party == x.party)
-						& (gle.voucher_type == x.voucher_type)
-						& (gle.voucher_no == x.voucher_no)
-						& (gle.against_voucher_type == x.against_voucher_type)
-						& (gle.against_voucher == x.against_voucher)
-						& (gle.voucher_detail_no == x.voucher_detail_no)
-					)
+					.where(conditions)
 				)
 
 				if not immutable_ledger_enabled:
+					cancel_account_period_balances(x.voucher_type, x.voucher_no, conditions)
 					query = query.set(gle.is_cancelled, True)
 
 				query.run()
 		else:
 			if not immutable_ledger_enabled:
+				cancel_account_period_balances(gl_entries[0]["voucher_type"], gl_entries[0]["voucher_no"])
 				set_as_cancel(gl_entries[0]["voucher_type"], gl_entries[0]["voucher_no"])
 
+		reverse_entries = []
+
 		for entry in gl_entries:
 			new_gle = copy.deepcopy(entry)
 			new_gle["name"] = None
@@ -703,6 +799,12 @@ def make_reverse_gl_entries(
 
 			if new_gle["debit"] or new_gle["credit"]:
 				make_entry(new_gle, adv_adj, "Yes")
+				reverse_entries.append(new_gle)
+
+		# reverse entries are active only in an immutable ledger
+		update_account_period_balances(reverse_entries)
+		if reverse_entries and reverse_entries[0]["voucher_type"] != "Period Closing Voucher":
+			validate_expenses_against_budget(reverse_entries)
 
 
 def check_freezing_date(posting_date, adv_adj=False):
@@ -14,6 +14,9 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimension_with_children,
 )
+from erpnext.accounts.doctype.payment_ledger_balance.payment_ledger_balance import (
+	can_use_payment_ledger_balances,
+)
 from erpnext.accounts.utils import get_currency_precision, get_party_types_from_account_type
 
 #  This report gives a summary of all Outstanding Invoices considering the following
@@ -416,14 +419,20 @@ class ReceivablePayableReport:
 
 	def get_invoice_details(self):
 		self.invoice_details = frappe._dict()
+		if self.voucher_nos is not None and not self.voucher_nos:
+			return
+
+		values = {"report_date": self.filters.report_date, "voucher_nos": tuple(self.voucher_nos or ())}
+		voucher_condition = "and name in %(voucher_nos)s" if self.voucher_nos else ""
+
 		if self.account_type == "Receivable":
 			si_list = frappe.db.sql(
-				"""
+				f"""
 				select name, due_date, po_no
 				from `tabSales Invoice`
-				where posting_date <= %s
+				where posting_date <= %(report_date)s {voucher_condition}
 			""",
-				self.filters.report_date,
+				values,
 				as_dict=1,
 			)
 			for d in si_list:
@@ -446,24 +455,24 @@ class ReceivablePayableReport:
 
 		if self.account_type == "Payable":
 			for pi in frappe.db.sql(
-				"""
+				f"""
 				select name, due_date, bill_no, bill_date
 				from `tabPurchase Invoice`
-				where posting_date <= %s
+				where posting_date <= %(report_date)s {voucher_condition}
 			""",
-				self.filters.report_date,
+				values,
 				as_dict=1,
 			):
 				self.invoice_details.setdefault(pi.name, pi)
 
 		# Invoices booked via Journal Entries
 		journal_entries = frappe.db.sql(
-			"""
+			f"""
 			select name, due_date, bill_no, bill_date
 			from `tabJournal Entry`
-			where posting_date <= %s
+			where posting_date <= %(report_date)s {voucher_condition}
 		""",
-			self.filters.report_date,
+			values,
 			as_dict=1,
 		)
 
@@ -796,6 +805,10 @@ class ReceivablePayableReport:
 			.where(Criterion.any(self.or_filters))
 		)
 
+		use_balances = self.can_use_payment_ledger_balances()
+		if use_balances:
+			query = query.where(self.get_open_vouchers_condition())
+
 		if self.filters.get("show_remarks"):
 			if remarks_length := frappe.db.get_single_value(
 				"Accounts Settings", "receivable_payable_remarks_length"
@@ -811,6 +824,61 @@ class ReceivablePayableReport:
 
 		self.ple_entries = query.run(as_dict=True)
 
+		# with open vouchers only, fetch invoice details of the vouchers in the report
+		self.voucher_nos = {ple.voucher_no for ple in self.ple_entries} if use_balances else None
+
+	def can_use_payment_ledger_balances(self):
+		# balances are kept per voucher, account and party, so they can't tell
+		# whether a voucher is open within a cost center, finance book or dimension
+		if (
+			self.filters.get("for_revaluation_journals")
+			or self.filters.cost_center
+			or self.filters.finance_book
+			or any(self.filters.get(d.fieldname) for d in get_accounting_dimensions(as_list=False))
+		):
+			return False
+
+		return can_use_payment_ledger_balances()
+
+	def get_open_vouchers_condition(self):
+		"""Only read entries against vouchers which are open now or have entries after the report date.
+
+		Settled vouchers have no outstanding on the report date, so their rows would be skipped anyway.
+		"""
+		balance = qb.DocType("Payment Ledger Balance")
+		open_vouchers = (
+			qb.from_(balance)
+			.select(balance.voucher_no)
+			.where((balance.company == self.filters.company) & (balance.account_type == self.account_type))
+		)
+
+		settled_after_report_date = (
+			qb.from_(self.ple)
+			.select(self.ple.against_voucher_no)
+			.where(
+				(self.ple.company == self.filters.company)
+				& (self.ple.delinked == 0)
+				& (self.ple.posting_date > self.filters.report_date)
+			)
+		)
+
+		# entries against a return are shown against the invoice it was made against
+		invoice = qb.DocType("Sales Invoice" if self.account_type == "Receivable" else "Purchase Invoice")
+		returns = qb.from_(invoice).where(
+			(invoice.is_return == 1) & (invoice.docstatus == 1) & (invoice.update_outstanding_for_self == 0)
+		)
+
+		return (
+			self.ple.against_voucher_no.isin(open_vouchers)
+			| self.ple.against_voucher_no.isin(settled_after_report_date)
+			| self.ple.against_voucher_no.isin(
+				returns.select(invoice.name).where(invoice.return_against.isin(open_vouchers))
+			)
+			| self.ple.against_voucher_no.isin(
+				returns.select(invoice.return_against).where(invoice.name.isin(open_vouchers))
+			)
+		)
+
 	def get_sales_invoices_or_customers_based_on_sales_person(self):
 		if self.filters.get("sales_person"):
 			lft, rgt = frappe.db.get_value("Sales Person", self.filters.get("sales_person"), ["lft", "rgt"])
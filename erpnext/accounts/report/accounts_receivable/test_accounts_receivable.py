@@ -966,3 +966,35 @@ class TestAccountsReceivable(AccountsTestMixin, FrappeTestCase):
 		self.assertEqual(len(report[1]), 1)
 		row = report[1][0]
 		self.assertEqual(expected_data_after_payment, [row.voucher_no, row.cost_center, row.outstanding])
+
+	@change_settings("Accounts Settings", {"maintain_payment_ledger_balances": 1})
+	def test_report_with_payment_ledger_balances(self):
+		filters = {
+			"company": self.company,
+			"report_date": today(),
+			"range": "30, 60, 90, 120",
+		}
+
+		si = self.create_sales_invoice(no_payment_schedule=True)
+		settled_si = self.create_sales_invoice(no_payment_schedule=True)
+		pe = get_payment_entry(settled_si.doctype, settled_si.name, bank_account=self.cash)
+		pe.paid_from = self.debit_to
+		pe.insert().submit()
+		self.create_payment_entry(si.name)
+
+		self.assertTrue(frappe.db.exists("Payment Ledger Balance", {"voucher_no": si.name}))
+		self.assertFalse(frappe.db.exists("Payment Ledger Balance", {"voucher_no": settled_si.name}))
+
+		report = execute(filters)
+		self.assertEqual(
+			[[si.name, 100, 40, 60]],
+			[[row.voucher_no, row.invoiced, row.paid, row.outstanding] for row in report[1]],
+		)
+
+		pe.cancel()
+		self.assertTrue(frappe.db.exists("Payment Ledger Balance", {"voucher_no": settled_si.name}))
+
+		report = execute(filters)
+		self.assertEqual(
+			{si.name: 60, settled_si.name: 100}, {row.voucher_no: row.outstanding for row in report[1]}
+		)
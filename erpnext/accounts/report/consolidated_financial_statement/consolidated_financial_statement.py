@@ -2,12 +2,14 @@
 # For license information, please see license.txt
 
 
+import copy
 from collections import defaultdict
 
 import frappe
 from frappe import _
-from frappe.query_builder import Criterion
-from frappe.utils import flt, getdate
+from frappe.query_builder import Case, Criterion
+from frappe.query_builder.functions import Max, Sum
+from frappe.utils import cstr, flt, getdate
 
 import erpnext
 from erpnext.accounts.report.balance_sheet.balance_sheet import (
@@ -38,6 +40,9 @@ from erpnext.accounts.report.profit_and_loss_statement.profit_and_loss_statement
 	get_report_summary as get_pl_summary,
 )
 from erpnext.accounts.report.utils import convert, convert_to_presentation_currency
+from erpnext.accounts.utils import get_ledger_version
+
+BALANCES_CACHE_EXPIRY = 60 * 60
 
 
 def execute(filters=None):
@@ -334,6 +339,9 @@ def get_data(companies, root_type, balance_must_be, fiscal_year, filters=None, i
 		end_date = filters.period_end_date
 
 	filters.end_date = end_date
+	opening_date = (
+		fiscal_year.year_start_date if filters.filter_based_on == "Fiscal Year" else filters.period_start_date
+	)
 
 	gl_entries_by_account = {}
 	for root in frappe.db.sql(
@@ -353,6 +361,7 @@ def get_data(companies, root_type, balance_must_be, fiscal_year, filters=None, i
 			accounts,
 			ignore_closing_entries=False,
 			root_type=root_type,
+			opening_date=opening_date,
 		)
 
 	calculate_values(accounts_by_name, gl_entries_by_account, companies, filters, fiscal_year)
@@ -592,8 +601,13 @@ def set_gl_entries_by_account(
 	accounts,
 	ignore_closing_entries=False,
 	root_type=None,
+	opening_date=None,
 ):
-	"""Returns a dict like { "account": [gl entries], ... }"""
+	"""Returns a dict like { "account": [gl entries], ... }
+
+	Entries are the balances of each account of each company, split into the balance before
+	`opening_date` and the balance from it.
+	"""
 
 	company_lft, company_rgt = frappe.get_cached_value("Company", filters.get("company"), ["lft", "rgt"])
 
@@ -611,43 +625,25 @@ def set_gl_entries_by_account(
 		{"report_date": to_date, "presentation_currency": filters.get("presentation_currency")}
 	)
 
-	for d in companies:
-		gle = frappe.qb.DocType("GL Entry")
-		account = frappe.qb.DocType("Account")
-		query = (
-			frappe.qb.from_(gle)
-			.inner_join(account)
-			.on(account.name == gle.account)
-			.select(
-				gle.posting_date,
-				gle.account,
-				gle.debit,
-				gle.credit,
-				gle.is_opening,
-				gle.company,
-				gle.fiscal_year,
-				gle.debit_in_account_currency,
-				gle.credit_in_account_currency,
-				gle.account_currency,
-				account.account_name,
-				account.account_number,
-			)
-			.where(
-				(gle.company == d.name)
-				& (gle.is_cancelled == 0)
-				& (gle.posting_date <= to_date)
-				& (account.lft >= root_lft)
-				& (account.rgt <= root_rgt)
-			)
-			.orderby(gle.account, gle.posting_date)
-		)
+	balances = get_companies_balances(
+		companies,
+		frappe._dict(
+			{
+				"from_date": from_date,
+				"to_date": to_date,
+				"opening_date": opening_date or from_date or to_date,
+				"root_lft": root_lft,
+				"root_rgt": root_rgt,
+				"root_type": root_type,
+				"ignore_closing_entries": ignore_closing_entries,
+				"filters": filters,
+			}
+		),
+	)
 
-		if root_type:
-			query = query.where(account.root_type == root_type)
-		additional_conditions = get_additional_conditions(from_date, ignore_closing_entries, filters, d)
-		if additional_conditions:
-			query = query.where(Criterion.all(additional_conditions))
-		gl_entries = query.run(as_dict=True)
+	for d in companies:
+		# the cached balances are converted in place
+		gl_entries = copy.deepcopy(balances[d.name])
 
 		if filters and filters.get("presentation_currency") != d.default_currency:
 			currency_info["company"] = d.name
@@ -666,6 +662,111 @@ def set_gl_entries_by_account(
 	return gl_entries_by_account
 
 
+def get_companies_balances(companies, args):
+	"""Balances of each company, read from the cache or fetched from the GL Entries.
+
+	The companies missing in the cache are fetched together in one query. Balances are cached in
+	company currency, so reruns with other presentation filters reuse them.
+	"""
+	balances, pending = {}, {}
+	for d in companies:
+		cache_key = get_balances_cache_key(d, args)
+		cached_balances = frappe.cache().get_value(cache_key)
+
+		if cached_balances is None:
+			pending[d.name] = cache_key
+		else:
+			balances[d.name] = cached_balances
+
+	if pending:
+		fetched = get_balances_of_companies([d for d in companies if d.name in pending], args)
+		for company, cache_key in pending.items():
+			frappe.cache().set_value(cache_key, fetched[company], expires_in_sec=BALANCES_CACHE_EXPIRY)
+			balances[company] = fetched[company]
+
+	return balances
+
+
+def get_balances_cache_key(d, args):
+	# the ledger version changes whenever GL Entries of the company are posted or cancelled
+	return "erpnext:consolidated_balances:" + ":".join(
+		cstr(value)
+		for value in (
+			d.name,
+			get_ledger_version(d.name),
+			args.from_date,
+			args.to_date,
+			args.opening_date,
+			args.root_lft,
+			args.root_rgt,
+			args.root_type,
+			args.ignore_closing_entries,
+			args.filters.get("finance_book"),
+			args.filters.get("include_default_book_entries"),
+		)
+	)
+
+
+def get_balances_of_companies(companies, args):
+	gle = frappe.qb.DocType("GL Entry")
+	account = frappe.qb.DocType("Account")
+	is_opening_balance = Case().when(gle.posting_date < args.opening_date, 1).else_(0)
+
+	# the finance books of the default book entries differ per company
+	company_conditions = []
+	for d in companies:
+		additional_conditions = get_additional_conditions(
+			args.from_date, args.ignore_closing_entries, args.filters, d
+		)
+		company_conditions.append(Criterion.all([gle.company == d.name, *additional_conditions]))
+
+	query = (
+		frappe.qb.from_(gle)
+		.inner_join(account)
+		.on(account.name == gle.account)
+		.select(
+			gle.company,
+			gle.account,
+			gle.account_currency,
+			account.account_name,
+			account.account_number,
+			Max(gle.posting_date).as_("posting_date"),
+			Sum(gle.debit).as_("debit"),
+			Sum(gle.credit).as_("credit"),
+			Sum(gle.debit_in_account_currency).as_("debit_in_account_currency"),
+			Sum(gle.credit_in_account_currency).as_("credit_in_account_currency"),
+		)
+		.where(
+			(gle.company.isin([d.name for d in companies]))
+			& (gle.is_cancelled == 0)
+			& (gle.posting_date <= args.to_date)
+			& (account.lft >= args.root_lft)
+			& (account.rgt <= args.root_rgt)
+			& Criterion.any(company_conditions)
+		)
+		.groupby(
+			gle.company,
+			gle.account,
+			gle.account_currency,
+			account.account_name,
+			account.account_number,
+			is_opening_balance,
+		)
+		.orderby(gle.company)
+		.orderby(gle.account)
+	)
+
+	if args.root_type:
+		query = query.where(account.root_type == args.root_type)
+
+	balances = {d.name: [] for d in companies}
+	for entry in query.run(as_dict=True):
+		entry.posting_date = getdate(entry.posting_date)
+		balances[entry.company].append(entry)
+
+	return balances
+
+
 def get_account_details(account):
 	return frappe.get_cached_value(
 		"Account",
@@ -8,6 +8,7 @@ import re
 
 import frappe
 from frappe import _
+from frappe.query_builder.functions import Sum
 from frappe.utils import add_days, add_months, cint, cstr, flt, formatdate, get_first_day, getdate
 
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
@@ -15,7 +16,7 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_dimension_with_children,
 )
 from erpnext.accounts.report.utils import convert_to_presentation_currency, get_currency
-from erpnext.accounts.utils import get_fiscal_year
+from erpnext.accounts.utils import get_currency_precision, get_fiscal_year
 
 
 def get_period_list(
@@ -452,33 +453,20 @@ def set_gl_entries_by_account(
 
 	if accounts_list:
 		# For balance sheet
-		ignore_closing_balances = frappe.db.get_single_value(
-			"Accounts Settings", "ignore_account_closing_balance"
-		)
-		if not from_date and not ignore_closing_balances:
-			last_period_closing_voucher = frappe.db.get_all(
-				"Period Closing Voucher",
-				filters={
-					"docstatus": 1,
-					"company": filters.company,
-					"posting_date": ("<", filters["period_start_date"]),
-				},
-				fields=["posting_date", "name"],
-				order_by="posting_date desc",
-				limit=1,
+		if not from_date:
+			last_period_closing_voucher = get_last_period_closing_voucher(
+				filters.company, filters["period_start_date"]
 			)
-			if last_period_closing_voucher:
-				gl_entries += get_accounting_entries(
-					"Account Closing Balance",
-					from_date,
-					to_date,
-					accounts_list,
-					filters,
-					ignore_closing_entries,
-					last_period_closing_voucher[0].name,
-				)
-				from_date = add_days(last_period_closing_voucher[0].posting_date, 1)
-				ignore_opening_entries = True
+			gl_entries += get_opening_balances(
+				filters["period_start_date"],
+				accounts_list,
+				filters,
+				ignore_closing_entries,
+				last_period_closing_voucher,
+			)
+			from_date = filters["period_start_date"]
+			# opening entries are included in the closing balances
+			ignore_opening_entries = ignore_opening_entries or bool(last_period_closing_voucher)
 
 		gl_entries += get_accounting_entries(
 			"GL Entry",
@@ -542,6 +530,138 @@ def get_accounting_entries(
 	return entries
 
 
+def get_last_period_closing_voucher(company, before_date):
+	"""Latest Period Closing Voucher of the company before the date, unless closing balances are ignored."""
+	if frappe.db.get_single_value("Accounts Settings", "ignore_account_closing_balance"):
+		return None
+
+	last_period_closing_voucher = frappe.db.get_all(
+		"Period Closing Voucher",
+		filters={"docstatus": 1, "company": company, "posting_date": ("<", before_date)},
+		fields=["posting_date", "name"],
+		order_by="posting_date desc",
+		limit=1,
+	)
+
+	return last_period_closing_voucher[0] if last_period_closing_voucher else None
+
+
+def get_opening_balances(
+	opening_date, accounts, filters, ignore_closing_entries=False, period_closing_voucher=None
+):
+	"""Balances of the accounts before `opening_date`, as GL Entry like rows dated the day before.
+
+	Starts from the Account Closing Balance of `period_closing_voucher` and adds the GL Entries
+	posted after it, so only the GL Entries after the last closing are scanned. Cost center, project,
+	finance book and accounting dimension filters apply to both.
+	"""
+	from_date = None
+	balances = []
+
+	if period_closing_voucher:
+		balances += get_account_balances(
+			"Account Closing Balance",
+			from_date,
+			opening_date,
+			accounts,
+			filters,
+			ignore_closing_entries,
+			period_closing_voucher=period_closing_voucher.name,
+		)
+		from_date = add_days(period_closing_voucher.posting_date, 1)
+
+	balances += get_account_balances(
+		"GL Entry",
+		from_date,
+		opening_date,
+		accounts,
+		filters,
+		ignore_closing_entries,
+		ignore_opening_entries=bool(period_closing_voucher),
+	)
+
+	posting_date = getdate(add_days(opening_date, -1))
+	for d in balances:
+		d.posting_date = posting_date
+		d.is_opening = "No"
+
+	return balances
+
+
+def get_account_balances(
+	doctype,
+	from_date,
+	to_date,
+	accounts,
+	filters,
+	ignore_closing_entries,
+	period_closing_voucher=None,
+	ignore_opening_entries=False,
+):
+	"""Debit and credit of each account, from the entries before `to_date`."""
+	gl_entry = frappe.qb.DocType(doctype)
+	query = (
+		frappe.qb.from_(gl_entry)
+		.select(
+			gl_entry.account,
+			gl_entry.account_currency,
+			Sum(gl_entry.debit).as_("debit"),
+			Sum(gl_entry.credit).as_("credit"),
+			Sum(gl_entry.debit_in_account_currency).as_("debit_in_account_currency"),
+			Sum(gl_entry.credit_in_account_currency).as_("credit_in_account_currency"),
+		)
+		.where(gl_entry.company == filters.company)
+		.groupby(gl_entry.account, gl_entry.account_currency)
+	)
+
+	if doctype == "GL Entry":
+		query = query.select(gl_entry.fiscal_year).groupby(gl_entry.fiscal_year)
+		query = query.where((gl_entry.is_cancelled == 0) & (gl_entry.posting_date < to_date))
+
+		if ignore_opening_entries:
+			query = query.where(gl_entry.is_opening == "No")
+	else:
+		query = query.where(gl_entry.period_closing_voucher == period_closing_voucher)
+
+	if accounts:
+		query = query.where(gl_entry.account.isin(accounts))
+
+	query = apply_additional_conditions(doctype, query, from_date, ignore_closing_entries, filters)
+
+	return query.run(as_dict=True)
+
+
+def get_opening_balance_differences(company, opening_date):
+	"""Accounts whose opening balance from the last closing differs from a full scan of the GL Entries."""
+	filters = frappe._dict({"company": company})
+
+	full_scan = {}
+	for d in get_account_balances("GL Entry", None, opening_date, None, filters, False):
+		full_scan[d.account] = full_scan.get(d.account, 0.0) + flt(d.debit) - flt(d.credit)
+
+	opening_balances = {}
+	for d in get_opening_balances(
+		opening_date,
+		None,
+		filters,
+		period_closing_voucher=get_last_period_closing_voucher(company, opening_date),
+	):
+		opening_balances[d.account] = opening_balances.get(d.account, 0.0) + flt(d.debit) - flt(d.credit)
+
+	precision = get_currency_precision()
+	differences = []
+	for account in sorted(set(full_scan) | set(opening_balances)):
+		gl_balance, opening_balance = full_scan.get(account, 0.0), opening_balances.get(account, 0.0)
+		if flt(gl_balance - opening_balance, precision):
+			differences.append(
+				frappe._dict(
+					{"account": account, "gl_balance": gl_balance, "opening_balance": opening_balance}
+				)
+			)
+
+	return differences
+
+
 def apply_additional_conditions(doctype, query, from_date, ignore_closing_entries, filters):
 	gl_entry = frappe.qb.DocType(doctype)
 	accounting_dimensions = get_accounting_dimensions(as_list=False)
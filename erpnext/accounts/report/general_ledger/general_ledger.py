@@ -15,7 +15,11 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimension_with_children,
 )
-from erpnext.accounts.report.financial_statements import get_cost_centers_with_children
+from erpnext.accounts.report.financial_statements import (
+	get_cost_centers_with_children,
+	get_last_period_closing_voucher,
+	get_opening_balances,
+)
 from erpnext.accounts.report.utils import convert_to_presentation_currency, get_currency
 from erpnext.accounts.utils import get_account_currency
 
@@ -138,6 +142,7 @@ def get_result(filters, account_details):
 	if filters.get("include_dimensions"):
 		accounting_dimensions = get_accounting_dimensions()
 
+	filters.opening_from_closing_balance = can_use_closing_balance_for_opening(filters)
 	gl_entries = get_gl_entries(filters, accounting_dimensions)
 
 	data = get_data_with_opening_closing(filters, account_details, accounting_dimensions, gl_entries)
@@ -199,12 +204,54 @@ def get_gl_entries(filters, accounting_dimensions):
 		as_dict=1,
 	)
 
+	if filters.get("opening_from_closing_balance"):
+		gl_entries = get_opening_entries(filters) + gl_entries
+
 	if filters.get("presentation_currency"):
 		return convert_to_presentation_currency(gl_entries, currency_map)
 	else:
 		return gl_entries
 
 
+def can_use_closing_balance_for_opening(filters):
+	"""Opening of filtered accounts can start from the last closing balances, unless the GL Entries are
+	filtered on fields that Account Closing Balance does not have."""
+	from frappe.desk.reportview import build_match_conditions
+
+	if not (filters.get("account") or filters.get("group_by") == "Group by Account"):
+		return False
+
+	for fieldname in (
+		"party_type",
+		"party",
+		"voucher_no",
+		"against_voucher_no",
+		"ignore_err",
+		"ignore_cr_dr_notes",
+		"show_cancelled_entries",
+		"show_opening_entries",
+	):
+		if filters.get(fieldname):
+			return False
+
+	return not build_match_conditions("GL Entry")
+
+
+def get_opening_entries(filters):
+	"""Opening balance of each account as on the from date, as GL Entries dated the day before."""
+	opening_entries = get_opening_balances(
+		filters.from_date,
+		filters.get("account"),
+		filters,
+		period_closing_voucher=get_last_period_closing_voucher(filters.company, filters.from_date),
+	)
+
+	for d in opening_entries:
+		d.update({"voucher_subtype": "", "against_voucher_type": "", "remarks": "", "party_type": ""})
+
+	return opening_entries
+
+
 def get_conditions(filters):
 	conditions = []
 
@@ -265,7 +312,10 @@ def get_conditions(filters):
 	if filters.get("party"):
 		conditions.append("party in %(party)s")
 
-	if not (
+	if filters.get("opening_from_closing_balance"):
+		# entries before the from date are taken from the opening balances
+		conditions.append("posting_date >=%(from_date)s")
+	elif not (
 		filters.get("account")
 		or filters.get("party")
 		or filters.get("group_by") in ["Group by Account", "Group by Party"]
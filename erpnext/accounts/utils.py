@@ -20,6 +20,7 @@ from frappe.utils import (
 	flt,
 	formatdate,
 	get_datetime,
+	get_first_day,
 	get_number_format_info,
 	getdate,
 	now,
@@ -32,7 +33,15 @@ import erpnext
 
 # imported to enable erpnext.accounts.utils.get_account_currency
 from erpnext.accounts.doctype.account.account import get_account_currency
+from erpnext.accounts.doctype.account_period_balance.account_period_balance import (
+	can_use_account_period_balances,
+	cancel_account_period_balances,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_dimensions
+from erpnext.accounts.doctype.payment_ledger_balance.payment_ledger_balance import (
+	get_against_vouchers,
+	update_payment_ledger_balances,
+)
 from erpnext.stock import get_warehouse_account_map
 from erpnext.stock.utils import get_stock_value_on
 
@@ -206,11 +215,12 @@ def get_balance_on(
 	if not cost_center and frappe.form_dict.get("cost_center"):
 		cost_center = frappe.form_dict.get("cost_center")
 
-	cond = ["is_cancelled=0"]
+	cond = []
+	gl_cond = ["is_cancelled=0"]
 	if start_date:
-		cond.append("posting_date >= %s" % frappe.db.escape(cstr(start_date)))
+		gl_cond.append("posting_date >= %s" % frappe.db.escape(cstr(start_date)))
 	if date:
-		cond.append("posting_date <= %s" % frappe.db.escape(cstr(date)))
+		gl_cond.append("posting_date <= %s" % frappe.db.escape(cstr(date)))
 	else:
 		# get balance of all entries that exist
 		date = nowdate()
@@ -294,21 +304,35 @@ def get_balance_on(
 	if account or (party_type and party) or account_type:
 		precision = get_currency_precision()
 		if in_account_currency:
-			select_field = (
-				"sum(round(debit_in_account_currency, %s)) - sum(round(credit_in_account_currency, %s))"
-			)
+			debit_field, credit_field = "debit_in_account_currency", "credit_in_account_currency"
 		else:
-			select_field = "sum(round(debit, %s)) - sum(round(credit, %s))"
+			debit_field, credit_field = "debit", "credit"
+
+		period_balance = 0.0
+		if not start_date and can_use_account_period_balances():
+			# stored balances of the periods before the date, only the GL Entries after them are summed
+			period_start_date = frappe.db.escape(cstr(get_first_day(date)))
+			period_balance = frappe.db.sql(
+				"""
+				SELECT sum({}) - sum({})
+				FROM `tabAccount Period Balance` gle
+				WHERE {}""".format(
+					debit_field,
+					credit_field,
+					" and ".join([*cond, f"period_start_date < {period_start_date}"]),
+				)
+			)[0][0]
+			gl_cond.append(f"posting_date >= {period_start_date}")
 
 		bal = frappe.db.sql(
 			"""
-			SELECT {}
+			SELECT sum(round({}, %s)) - sum(round({}, %s))
 			FROM `tabGL Entry` gle
-			WHERE {}""".format(select_field, " and ".join(cond)),
+			WHERE {}""".format(debit_field, credit_field, " and ".join(gl_cond + cond)),
 			(precision, precision),
 		)[0][0]
 		# if bal is None, return 0
-		return flt(bal)
+		return flt(period_balance) + flt(bal)
 
 
 def get_count_on(account, fieldname, date):
@@ -865,21 +889,27 @@ def update_accounting_ledgers_after_reference_removal(
 
 	# Payment Ledger
 	ple = qb.DocType("Payment Ledger Entry")
+	ple_conditions = (
+		(ple.against_voucher_type == ref_type) & (ple.against_voucher_no == ref_no) & (ple.delinked == 0)
+	)
+	if payment_name:
+		ple_conditions &= ple.voucher_no == payment_name
+
+	# entries are moved from the reference to the payments, the balances of both change
+	payments = qb.from_(ple).select(ple.voucher_type, ple.voucher_no).distinct().where(ple_conditions).run()
+
 	ple_update_query = (
 		qb.update(ple)
 		.set(ple.against_voucher_type, ple.voucher_type)
 		.set(ple.against_voucher_no, ple.voucher_no)
 		.set(ple.modified, now())
 		.set(ple.modified_by, frappe.session.user)
-		.where(
-			(ple.against_voucher_type == ref_type) & (ple.against_voucher_no == ref_no) & (ple.delinked == 0)
-		)
+		.where(ple_conditions)
 	)
-
-	if payment_name:
-		ple_update_query = ple_update_query.where(ple.voucher_no == payment_name)
 	ple_update_query.run()
 
+	update_payment_ledger_balances({(ref_type, ref_no), *payments})
+
 
 def remove_ref_from_advance_section(ref_doc: object = None):
 	# TODO: this might need some testing
@@ -1042,6 +1072,29 @@ def get_currency_precision():
 	return precision
 
 
+def get_ledger_version(company):
+	"""Token of the GL Entries of the company, changed whenever they are posted, cancelled or deleted."""
+	version = frappe.cache().hget("ledger_version", company)
+	if not version:
+		version = frappe.generate_hash(length=10)
+		frappe.cache().hset("ledger_version", company, version)
+
+	return version
+
+
+def clear_ledger_version(company=None):
+	"""Reset the ledger version of the company, or of all companies, now and once the transaction commits."""
+
+	def clear():
+		if company:
+			frappe.cache().hdel("ledger_version", company)
+		else:
+			frappe.cache().delete_value("ledger_version")
+
+	clear()
+	frappe.db.after_commit.add(clear)
+
+
 def get_held_invoices(party_type, party):
 	"""
 	Returns a list of names Purchase Invoices for the given party that are on hold
@@ -1405,11 +1458,17 @@ def repost_gle_for_stock_vouchers(
 
 
 def _delete_pl_entries(voucher_type, voucher_no):
+	against_vouchers = get_against_vouchers(voucher_type, voucher_no)
+
 	ple = qb.DocType("Payment Ledger Entry")
 	qb.from_(ple).delete().where((ple.voucher_type == voucher_type) & (ple.voucher_no == voucher_no)).run()
 
+	update_payment_ledger_balances(against_vouchers)
+
 
 def _delete_gl_entries(voucher_type, voucher_no):
+	cancel_account_period_balances(voucher_type, voucher_no)
+
 	gle = qb.DocType("GL Entry")
 	qb.from_(gle).delete().where((gle.voucher_type == voucher_type) & (gle.voucher_no == voucher_no)).run()
 
@@ -1769,6 +1828,78 @@ def create_payment_ledger_entry(
 			ple.flags.update_outstanding = update_outstanding
 			ple.submit()
 
+		# delinked entries are against the same vouchers as the entries cancelling them
+		update_payment_ledger_balances(
+			{(entry.against_voucher_type, entry.against_voucher_no) for entry in ple_map}
+		)
+
+
+def create_payment_ledger_entries_in_bulk(gl_entries, adv_adj=0, update_outstanding="Yes", from_repost=0):
+	"""Post the Payment Ledger Entries of new GL Entries with one multi-row insert.
+
+	Validations which read the accounts or the ledger run once per account, and the outstanding is
+	updated once per referenced voucher instead of once per entry.
+	"""
+	ple_map = get_payment_ledger_entries(gl_entries)
+	if not ple_map:
+		return
+
+	ple_entries = []
+	for entry in ple_map:
+		ple = frappe.get_doc(entry)
+		ple.name = frappe.generate_hash(length=10)
+		ple.flags.from_repost = from_repost
+		ple.run_method("validate")
+		ple_entries.append(ple)
+
+	insert_ledger_entries(ple_entries)
+
+	if not from_repost:
+		from erpnext.accounts.doctype.gl_entry.gl_entry import validate_balance_type, validate_frozen_account
+
+		for account, ple in {ple.account: ple for ple in ple_entries}.items():
+			validate_frozen_account(account, adv_adj)
+			ple.validate_account_details()
+			validate_balance_type(account, adv_adj)
+
+		for ple in ple_entries:
+			ple.validate_dimensions_for_pl_and_bs()
+			ple.validate_allowed_dimensions()
+
+	if update_outstanding == "Yes" and not frappe.flags.is_reverse_depr_entry:
+		vouchers = dict.fromkeys(
+			(ple.against_voucher_type, ple.against_voucher_no, ple.account, ple.party_type, ple.party)
+			for ple in ple_entries
+			if ple.against_voucher_type in ["Journal Entry", "Sales Invoice", "Purchase Invoice", "Fees"]
+		)
+		for voucher in vouchers:
+			update_voucher_outstanding(*voucher)
+
+	update_payment_ledger_balances(
+		{(entry.against_voucher_type, entry.against_voucher_no) for entry in ple_map}
+	)
+
+
+def insert_ledger_entries(entries):
+	"""Insert submitted ledger entries, already named and validated in memory, with multi-row inserts."""
+	if not entries:
+		return
+
+	timestamp = now()
+	user = frappe.session.user
+
+	rows = []
+	for entry in entries:
+		entry.docstatus = 1
+		entry.owner = entry.modified_by = user
+		entry.creation = entry.modified = timestamp
+		rows.append(entry.get_valid_dict(convert_dates_to_str=True))
+
+	fields = list(rows[0])
+	frappe.db.bulk_insert(
+		entries[0].doctype, fields=fields, values=[tuple(row.get(field) for field in fields) for row in rows]
+	)
+
 
 def update_voucher_outstanding(voucher_type, voucher_no, account, party_type, party):
 	ple = frappe.qb.DocType("Payment Ledger Entry")
@@ -14,6 +14,11 @@ from frappe.utils import nowdate, today, unique
 from pypika import Order
 
 import erpnext
+from erpnext.stock.doctype.item_search_token.item_search_token import (
+	can_use_item_search_index,
+	get_items_matching_tokens_query,
+	get_search_tokens,
+)
 from erpnext.stock.get_item_details import _get_item_tax_template
 
 
@@ -198,7 +203,19 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 			filters.pop("supplier", None)
 
 	description_cond = ""
-	if frappe.db.count(doctype, cache=True) < 50000:
+	search_index_cond = ""
+	search_tokens = get_search_tokens(txt) if can_use_item_search_index() else None
+
+	if search_tokens:
+		# only the items having every trigram of the search text can match, the conditions
+		# below are still applied to them as the tokens can also be spread across fields
+		search_index_cond = "and tabItem.name in ({})".format(
+			get_items_matching_tokens_query("search_tokens", "search_token_count")
+		)
+		description_cond = """or tabItem.description LIKE %(txt)s
+			or tabItem.name in (select parent from `tabItem Supplier` where supplier_part_no LIKE %(txt)s)
+			or tabItem.name in (select parent from `tabItem Customer Detail` where ref_code LIKE %(txt)s)"""
+	elif frappe.db.count(doctype, cache=True) < 50000:
 		# scan description only if items are less than 50000
 		description_cond = "or tabItem.description LIKE %(txt)s"
 
@@ -212,7 +229,7 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 			and (tabItem.end_of_life > %(today)s or ifnull(tabItem.end_of_life, '0000-00-00')='0000-00-00')
 			and ({scond} or tabItem.item_code IN (select parent from `tabItem Barcode` where barcode LIKE %(txt)s)
 				{description_cond})
-			{fcond} {mcond}
+			{search_index_cond} {fcond} {mcond}
 		order by
 			if(locate(%(_txt)s, name), locate(%(_txt)s, name), 99999),
 			if(locate(%(_txt)s, item_name), locate(%(_txt)s, item_name), 99999),
@@ -224,6 +241,7 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 			fcond=get_filters_cond(doctype, filters, conditions).replace("%", "%%"),
 			mcond=get_match_cond(doctype).replace("%", "%%"),
 			description_cond=description_cond,
+			search_index_cond=search_index_cond,
 		),
 		{
 			"today": nowdate(),
@@ -231,6 +249,8 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 			"_txt": txt.replace("%", ""),
 			"start": start,
 			"page_len": page_len,
+			"search_tokens": tuple(search_tokens or ("",)),
+			"search_token_count": len(search_tokens or ()),
 		},
 		as_dict=as_dict,
 	)
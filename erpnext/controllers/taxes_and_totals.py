@@ -259,15 +259,14 @@ class calculate_taxes_and_totals:
 		if not any(cint(tax.included_in_print_rate) for tax in self.doc.get("taxes")):
 			return
 
-		for item in self._items:
-			item_tax_map = self._load_item_tax_rate(item.item_tax_rate)
+		for item, item_tax_rates in zip(self._items, self.get_item_tax_rates(), strict=True):
 			cumulated_tax_fraction = 0
 			total_inclusive_tax_amount_per_qty = 0
 			for i, tax in enumerate(self.doc.get("taxes")):
 				(
 					tax.tax_fraction_for_current_item,
 					inclusive_tax_amount_per_qty,
-				) = self.get_current_tax_fraction(tax, item_tax_map)
+				) = self.get_current_tax_fraction(tax, None, tax_rate=item_tax_rates[i])
 
 				if i == 0:
 					tax.grand_total_fraction_for_current_item = 1 + tax.tax_fraction_for_current_item
@@ -298,7 +297,33 @@ class calculate_taxes_and_totals:
 	def _load_item_tax_rate(self, item_tax_rate):
 		return json.loads(item_tax_rate) if item_tax_rate else {}
 
-	def get_current_tax_fraction(self, tax, item_tax_map):
+	def get_item_tax_rates(self):
+		"""
+		Rate of every tax row for every item, as a list per item in the order of the taxes.
+
+		Items mostly share a few Item Tax Templates, so each distinct `item_tax_rate` is parsed
+		and resolved against the taxes only once.
+		"""
+		taxes = self.doc.get("taxes")
+		rate_precisions = [self.doc.precision("rate", tax) for tax in taxes]
+
+		rates_by_item_tax_rate = {}
+		item_tax_rates = []
+		for item in self._items:
+			if item.item_tax_rate not in rates_by_item_tax_rate:
+				item_tax_map = self._load_item_tax_rate(item.item_tax_rate)
+				rates_by_item_tax_rate[item.item_tax_rate] = [
+					flt(item_tax_map.get(tax.account_head), precision)
+					if tax.account_head in item_tax_map
+					else tax.rate
+					for tax, precision in zip(taxes, rate_precisions, strict=True)
+				]
+
+			item_tax_rates.append(rates_by_item_tax_rate[item.item_tax_rate])
+
+		return item_tax_rates
+
+	def get_current_tax_fraction(self, tax, item_tax_map, tax_rate=None):
 		"""
 		Get tax fraction for calculating tax exclusive amount
 		from tax inclusive amount
@@ -307,7 +332,8 @@ class calculate_taxes_and_totals:
 		inclusive_tax_amount_per_qty = 0
 
 		if cint(tax.included_in_print_rate):
-			tax_rate = self._get_tax_rate(tax, item_tax_map)
+			if tax_rate is None:
+				tax_rate = self._get_tax_rate(tax, item_tax_map)
 
 			if tax.charge_type == "On Net Total":
 				current_tax_fraction = tax_rate / 100.0
@@ -376,24 +402,35 @@ class calculate_taxes_and_totals:
 			]
 		)
 
+		# everything that does not change from item to item is resolved once, the rates as a matrix
+		# of items by taxes, and the amounts are then accumulated in the same order as before so the
+		# totals and their rounding stay exactly the same
+		taxes = self.doc.get("taxes")
+		item_tax_rates = self.get_item_tax_rates()
+		tax_precisions = [tax.precision("tax_amount") for tax in taxes]
+		round_row_wise_tax = frappe.flags.round_row_wise_tax
+		accumulate_tax_amount = not (
+			self.discount_amount_applied and self.doc.apply_discount_on == "Grand Total"
+		)
+		last_item_idx = len(self._items) - 1
+
 		for n, item in enumerate(self._items):
-			item_tax_map = self._load_item_tax_rate(item.item_tax_rate)
-			for i, tax in enumerate(self.doc.get("taxes")):
+			for i, tax in enumerate(taxes):
 				# tax_amount represents the amount of tax for the current step
-				current_tax_amount = self.get_current_tax_amount(item, tax, item_tax_map)
-				if frappe.flags.round_row_wise_tax:
-					current_tax_amount = flt(current_tax_amount, tax.precision("tax_amount"))
+				current_tax_amount = self.get_current_tax_amount(
+					item, tax, None, tax_rate=item_tax_rates[n][i]
+				)
+				if round_row_wise_tax:
+					current_tax_amount = flt(current_tax_amount, tax_precisions[i])
 
 				# Adjust divisional loss to the last item
 				if tax.charge_type == "Actual":
 					actual_tax_dict[tax.idx] -= current_tax_amount
-					if n == len(self._items) - 1:
+					if n == last_item_idx:
 						current_tax_amount += actual_tax_dict[tax.idx]
 
 				# accumulate tax amount into tax.tax_amount
-				if tax.charge_type != "Actual" and not (
-					self.discount_amount_applied and self.doc.apply_discount_on == "Grand Total"
-				):
+				if tax.charge_type != "Actual" and accumulate_tax_amount:
 					tax.tax_amount += current_tax_amount
 
 				# store tax_amount for current item as it will be used for
@@ -413,11 +450,11 @@ class calculate_taxes_and_totals:
 					tax.grand_total_for_current_item = flt(item.net_amount + current_tax_amount)
 				else:
 					tax.grand_total_for_current_item = flt(
-						self.doc.get("taxes")[i - 1].grand_total_for_current_item + current_tax_amount
+						taxes[i - 1].grand_total_for_current_item + current_tax_amount
 					)
 
 				# set precision in the last item iteration
-				if n == len(self._items) - 1:
+				if n == last_item_idx:
 					self.round_off_totals(tax)
 					self._set_in_company_currency(tax, ["tax_amount", "tax_amount_after_discount_amount"])
 
@@ -428,7 +465,7 @@ class calculate_taxes_and_totals:
 
 					# adjust Discount Amount loss in last tax iteration
 					if (
-						i == (len(self.doc.get("taxes")) - 1)
+						i == (len(taxes) - 1)
 						and self.discount_amount_applied
 						and self.doc.discount_amount
 						and self.doc.apply_discount_on == "Grand Total"
@@ -462,8 +499,10 @@ class calculate_taxes_and_totals:
 		else:
 			tax.total = flt(self.doc.get("taxes")[row_idx - 1].total + tax_amount, tax.precision("total"))
 
-	def get_current_tax_amount(self, item, tax, item_tax_map):
-		tax_rate = self._get_tax_rate(tax, item_tax_map)
+	def get_current_tax_amount(self, item, tax, item_tax_map, tax_rate=None):
+		if tax_rate is None:
+			tax_rate = self._get_tax_rate(tax, item_tax_map)
+
 		current_tax_amount = 0.0
 
 		if tax.charge_type == "Actual":
@@ -0,0 +1,88 @@
+import json
+from unittest.mock import patch
+
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.controllers.taxes_and_totals import calculate_taxes_and_totals
+
+
+class TestTaxesAndTotals(FrappeTestCase):
+	def test_item_tax_rates_match_per_item_rates(self):
+		def get_tax_rates_per_item(calculator):
+			# the rates resolved item by item, as before they were shared per item tax template
+			return [
+				[
+					calculator._get_tax_rate(tax, calculator._load_item_tax_rate(item.item_tax_rate))
+					for tax in calculator.doc.get("taxes")
+				]
+				for item in calculator._items
+			]
+
+		for included_in_print_rate in (0, 1):
+			invoice = make_invoice(included_in_print_rate)
+			calculate_taxes_and_totals(invoice)
+
+			expected_invoice = make_invoice(included_in_print_rate)
+			with patch.object(calculate_taxes_and_totals, "get_item_tax_rates", get_tax_rates_per_item):
+				calculate_taxes_and_totals(expected_invoice)
+
+			for fieldname in ("net_total", "total_taxes_and_charges", "grand_total", "rounded_total"):
+				self.assertEqual(invoice.get(fieldname), expected_invoice.get(fieldname), fieldname)
+
+			for item, expected_item in zip(invoice.items, expected_invoice.items, strict=True):
+				for fieldname in ("net_rate", "net_amount", "base_net_amount"):
+					self.assertEqual(item.get(fieldname), expected_item.get(fieldname), fieldname)
+
+			for tax, expected_tax in zip(invoice.taxes, expected_invoice.taxes, strict=True):
+				for fieldname in ("tax_amount", "tax_amount_after_discount_amount", "total"):
+					self.assertEqual(tax.get(fieldname), expected_tax.get(fieldname), fieldname)
+
+
+def make_invoice(included_in_print_rate=0):
+	si = create_sales_invoice(qty=3, rate=99.99, do_not_save=True)
+
+	vat_template = json.dumps({"_Test Account VAT - _TC": 12.345})
+	exempt_template = json.dumps({"_Test Account VAT - _TC": 0, "_Test Account Service Tax - _TC": 18})
+
+	# items with a template, sharing it with other items, and without any template
+	si.items[0].item_tax_rate = vat_template
+	for qty, rate, item_tax_rate in (
+		(7, 10.01, exempt_template),
+		(1, 333.33, None),
+		(2.5, 47.5, vat_template),
+		(4, 12.34, "{}"),
+		(11, 0.99, exempt_template),
+	):
+		si.append(
+			"items",
+			{
+				**si.items[0].as_dict(no_default_fields=True),
+				"qty": qty,
+				"rate": rate,
+				"price_list_rate": rate,
+				"item_tax_rate": item_tax_rate,
+			},
+		)
+
+	for account_head, charge_type, rate, row_id, tax_amount, inclusive in (
+		("_Test Account VAT - _TC", "On Net Total", 6, None, 0, included_in_print_rate),
+		("_Test Account Service Tax - _TC", "On Net Total", 12.5, None, 0, included_in_print_rate),
+		("_Test Account Excise Duty - _TC", "On Previous Row Total", 3, 2, 0, included_in_print_rate),
+		("_Test Account Shipping Charges - _TC", "Actual", 0, None, 100, 0),
+	):
+		si.append(
+			"taxes",
+			{
+				"account_head": account_head,
+				"charge_type": charge_type,
+				"rate": rate,
+				"row_id": row_id,
+				"tax_amount": tax_amount,
+				"included_in_print_rate": inclusive,
+				"cost_center": "Main - _TC",
+				"description": account_head,
+			},
+		)
+
+	return si
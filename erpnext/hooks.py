@@ -460,6 +460,7 @@ scheduler_events = {
 	"monthly_long": [
 		"erpnext.accounts.deferred_revenue.process_deferred_accounting",
 		"erpnext.accounts.utils.auto_create_exchange_rate_revaluation_monthly",
+		"erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot.create_stock_balance_snapshots",
 	],
 }
 
@@ -14,6 +14,7 @@ from frappe.utils import cint, cstr, flt, parse_json, today
 from frappe.website.website_generator import WebsiteGenerator
 
 import erpnext
+from erpnext.manufacturing.doctype.bom.bom_explosion import clear_bom_requirements, get_bom_requirements
 from erpnext.setup.utils import get_exchange_rate
 from erpnext.stock.doctype.item.item import get_item_details
 from erpnext.stock.get_item_details import get_conversion_factor, get_price_list_rate
@@ -270,6 +271,7 @@ class BOM(WebsiteGenerator):
 
 	def on_update(self):
 		frappe.cache().hdel("bom_children", self.name)
+		clear_bom_requirements(self.name)
 		self.check_recursion()
 
 	def on_submit(self):
@@ -730,6 +732,7 @@ class BOM(WebsiteGenerator):
 		if save_updates:
 			# not via doc event, table is not regenerated and needs updation
 			self.calculate_exploded_cost()
+			clear_bom_requirements(self.name)
 
 		old_cost = self.total_cost
 
@@ -920,45 +923,23 @@ class BOM(WebsiteGenerator):
 
 	def get_child_exploded_items(self, bom_no, stock_qty):
 		"""Add all items from Flat BOM of child BOM"""
-		# Did not use qty_consumed_per_unit in the query, as it leads to rounding loss
-		child_fb_items = frappe.db.sql(
-			"""
-			SELECT
-				bom_item.item_code,
-				bom_item.item_name,
-				bom_item.description,
-				bom_item.source_warehouse,
-				bom_item.operation,
-				bom_item.stock_uom,
-				bom_item.stock_qty,
-				bom_item.rate,
-				bom_item.include_item_in_manufacturing,
-				bom_item.sourced_by_supplier,
-				bom_item.stock_qty / ifnull(bom.quantity, 1) AS qty_consumed_per_unit
-			FROM `tabBOM Explosion Item` bom_item, `tabBOM` bom
-			WHERE
-				bom_item.parent = bom.name
-				AND bom.name = %s
-				AND bom.docstatus = 1
-		""",
-			bom_no,
-			as_dict=1,
-		)
+		child_fb_items = get_bom_requirements(bom_no, stock_qty, exploded=True, submitted_only=True)
 
-		for d in child_fb_items:
+		for i, item_code in enumerate(child_fb_items["item_code"]):
 			self.add_to_cur_exploded_items(
 				frappe._dict(
 					{
-						"item_code": d["item_code"],
-						"item_name": d["item_name"],
-						"source_warehouse": d["source_warehouse"],
-						"operation": d["operation"],
-						"description": d["description"],
-						"stock_uom": d["stock_uom"],
-						"stock_qty": d["qty_consumed_per_unit"] * stock_qty,
-						"rate": flt(d["rate"]),
-						"include_item_in_manufacturing": d.get("include_item_in_manufacturing", 0),
-						"sourced_by_supplier": d.get("sourced_by_supplier", 0),
+						"item_code": item_code,
+						"item_name": child_fb_items["item_name"][i],
+						"source_warehouse": child_fb_items["source_warehouse"][i],
+						"operation": child_fb_items["operation"][i],
+						"description": child_fb_items["description"][i],
+						"stock_uom": child_fb_items["stock_uom"][i],
+						"stock_qty": child_fb_items["stock_qty"][i],
+						"rate": flt(child_fb_items["rate"][i]),
+						"include_item_in_manufacturing": child_fb_items["include_item_in_manufacturing"][i]
+						or 0,
+						"sourced_by_supplier": child_fb_items["sourced_by_supplier"][i] or 0,
 					}
 				)
 			)
@@ -969,6 +950,7 @@ class BOM(WebsiteGenerator):
 
 		if save:
 			frappe.db.sql("""delete from `tabBOM Explosion Item` where parent=%s""", self.name)
+			clear_bom_requirements(self.name)
 
 		for d in sorted(self.cur_exploded_items, key=itemgetter(0)):
 			ch = self.append("exploded_items", {})
@@ -1236,7 +1218,11 @@ def get_bom_items_as_dict(
 			["Cost Center", "cost_center", "cost_center"],
 			["Warehouse", "default_warehouse", ""],
 		]:
-			company_in_record = frappe.db.get_value(d[0], item_details.get(d[1]), "company")
+			company_in_record = (
+				frappe.get_cached_value(d[0], item_details.get(d[1]), "company")
+				if item_details.get(d[1])
+				else None
+			)
 			if not item_details.get(d[1]) or (company_in_record and company != company_in_record):
 				item_dict[item][d[1]] = frappe.get_cached_value("Company", company, d[2]) if d[2] else None
 
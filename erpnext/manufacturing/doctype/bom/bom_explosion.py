@@ -0,0 +1,151 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""Requirements of BOMs, shared by the BOM explosion and production planning.
+
+The rows of a BOM are read once per version of the BOM and cached, keyed by the BOM and its modified
+timestamp. Quantities are kept per unit of the BOM and are scaled by the qty asked for. Requirements are
+returned as one array per field in REQUIREMENT_FIELDS, the arrays are shared with the cache and must not
+be modified, except for the scaled `stock_qty`.
+"""
+
+import frappe
+from frappe.utils import cstr, flt
+
+CACHE_KEY = "bom_requirements"
+
+REQUIREMENT_FIELDS = (
+	"item_code",
+	"item_name",
+	"bom_no",
+	"description",
+	"source_warehouse",
+	"operation",
+	"stock_uom",
+	"rate",
+	"include_item_in_manufacturing",
+	"sourced_by_supplier",
+	"stock_qty",
+)
+
+
+class BOMExplosion:
+	"""Explodes BOMs for a run, reading the requirements of each BOM at most once."""
+
+	def __init__(self):
+		self.requirements = {}
+
+	def get_requirements(
+		self, bom_no: str, qty: float = 1, exploded: bool = False, submitted_only: bool = False
+	) -> dict[str, list]:
+		key = (bom_no, exploded)
+		if key not in self.requirements:
+			self.requirements[key] = get_cached_requirements(bom_no, exploded)
+
+		return scale_requirements(self.requirements[key], qty, submitted_only)
+
+
+def get_bom_requirements(
+	bom_no: str, qty: float = 1, exploded: bool = False, submitted_only: bool = False
+) -> dict[str, list]:
+	"""Requirements of `qty` units of the BOM, in the order of its rows.
+
+	Returns the rows of the BOM Explosion Item table if `exploded` is set, of the BOM Item table otherwise.
+	Cancelled BOMs have no requirements, nor do draft BOMs if `submitted_only` is set.
+	"""
+	return scale_requirements(get_cached_requirements(bom_no, exploded), qty, submitted_only)
+
+
+def get_cached_requirements(bom_no: str, exploded: bool = False) -> dict:
+	bom = frappe.db.get_value("BOM", bom_no, ["modified", "docstatus", "quantity"], as_dict=True)
+	if not bom:
+		return {"docstatus": None, "columns": get_empty_columns()}
+
+	key = get_cache_field(bom_no, exploded)
+	modified = cstr(bom.modified)
+
+	cached = frappe.cache().hget(CACHE_KEY, key)
+	if cached and cached["modified"] == modified:
+		return cached
+
+	requirements = {
+		"modified": modified,
+		"docstatus": bom.docstatus,
+		"columns": get_requirement_columns(bom_no, flt(bom.quantity) or 1, exploded),
+	}
+	frappe.cache().hset(CACHE_KEY, key, requirements)
+
+	return requirements
+
+
+def get_requirement_columns(bom_no: str, bom_qty: float, exploded: bool) -> dict[str, list]:
+	doctype = "BOM Explosion Item" if exploded else "BOM Item"
+	fields = [field for field in REQUIREMENT_FIELDS if not (exploded and field == "bom_no")]
+
+	columns = get_empty_columns()
+	for row in frappe.get_all(
+		doctype,
+		filters={
+			"parent": bom_no,
+			"parenttype": "BOM",
+			"parentfield": "exploded_items" if exploded else "items",
+		},
+		fields=fields,
+		order_by="idx",
+	):
+		for field in REQUIREMENT_FIELDS:
+			columns[field].append(row.get(field))
+
+	columns["stock_qty"] = [flt(qty) / bom_qty for qty in columns["stock_qty"]]
+
+	return columns
+
+
+def scale_requirements(requirements: dict, qty: float, submitted_only: bool = False) -> dict[str, list]:
+	if requirements["docstatus"] == 2 or (submitted_only and requirements["docstatus"] != 1):
+		return get_empty_columns()
+
+	columns = dict(requirements["columns"])
+	columns["stock_qty"] = [stock_qty * flt(qty) for stock_qty in columns["stock_qty"]]
+
+	return columns
+
+
+def group_requirements(
+	columns: dict[str, list], group_by: tuple[str, ...] = ("item_code",)
+) -> dict[str, list]:
+	"""Sum the `stock_qty` of rows with the same `group_by` values, keeping the other values of the first row."""
+	positions = {}
+	grouped = get_empty_columns()
+
+	for i, key in enumerate(zip(*(columns[field] for field in group_by), strict=True)):
+		if key in positions:
+			grouped["stock_qty"][positions[key]] += columns["stock_qty"][i]
+			continue
+
+		positions[key] = len(positions)
+		for field in REQUIREMENT_FIELDS:
+			grouped[field].append(columns[field][i])
+
+	return grouped
+
+
+def get_empty_columns() -> dict[str, list]:
+	return {field: [] for field in REQUIREMENT_FIELDS}
+
+
+def get_cache_field(bom_no: str, exploded: bool) -> str:
+	return f"{bom_no}::{'exploded_items' if exploded else 'items'}"
+
+
+def clear_bom_requirements(bom_no: str | None = None) -> None:
+	"""Clear the cached requirements, of all BOMs if `bom_no` is not passed.
+
+	Needed when rows are updated without changing the modified timestamp of the BOM, like cost updates.
+	"""
+	if not bom_no:
+		frappe.cache().delete_key(CACHE_KEY)
+		return
+
+	for exploded in (False, True):
+		frappe.cache().hdel(CACHE_KEY, get_cache_field(bom_no, exploded))
@@ -755,6 +755,32 @@ class TestBOM(FrappeTestCase):
 		self.assertTrue("_Test RM Item 2 Fixed Asset Item" not in items)
 		self.assertTrue("_Test RM Item 3 Manufacture Item" in items)
 
+	def test_bom_requirements(self):
+		from erpnext.manufacturing.doctype.bom.bom_explosion import get_bom_requirements
+		from erpnext.manufacturing.doctype.production_plan.test_production_plan import make_bom
+
+		rm_item = make_item(properties={"is_stock_item": 1, "valuation_rate": 100}).name
+		fg_item = make_item(properties={"is_stock_item": 1}).name
+
+		bom = make_bom(item=fg_item, raw_materials=[rm_item], rm_qty=4, quantity=2, do_not_submit=True)
+
+		requirements = get_bom_requirements(bom.name, qty=3)
+		self.assertEqual(requirements["item_code"], [rm_item])
+		self.assertEqual(requirements["stock_qty"], [6])
+
+		# draft BOMs are skipped when only submitted BOMs are asked for
+		self.assertEqual(get_bom_requirements(bom.name, exploded=True, submitted_only=True)["item_code"], [])
+
+		# saving the BOM changes its modified timestamp, so the cached rows are not used
+		bom.items[0].qty = 8
+		bom.save()
+		bom.submit()
+
+		requirements = get_bom_requirements(bom.name, qty=3, exploded=True, submitted_only=True)
+		self.assertEqual(requirements["item_code"], [rm_item])
+		self.assertEqual(requirements["stock_qty"], [12])
+		self.assertEqual(requirements["rate"], [100])
+
 
 def get_default_bom(item_code="_Test FG Item 2"):
 	return frappe.db.get_value("BOM", {"item": item_code, "is_active": 1, "is_default": 1})
@@ -0,0 +1,428 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+from collections import defaultdict, deque
+
+import frappe
+from frappe.model.meta import get_field_precision
+from frappe.utils import create_batch, flt
+
+from erpnext.manufacturing.doctype.bom.bom import get_bom_item_rate
+from erpnext.manufacturing.doctype.bom.bom_explosion import clear_bom_requirements
+
+BOM_FIELDS = (
+	"name",
+	"item",
+	"company",
+	"currency",
+	"quantity",
+	"conversion_rate",
+	"plc_conversion_rate",
+	"rm_cost_as_per",
+	"buying_price_list",
+	"set_rate_of_sub_assembly_item_based_on_bom",
+	"with_operations",
+	"fg_based_operating_cost",
+	"operating_cost_per_bom_quantity",
+	"bom_creator",
+	"operating_cost",
+	"base_operating_cost",
+	"raw_material_cost",
+	"base_raw_material_cost",
+	"scrap_material_cost",
+	"base_scrap_material_cost",
+	"total_cost",
+	"base_total_cost",
+)
+
+CHILD_FIELDS = {
+	"BOM Item": (
+		"item_code",
+		"bom_no",
+		"qty",
+		"uom",
+		"stock_qty",
+		"stock_uom",
+		"conversion_factor",
+		"sourced_by_supplier",
+		"is_stock_item",
+		"rate",
+		"base_rate",
+		"amount",
+		"base_amount",
+		"qty_consumed_per_unit",
+	),
+	"BOM Operation": (
+		"workstation",
+		"time_in_mins",
+		"batch_size",
+		"set_cost_based_on_bom_qty",
+		"hour_rate",
+		"base_hour_rate",
+		"operating_cost",
+		"base_operating_cost",
+		"cost_per_unit",
+		"base_cost_per_unit",
+	),
+	"BOM Scrap Item": ("stock_qty", "rate", "base_rate", "amount", "base_amount"),
+	"BOM Explosion Item": ("item_code", "stock_qty", "rate", "amount"),
+}
+
+
+class BOMCostRollup:
+	"""Update the cost of every active BOM, sub-assemblies before the BOMs using them.
+
+	The BOM graph is loaded once and the costs are computed in memory the same way as
+	`BOM.calculate_cost(save_updates=True, update_hour_rate=True)`, with the rates of raw materials
+	and the cost of sub-assembly BOMs looked up from maps instead of queried for every row.
+	Only the changed values are written back.
+	"""
+
+	def __init__(self, batch_size: int = 500) -> None:
+		self.batch_size = batch_size
+		self.boms = {}
+		self.parent_boms = defaultdict(set)
+		self.child_boms = defaultdict(set)
+		self.rows = {}
+
+		# rates and costs reused across BOMs
+		self.rm_rates = {}
+		self.exploded_rates = {}
+		self.unit_costs = {}
+		self.precisions = {}
+		self.workstation_rates = {}
+		self.customer_provided_items = set()
+
+		self.updates = defaultdict(dict)
+		self.cost_changes = []
+
+	def run(self) -> list[dict]:
+		"Update the costs, returns the BOMs whose total cost changed."
+		self.load_bom_graph()
+		self.workstation_rates = dict(
+			frappe.get_all("Workstation", fields=["name", "hour_rate"], as_list=True)
+		)
+		self.customer_provided_items = set(
+			frappe.get_all("Item", filters={"is_customer_provided_item": 1}, pluck="name")
+		)
+
+		for boms in create_batch(self.get_sorted_boms(), self.batch_size):
+			self.load_rows(boms)
+			for bom_no in boms:
+				self.calculate_cost(self.boms[bom_no])
+				self.release_child_boms(bom_no)
+
+			self.write_updates()
+
+			if not frappe.flags.in_test:
+				frappe.db.commit()  # nosemgrep
+
+		return self.cost_changes
+
+	def load_bom_graph(self) -> None:
+		self.boms = {
+			bom.name: bom
+			for bom in frappe.get_all(
+				"BOM", filters={"docstatus": 1, "is_active": 1}, fields=list(BOM_FIELDS), order_by=None
+			)
+		}
+
+		bom_item = frappe.qb.DocType("BOM Item")
+		for parent, bom_no in (
+			frappe.qb.from_(bom_item)
+			.select(bom_item.parent, bom_item.bom_no)
+			.distinct()
+			.where((bom_item.parenttype == "BOM") & (bom_item.docstatus == 1) & (bom_item.bom_no != ""))
+		).run():
+			# BOMs which are not updated keep their cost, so they are not dependencies
+			if parent in self.boms and bom_no in self.boms and parent != bom_no:
+				self.parent_boms[bom_no].add(parent)
+				self.child_boms[parent].add(bom_no)
+
+	def get_sorted_boms(self) -> list[str]:
+		"BOMs in topological order, BOMs in a recursion are left out as their cost can not be resolved."
+		pending_children = {bom_no: len(self.child_boms[bom_no]) for bom_no in self.boms}
+		queue = deque(sorted(bom_no for bom_no, count in pending_children.items() if not count))
+
+		sorted_boms = []
+		while queue:
+			bom_no = queue.popleft()
+			sorted_boms.append(bom_no)
+
+			for parent in sorted(self.parent_boms[bom_no]):
+				pending_children[parent] -= 1
+				if not pending_children[parent]:
+					queue.append(parent)
+
+		return sorted_boms
+
+	def load_rows(self, boms: list[str]) -> None:
+		self.rows = defaultdict(lambda: defaultdict(list))
+		for doctype, fields in CHILD_FIELDS.items():
+			for row in frappe.get_all(
+				doctype,
+				filters={"parent": ("in", boms), "parenttype": "BOM"},
+				fields=["name", "parent", *fields],
+				order_by="idx",
+			):
+				self.rows[doctype][row.parent].append(row)
+
+	def release_child_boms(self, bom_no: str) -> None:
+		"Drop the exploded rates of sub-assemblies once every BOM using them is updated."
+		for child in self.child_boms[bom_no]:
+			self.parent_boms[child].discard(bom_no)
+			if not self.parent_boms[child]:
+				self.exploded_rates.pop(child, None)
+
+	def get_precision(self, doctype: str, fieldname: str, currency: str | None = None) -> int:
+		key = (doctype, fieldname, currency)
+		if key not in self.precisions:
+			df = frappe.get_meta(doctype).get_field(fieldname)
+			self.precisions[key] = get_field_precision(df, currency=currency)
+
+		return self.precisions[key]
+
+	def calculate_cost(self, bom: dict) -> None:
+		bom.rm_cost_as_per = bom.rm_cost_as_per or "Valuation Rate"
+
+		operating_cost, base_operating_cost = self.calculate_op_cost(bom)
+		raw_material_cost, base_raw_material_cost = self.calculate_rm_cost(bom)
+		scrap_material_cost, base_scrap_material_cost = self.calculate_sm_cost(bom)
+		self.calculate_exploded_cost(bom)
+
+		old_total_cost = bom.total_cost
+		self.set_values(
+			"BOM",
+			bom,
+			{
+				"operating_cost": operating_cost,
+				"base_operating_cost": base_operating_cost,
+				"raw_material_cost": raw_material_cost,
+				"base_raw_material_cost": base_raw_material_cost,
+				"scrap_material_cost": scrap_material_cost,
+				"base_scrap_material_cost": base_scrap_material_cost,
+				"total_cost": operating_cost + raw_material_cost - scrap_material_cost,
+				"base_total_cost": base_operating_cost + base_raw_material_cost - base_scrap_material_cost,
+			},
+		)
+
+		if flt(bom.total_cost, 9) != flt(old_total_cost, 9):
+			self.cost_changes.append(
+				{
+					"bom": bom.name,
+					"item": bom.item,
+					"currency": bom.currency,
+					"old_total_cost": flt(old_total_cost),
+					"new_total_cost": flt(bom.total_cost),
+				}
+			)
+
+	def calculate_op_cost(self, bom: dict) -> tuple[float, float]:
+		operating_cost = base_operating_cost = 0
+		conversion_rate = flt(bom.conversion_rate)
+
+		if bom.with_operations:
+			for row in self.rows["BOM Operation"][bom.name]:
+				if row.workstation:
+					self.update_rate_and_time(row, conversion_rate)
+
+				if row.set_cost_based_on_bom_qty:
+					operating_cost += flt(flt(row.cost_per_unit) * flt(bom.quantity))
+					base_operating_cost += flt(flt(row.base_cost_per_unit) * flt(bom.quantity))
+				else:
+					operating_cost += flt(row.operating_cost)
+					base_operating_cost += flt(row.base_operating_cost)
+
+		elif bom.fg_based_operating_cost:
+			operating_cost = flt(bom.quantity) * flt(bom.operating_cost_per_bom_quantity)
+			base_operating_cost = flt(operating_cost * bom.conversion_rate, 2)
+
+		return operating_cost, base_operating_cost
+
+	def update_rate_and_time(self, row: dict, conversion_rate: float) -> None:
+		values = {}
+		hour_rate = flt(self.workstation_rates.get(row.workstation))
+		if hour_rate:
+			values["hour_rate"] = hour_rate / conversion_rate if conversion_rate else hour_rate
+
+		hour_rate = flt(values.get("hour_rate", row.hour_rate))
+		if hour_rate and row.time_in_mins:
+			operating_cost = hour_rate * flt(row.time_in_mins) / 60.0
+			base_operating_cost = flt(operating_cost) * conversion_rate
+			values.update(
+				{
+					"base_hour_rate": hour_rate * conversion_rate,
+					"operating_cost": operating_cost,
+					"base_operating_cost": base_operating_cost,
+					"cost_per_unit": operating_cost / (row.batch_size or 1.0),
+					"base_cost_per_unit": base_operating_cost / (row.batch_size or 1.0),
+				}
+			)
+
+		self.set_values("BOM Operation", row, values)
+
+	def calculate_rm_cost(self, bom: dict) -> tuple[float, float]:
+		total_rm_cost = base_total_rm_cost = 0
+		conversion_rate = flt(bom.conversion_rate)
+
+		rate_precision = self.get_precision("BOM Item", "rate", bom.currency)
+		qty_precision = self.get_precision("BOM Item", "qty")
+		stock_qty_precision = self.get_precision("BOM Item", "stock_qty")
+		quantity = flt(bom.quantity, self.get_precision("BOM", "quantity"))
+
+		for row in self.rows["BOM Item"][bom.name]:
+			if not row.is_stock_item and bom.rm_cost_as_per == "Valuation Rate":
+				continue
+
+			rate = row.rate if bom.bom_creator else self.get_rm_rate(bom, row)
+			amount = flt(rate, rate_precision) * flt(row.qty, qty_precision)
+			self.set_values(
+				"BOM Item",
+				row,
+				{
+					"rate": rate,
+					"base_rate": flt(rate) * conversion_rate,
+					"amount": amount,
+					"base_amount": amount * conversion_rate,
+					"qty_consumed_per_unit": flt(row.stock_qty, stock_qty_precision) / quantity,
+				},
+			)
+
+			total_rm_cost += row.amount
+			base_total_rm_cost += row.base_amount
+
+		return total_rm_cost, base_total_rm_cost
+
+	def get_rm_rate(self, bom: dict, row: dict) -> float:
+		"Same as BOM.get_rm_rate, with the rates of raw materials and sub-assemblies from the maps."
+		rate = 0
+		if row.item_code not in self.customer_provided_items and not row.sourced_by_supplier:
+			if row.bom_no and bom.set_rate_of_sub_assembly_item_based_on_bom:
+				rate = flt(self.get_bom_unit_cost(row.bom_no)) * (row.conversion_factor or 1)
+			else:
+				rate = self.get_bom_item_rate(bom, row)
+
+		return flt(rate) * flt(bom.plc_conversion_rate or 1) / (bom.conversion_rate or 1)
+
+	def get_bom_item_rate(self, bom: dict, row: dict) -> float:
+		key = (
+			bom.rm_cost_as_per,
+			bom.company,
+			bom.buying_price_list,
+			bom.currency,
+			row.item_code,
+			row.uom,
+			row.stock_uom,
+			row.conversion_factor,
+			row.qty if bom.rm_cost_as_per == "Price List" else None,
+		)
+
+		if key not in self.rm_rates:
+			self.rm_rates[key] = get_bom_item_rate(
+				{
+					"company": bom.company,
+					"item_code": row.item_code,
+					"qty": row.qty,
+					"uom": row.uom,
+					"stock_uom": row.stock_uom,
+					"conversion_factor": row.conversion_factor,
+				},
+				bom,
+			)
+
+		return self.rm_rates[key]
+
+	def get_bom_unit_cost(self, bom_no: str) -> float:
+		if bom_no in self.boms:
+			bom = self.boms[bom_no]
+			return flt(bom.base_total_cost) / bom.quantity if bom.quantity else 0
+
+		if bom_no not in self.unit_costs:
+			bom = frappe.qb.DocType("BOM")
+			unit_cost = (
+				frappe.qb.from_(bom)
+				.select(bom.base_total_cost / bom.quantity)
+				.where((bom.name == bom_no) & (bom.is_active == 1))
+			).run()
+			self.unit_costs[bom_no] = flt(unit_cost[0][0]) if unit_cost else 0
+
+		return self.unit_costs[bom_no]
+
+	def calculate_sm_cost(self, bom: dict) -> tuple[float, float]:
+		total_sm_cost = base_total_sm_cost = 0
+
+		rate_precision = self.get_precision("BOM Scrap Item", "rate", bom.currency)
+		amount_precision = self.get_precision("BOM Scrap Item", "amount", bom.currency)
+		stock_qty_precision = self.get_precision("BOM Scrap Item", "stock_qty")
+		conversion_rate = flt(bom.conversion_rate, self.get_precision("BOM", "conversion_rate"))
+
+		for row in self.rows["BOM Scrap Item"][bom.name]:
+			amount = flt(row.rate, rate_precision) * flt(row.stock_qty, stock_qty_precision)
+			self.set_values(
+				"BOM Scrap Item",
+				row,
+				{
+					"base_rate": flt(row.rate, rate_precision) * conversion_rate,
+					"amount": amount,
+					"base_amount": flt(amount, amount_precision) * conversion_rate,
+				},
+			)
+
+			total_sm_cost += row.amount
+			base_total_sm_cost += row.base_amount
+
+		return total_sm_cost, base_total_sm_cost
+
+	def calculate_exploded_cost(self, bom: dict) -> None:
+		rm_rate_map = {}
+		for row in self.rows["BOM Item"][bom.name]:
+			if row.bom_no:
+				rm_rate_map.update(self.get_exploded_rates(row.bom_no))
+			else:
+				rm_rate_map[row.item_code] = flt(row.base_rate) / flt(row.conversion_factor or 1.0)
+
+		exploded_rates = {}
+		for row in self.rows["BOM Explosion Item"][bom.name]:
+			rate = flt(rm_rate_map.get(row.item_code))
+			self.set_values("BOM Explosion Item", row, {"rate": rate, "amount": flt(row.stock_qty) * rate})
+			exploded_rates[row.item_code] = rate
+
+		if self.parent_boms[bom.name]:
+			self.exploded_rates[bom.name] = exploded_rates
+
+	def get_exploded_rates(self, bom_no: str) -> dict[str, float]:
+		if bom_no not in self.exploded_rates:
+			# sub-assembly which is not updated, or a BOM with no parents to update
+			self.exploded_rates[bom_no] = {
+				row.item_code: flt(row.rate)
+				for row in frappe.get_all(
+					"BOM Explosion Item",
+					filters={"parent": bom_no, "parenttype": "BOM"},
+					fields=["item_code", "rate"],
+					order_by=None,
+				)
+			}
+
+		return self.exploded_rates[bom_no]
+
+	def set_values(self, doctype: str, row: dict, values: dict) -> None:
+		changed = {
+			fieldname: value
+			for fieldname, value in values.items()
+			if flt(value, 9) != flt(row.get(fieldname), 9)
+		}
+
+		if changed:
+			self.updates[doctype].setdefault(row.name, {}).update(changed)
+
+		row.update(values)
+
+	def write_updates(self) -> None:
+		for doctype, doc_updates in self.updates.items():
+			frappe.db.bulk_update(doctype, doc_updates, update_modified=False)
+
+		if self.updates:
+			# rates are updated without changing the modified timestamp of the BOMs
+			clear_bom_requirements()
+
+		self.updates.clear()
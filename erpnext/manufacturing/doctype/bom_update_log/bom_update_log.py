@@ -10,7 +10,9 @@ from frappe.query_builder import DocType, Interval
 from frappe.query_builder.functions import Now
 from frappe.utils import cint, cstr, date_diff, today
 
+from erpnext.manufacturing.doctype.bom_update_log.bom_cost_rollup import BOMCostRollup
 from erpnext.manufacturing.doctype.bom_update_log.bom_updation_utils import (
+	add_cost_changes_in_log,
 	get_leaf_boms,
 	get_next_higher_level_boms,
 	handle_exception,
@@ -32,10 +34,12 @@ class BOMUpdateLog(Document):
 	if TYPE_CHECKING:
 		from frappe.types import DF
 
+		from erpnext.manufacturing.doctype.bom_cost_change.bom_cost_change import BOMCostChange
 		from erpnext.manufacturing.doctype.bom_update_batch.bom_update_batch import BOMUpdateBatch
 
 		amended_from: DF.Link | None
 		bom_batches: DF.Table[BOMUpdateBatch]
+		cost_changes: DF.Table[BOMCostChange]
 		current_bom: DF.Link | None
 		current_level: DF.Int
 		error_log: DF.Link | None
@@ -111,6 +115,15 @@ class BOMUpdateLog(Document):
 				now=frappe.flags.in_test,
 				enqueue_after_commit=True,
 			)
+		elif frappe.db.get_single_value("Manufacturing Settings", "roll_up_bom_costs_in_single_pass"):
+			frappe.enqueue(
+				method="erpnext.manufacturing.doctype.bom_update_log.bom_update_log.run_bom_cost_rollup_job",
+				queue="long",
+				doc=self,
+				timeout=40000,
+				now=frappe.flags.in_test,
+				enqueue_after_commit=True,
+			)
 		else:
 			frappe.enqueue(
 				method="erpnext.manufacturing.doctype.bom_update_log.bom_update_log.process_boms_cost_level_wise",
@@ -145,6 +158,25 @@ def run_replace_bom_job(
 			frappe.db.commit()  # nosemgrep
 
 
+def run_bom_cost_rollup_job(doc: "BOMUpdateLog") -> None:
+	"Update the cost of all BOMs in one pass and record the BOMs whose cost changed."
+	try:
+		doc.db_set("status", "In Progress")
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+		cost_changes = BOMCostRollup().run()
+		add_cost_changes_in_log(doc.name, cost_changes)
+
+		doc.db_set("status", "Completed")
+	except Exception:
+		handle_exception(doc)
+	finally:
+		if not frappe.flags.in_test:
+			frappe.db.commit()  # nosemgrep
+
+
 def process_boms_cost_level_wise(
 	update_doc: "BOMUpdateLog", parent_boms: list[str] | None = None
 ) -> None | tuple:
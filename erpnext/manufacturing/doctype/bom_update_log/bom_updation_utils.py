@@ -11,6 +11,9 @@ if TYPE_CHECKING:
 
 import frappe
 from frappe import _
+from frappe.utils import now
+
+from erpnext.manufacturing.doctype.bom.bom_explosion import clear_bom_requirements
 
 
 def replace_bom(boms: dict, log_name: str) -> None:
@@ -23,6 +26,7 @@ def replace_bom(boms: dict, log_name: str) -> None:
 	update_new_bom_in_bom_items(unit_cost, current_bom, new_bom)
 
 	frappe.cache().delete_key("bom_children")
+	clear_bom_requirements()
 	parent_boms = get_ancestor_boms(new_bom)
 
 	for bom in parent_boms:
@@ -220,6 +224,50 @@ def set_values_in_log(log_name: str, values: dict[str, Any], commit: bool = Fals
 		frappe.db.commit()  # nosemgrep
 
 
+def add_cost_changes_in_log(log_name: str, cost_changes: list[dict[str, Any]]) -> None:
+	"Add the BOMs whose cost changed to the BOM Update Log."
+
+	if not cost_changes:
+		return
+
+	timestamp = now()
+	user = frappe.session.user
+	fields = ["bom", "item", "currency", "old_total_cost", "new_total_cost"]
+
+	frappe.db.bulk_insert(
+		"BOM Cost Change",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"parent",
+			"parenttype",
+			"parentfield",
+			"idx",
+			"docstatus",
+			*fields,
+		],
+		values=[
+			(
+				frappe.generate_hash(length=10),
+				timestamp,
+				timestamp,
+				user,
+				user,
+				log_name,
+				"BOM Update Log",
+				"cost_changes",
+				idx,
+				1,
+				*(row[field] for field in fields),
+			)
+			for idx, row in enumerate(cost_changes, start=1)
+		],
+	)
+
+
 def handle_exception(doc: "BOMUpdateLog") -> None:
 	"Rolls back and fails BOM Update Log."
 
@@ -2,7 +2,7 @@
 # License: GNU General Public License v3. See license.txt
 
 import frappe
-from frappe.tests.utils import FrappeTestCase, timeout
+from frappe.tests.utils import FrappeTestCase, change_settings, timeout
 
 from erpnext.manufacturing.doctype.bom_update_log.test_bom_update_log import (
 	update_cost_in_all_boms_in_test,
@@ -64,3 +64,34 @@ class TestBOMUpdateTool(FrappeTestCase):
 
 		doc.load_from_db()
 		self.assertEqual(doc.total_cost, 200)
+
+	@timeout
+	@change_settings("Manufacturing Settings", {"roll_up_bom_costs_in_single_pass": 1})
+	def test_bom_cost_rollup(self):
+		items = [
+			"BOM Rollup Test Item 1",
+			"BOM Rollup Test Item 2",
+			"BOM Rollup Test Item 3",
+			"BOM Rollup Test Item 4",
+		]
+		for item in items:
+			create_item(item, valuation_rate=100)
+			frappe.db.set_value("Item", item, "valuation_rate", 100)
+
+		sub_assembly_bom = make_bom(item=items[1], raw_materials=[items[2]], currency="INR")
+		bom = make_bom(item=items[0], raw_materials=[items[1], items[3]], currency="INR")
+		self.assertEqual(bom.items[0].bom_no, sub_assembly_bom.name)
+		self.assertEqual(bom.total_cost, 200)
+
+		frappe.db.set_value("Item", items[2], "valuation_rate", 150)
+		log = update_cost_in_all_boms_in_test()
+
+		sub_assembly_bom.load_from_db()
+		bom.load_from_db()
+		self.assertEqual(sub_assembly_bom.total_cost, 150)
+		self.assertEqual(bom.total_cost, 250)
+		self.assertEqual(bom.exploded_items[0].rate, 150)
+
+		cost_changes = {row.bom: (row.old_total_cost, row.new_total_cost) for row in log.cost_changes}
+		self.assertEqual(cost_changes[sub_assembly_bom.name], (100, 150))
+		self.assertEqual(cost_changes[bom.name], (200, 250))
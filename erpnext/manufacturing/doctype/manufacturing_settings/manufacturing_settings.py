@@ -34,6 +34,7 @@ class ManufacturingSettings(Document):
 		mins_between_operations: DF.Int
 		overproduction_percentage_for_sales_order: DF.Percent
 		overproduction_percentage_for_work_order: DF.Percent
+		roll_up_bom_costs_in_single_pass: DF.Check
 		set_op_cost_and_scrape_from_sub_assemblies: DF.Check
 		update_bom_costs_automatically: DF.Check
 		validate_components_quantities_per_bom: DF.Check
@@ -14,6 +14,7 @@ from frappe.utils import (
 	ceil,
 	cint,
 	comma_and,
+	create_batch,
 	flt,
 	get_link_to_form,
 	getdate,
@@ -23,11 +24,10 @@ from frappe.utils import (
 from frappe.utils.csvutils import build_csv_response
 from pypika.terms import ExistsCriterion
 
-from erpnext.manufacturing.doctype.bom.bom import get_children as get_bom_children
 from erpnext.manufacturing.doctype.bom.bom import validate_bom_no
+from erpnext.manufacturing.doctype.bom.bom_explosion import BOMExplosion, group_requirements
 from erpnext.manufacturing.doctype.work_order.work_order import get_item_details
-from erpnext.setup.doctype.item_group.item_group import get_item_group_defaults
-from erpnext.stock.get_item_details import get_conversion_factor
+from erpnext.stock.doctype.item.item import get_uom_conv_factor
 from erpnext.stock.utils import get_or_make_bin
 from erpnext.utilities.transaction_base import validate_uom_is_integer
 
@@ -897,6 +897,7 @@ class ProductionPlan(Document):
 		"Fetch sub assembly items and optionally combine them."
 		self.sub_assembly_items = []
 		sub_assembly_items_store = []  # temporary store to process all subassembly items
+		explosion = PlanningExplosion(self.company)
 
 		for row in self.po_items:
 			if self.skip_available_sub_assembly_item and not self.sub_assembly_warehouse:
@@ -911,7 +912,14 @@ class ProductionPlan(Document):
 			bom_data = []
 
 			warehouse = (self.sub_assembly_warehouse) if self.skip_available_sub_assembly_item else None
-			get_sub_assembly_items(row.bom_no, bom_data, row.planned_qty, self.company, warehouse=warehouse)
+			get_sub_assembly_items(
+				row.bom_no,
+				bom_data,
+				row.planned_qty,
+				self.company,
+				warehouse=warehouse,
+				explosion=explosion,
+			)
 			self.set_sub_assembly_items_based_on_level(row, bom_data, manufacturing_type)
 			sub_assembly_items_store.extend(bom_data)
 
@@ -1098,50 +1106,83 @@ def download_raw_materials(doc, warehouses=None):
 	build_csv_response(item_list, doc.name)
 
 
-def get_exploded_items(item_details, company, bom_no, include_non_stock_items, planned_qty=1, doc=None):
-	bei = frappe.qb.DocType("BOM Explosion Item")
-	bom = frappe.qb.DocType("BOM")
-	item = frappe.qb.DocType("Item")
-	item_default = frappe.qb.DocType("Item Default")
-	item_uom = frappe.qb.DocType("UOM Conversion Detail")
-
-	data = (
-		frappe.qb.from_(bei)
-		.join(bom)
-		.on(bom.name == bei.parent)
-		.join(item)
-		.on(item.name == bei.item_code)
-		.left_join(item_default)
-		.on((item_default.parent == item.name) & (item_default.company == company))
-		.left_join(item_uom)
-		.on((item.name == item_uom.parent) & (item_uom.uom == item.purchase_uom))
-		.select(
-			(IfNull(Sum(bei.stock_qty / IfNull(bom.quantity, 1)), 0) * planned_qty).as_("qty"),
-			item.item_name,
-			item.name.as_("item_code"),
-			bei.description,
-			bei.stock_uom,
-			item.min_order_qty,
-			bei.source_warehouse,
-			item.default_material_request_type,
-			item.min_order_qty,
-			item_default.default_warehouse,
-			item.purchase_uom,
-			item_uom.conversion_factor,
-			item.safety_stock,
-		)
-		.where(
-			(bei.docstatus < 2)
-			& (bom.name == bom_no)
-			& (item.is_stock_item.isin([0, 1]) if include_non_stock_items else item.is_stock_item == 1)
-		)
-		.groupby(bei.item_code, bei.stock_uom)
-	).run(as_dict=True)
+class PlanningExplosion(BOMExplosion):
+	"""Explodes the BOMs of a plan, also reading the item master of each item once."""
+
+	def __init__(self, company):
+		super().__init__()
+		self.company = company
+		self.items = {}
+
+	def get_item_details(self, item_codes):
+		if missing := {item_code for item_code in item_codes if item_code not in self.items}:
+			item = frappe.qb.DocType("Item")
+			item_default = frappe.qb.DocType("Item Default")
+			item_uom = frappe.qb.DocType("UOM Conversion Detail")
+
+			data = (
+				frappe.qb.from_(item)
+				.left_join(item_default)
+				.on((item_default.parent == item.name) & (item_default.company == self.company))
+				.left_join(item_uom)
+				.on((item.name == item_uom.parent) & (item_uom.uom == item.purchase_uom))
+				.select(
+					item.name.as_("item_code"),
+					item.item_name,
+					item.description,
+					item.stock_uom,
+					item.is_stock_item,
+					item.is_sub_contracted_item,
+					item.default_bom,
+					item.default_material_request_type,
+					item.min_order_qty,
+					item.safety_stock,
+					item.purchase_uom,
+					item_default.default_warehouse,
+					item_uom.conversion_factor,
+				)
+				.where(item.name.isin(list(missing)))
+			).run(as_dict=True)
+
+			for d in data:
+				self.items.setdefault(d.item_code, d)
+
+		return self.items
+
+
+def get_exploded_items(
+	item_details, company, bom_no, include_non_stock_items, planned_qty=1, doc=None, explosion=None
+):
+	explosion = explosion or PlanningExplosion(company)
+	exploded_items = group_requirements(
+		explosion.get_requirements(bom_no, planned_qty, exploded=True), group_by=("item_code", "stock_uom")
+	)
+	item_master = explosion.get_item_details(exploded_items["item_code"])
+
+	for i, item_code in enumerate(exploded_items["item_code"]):
+		item = item_master.get(item_code)
+		if not item or not (include_non_stock_items or item.is_stock_item):
+			continue
 
-	for d in data:
-		if not d.conversion_factor and d.purchase_uom:
-			d.conversion_factor = get_uom_conversion_factor(d.item_code, d.purchase_uom)
-		item_details.setdefault(d.get("item_code"), d)
+		item_details.setdefault(
+			item_code,
+			frappe._dict(
+				{
+					"qty": exploded_items["stock_qty"][i],
+					"item_name": item.item_name,
+					"item_code": item_code,
+					"description": exploded_items["description"][i],
+					"stock_uom": exploded_items["stock_uom"][i],
+					"min_order_qty": item.min_order_qty,
+					"source_warehouse": exploded_items["source_warehouse"][i],
+					"default_material_request_type": item.default_material_request_type,
+					"default_warehouse": item.default_warehouse,
+					"purchase_uom": item.purchase_uom,
+					"conversion_factor": item.conversion_factor,
+					"safety_stock": item.safety_stock,
+				}
+			),
+		)
 
 	return item_details
 
@@ -1162,57 +1203,40 @@ def get_subitems(
 	include_subcontracted_items,
 	parent_qty,
 	planned_qty=1,
+	explosion=None,
 ):
-	bom_item = frappe.qb.DocType("BOM Item")
-	bom = frappe.qb.DocType("BOM")
-	item = frappe.qb.DocType("Item")
-	item_default = frappe.qb.DocType("Item Default")
-	item_uom = frappe.qb.DocType("UOM Conversion Detail")
-
-	items = (
-		frappe.qb.from_(bom_item)
-		.join(bom)
-		.on(bom.name == bom_item.parent)
-		.join(item)
-		.on(bom_item.item_code == item.name)
-		.left_join(item_default)
-		.on((item.name == item_default.parent) & (item_default.company == company))
-		.left_join(item_uom)
-		.on((item.name == item_uom.parent) & (item_uom.uom == item.purchase_uom))
-		.select(
-			bom_item.item_code,
-			item.default_material_request_type,
-			item.item_name,
-			IfNull(parent_qty * Sum(bom_item.stock_qty / IfNull(bom.quantity, 1)) * planned_qty, 0).as_(
-				"qty"
-			),
-			item.is_sub_contracted_item.as_("is_sub_contracted"),
-			bom_item.source_warehouse,
-			item.default_bom.as_("default_bom"),
-			bom_item.description.as_("description"),
-			bom_item.stock_uom.as_("stock_uom"),
-			item.min_order_qty.as_("min_order_qty"),
-			item.safety_stock.as_("safety_stock"),
-			item_default.default_warehouse,
-			item.purchase_uom,
-			item_uom.conversion_factor,
-		)
-		.where(
-			(bom.name == bom_no)
-			& (bom_item.docstatus < 2)
-			& (item.is_stock_item.isin([0, 1]) if include_non_stock_items else item.is_stock_item == 1)
+	explosion = explosion or PlanningExplosion(company)
+	bom_items = group_requirements(explosion.get_requirements(bom_no, flt(parent_qty) * flt(planned_qty)))
+	item_master = explosion.get_item_details(bom_items["item_code"])
+
+	for i, item_code in enumerate(bom_items["item_code"]):
+		item = item_master.get(item_code)
+		if not item or not (include_non_stock_items or item.is_stock_item):
+			continue
+
+		d = frappe._dict(
+			{
+				"item_code": item_code,
+				"default_material_request_type": item.default_material_request_type,
+				"item_name": item.item_name,
+				"qty": bom_items["stock_qty"][i],
+				"is_sub_contracted": item.is_sub_contracted_item,
+				"source_warehouse": bom_items["source_warehouse"][i],
+				"default_bom": item.default_bom,
+				"description": bom_items["description"][i],
+				"stock_uom": bom_items["stock_uom"][i],
+				"min_order_qty": item.min_order_qty,
+				"safety_stock": item.safety_stock,
+				"default_warehouse": item.default_warehouse,
+				"purchase_uom": item.purchase_uom,
+				"conversion_factor": item.conversion_factor,
+			}
 		)
-		.groupby(bom_item.item_code)
-	).run(as_dict=True)
 
-	for d in items:
 		if not data.get("include_exploded_items") or not d.default_bom:
 			if d.item_code in item_details:
 				item_details[d.item_code].qty = item_details[d.item_code].qty + d.qty
 			else:
-				if not d.conversion_factor and d.purchase_uom:
-					d.conversion_factor = get_uom_conversion_factor(d.item_code, d.purchase_uom)
-
 				item_details[d.item_code] = d
 
 		if data.get("include_exploded_items") and d.default_bom:
@@ -1229,10 +1253,165 @@ def get_subitems(
 						include_non_stock_items,
 						include_subcontracted_items,
 						d.qty,
+						explosion=explosion,
 					)
 	return item_details
 
 
+class MaterialRequestNetting:
+	"""Bins, items and UOMs needed to net the demand of plans, read with one query per table for all rows."""
+
+	def __init__(self):
+		self.bins = {}
+		self.warehouses = {}
+		self.items = {}
+		self.item_group_warehouses = {}
+		self.conversion_factors = {}
+		self.whole_number_uoms = set()
+
+	def load(self, company, rows, warehouse=None):
+		item_codes = list({row.item_code for row in rows if (company, row.item_code) not in self.bins})
+
+		for batch in create_batch(item_codes, 1000):
+			self.load_items(batch)
+			self.load_bins(company, batch)
+
+		self.load_item_group_warehouses(
+			company, {self.items[item_code].item_group for item_code in item_codes}
+		)
+		self.load_warehouses(
+			{warehouse or row.get("source_warehouse") or row.get("default_warehouse") for row in rows}
+		)
+		self.load_whole_number_uoms(
+			{row.get("purchase_uom") or row.get("stock_uom") for row in rows}
+			| {self.items[row.item_code].purchase_uom for row in rows}
+		)
+
+	def load_items(self, item_codes):
+		if item_codes := [item_code for item_code in item_codes if item_code not in self.items]:
+			for item in frappe.get_all(
+				"Item",
+				filters={"name": ("in", item_codes)},
+				fields=["name as item_code", "item_group", "variant_of", "stock_uom", "purchase_uom"],
+			):
+				self.items[item.item_code] = item
+
+	def load_bins(self, company, item_codes):
+		bin = frappe.qb.DocType("Bin")
+		wh = frappe.qb.DocType("Warehouse")
+
+		data = (
+			frappe.qb.from_(bin)
+			.join(wh)
+			.on(wh.name == bin.warehouse)
+			.select(
+				bin.item_code,
+				bin.warehouse,
+				wh.lft,
+				wh.rgt,
+				IfNull(bin.projected_qty, 0).as_("projected_qty"),
+				IfNull(bin.actual_qty, 0).as_("actual_qty"),
+				IfNull(bin.ordered_qty, 0).as_("ordered_qty"),
+				IfNull(bin.reserved_qty_for_production, 0).as_("reserved_qty_for_production"),
+				IfNull(bin.planned_qty, 0).as_("planned_qty"),
+			)
+			.where((bin.item_code.isin(item_codes)) & (wh.company == company))
+			.orderby(bin.item_code)
+			.orderby(bin.warehouse)
+		).run(as_dict=True)
+
+		for item_code in item_codes:
+			self.bins[(company, item_code)] = []
+
+		for d in data:
+			self.bins[(company, d.item_code)].append(d)
+
+	def load_item_group_warehouses(self, company, item_groups):
+		if item_groups := [
+			item_group
+			for item_group in item_groups
+			if (company, item_group) not in self.item_group_warehouses
+		]:
+			item_group_warehouses = {}
+			for d in frappe.get_all(
+				"Item Default",
+				filters={"parenttype": "Item Group", "parent": ("in", item_groups), "company": company},
+				fields=["parent", "default_warehouse"],
+				order_by="idx",
+			):
+				item_group_warehouses.setdefault(d.parent, d.default_warehouse)
+
+			for item_group in item_groups:
+				self.item_group_warehouses[(company, item_group)] = item_group_warehouses.get(item_group)
+
+	def load_warehouses(self, warehouses):
+		if warehouses := [
+			warehouse for warehouse in warehouses if warehouse and warehouse not in self.warehouses
+		]:
+			for d in frappe.get_all(
+				"Warehouse", filters={"name": ("in", warehouses)}, fields=["name", "lft", "rgt"]
+			):
+				self.warehouses[d.name] = (d.lft, d.rgt)
+
+	def load_whole_number_uoms(self, uoms):
+		if uoms := [uom for uom in uoms if uom]:
+			self.whole_number_uoms.update(
+				frappe.get_all("UOM", filters={"name": ("in", uoms), "must_be_whole_number": 1}, pluck="name")
+			)
+
+	def get_bin_details(self, company, row, warehouse=None):
+		"""Bin quantities of the first warehouse under the row's warehouse, like `get_bin_details`."""
+		bins = self.bins.get((company, row.item_code), [])
+
+		if warehouse := warehouse or row.get("source_warehouse") or row.get("default_warehouse"):
+			lft, rgt = self.warehouses.get(warehouse, (None, None))
+			bins = [d for d in bins if lft is not None and d.lft >= lft and d.rgt <= rgt]
+
+		return bins[0] if bins else {}
+
+	def get_conversion_factor(self, item_code, uom):
+		if (item_code, uom) not in self.conversion_factors:
+			self.load_conversion_factors(
+				[
+					(code, item.purchase_uom)
+					for code, item in self.items.items()
+					if item.purchase_uom and item.purchase_uom != item.stock_uom
+				]
+				+ [(item_code, uom)]
+			)
+
+		return self.conversion_factors[(item_code, uom)]
+
+	def load_conversion_factors(self, item_uoms):
+		item_uoms = [key for key in set(item_uoms) if key not in self.conversion_factors]
+		parents = {item_code for item_code, _uom in item_uoms} | {
+			self.items[item_code].variant_of
+			for item_code, _uom in item_uoms
+			if self.items[item_code].variant_of
+		}
+
+		conversion_factors = {}
+		for d in frappe.get_all(
+			"UOM Conversion Detail",
+			filters={
+				"parenttype": "Item",
+				"parent": ("in", list(parents)),
+				"uom": ("in", list({uom for _item_code, uom in item_uoms})),
+			},
+			fields=["parent", "uom", "conversion_factor"],
+		):
+			conversion_factors.setdefault((d.parent, d.uom), d.conversion_factor)
+
+		for item_code, uom in item_uoms:
+			item = self.items[item_code]
+			self.conversion_factors[(item_code, uom)] = (
+				conversion_factors.get((item_code, uom))
+				or conversion_factors.get((item.variant_of, uom))
+				or get_uom_conv_factor(uom, item.stock_uom)
+				or 1.0
+			)
+
+
 def get_material_request_items(
 	doc,
 	row,
@@ -1242,7 +1421,12 @@ def get_material_request_items(
 	include_safety_stock,
 	warehouse,
 	bin_dict,
+	netting=None,
 ):
+	if not netting:
+		netting = MaterialRequestNetting()
+		netting.load(company, [row], warehouse)
+
 	total_qty = row["qty"]
 
 	required_qty = 0
@@ -1254,8 +1438,6 @@ def get_material_request_items(
 	if doc.get("consider_minimum_order_qty") and required_qty > 0 and required_qty < row["min_order_qty"]:
 		required_qty = row["min_order_qty"]
 
-	item_group_defaults = get_item_group_defaults(row.item_code, company)
-
 	if not row["purchase_uom"]:
 		row["purchase_uom"] = row["stock_uom"]
 
@@ -1269,13 +1451,13 @@ def get_material_request_items(
 
 			required_qty = required_qty / row["conversion_factor"]
 
-	if frappe.db.get_value("UOM", row["purchase_uom"], "must_be_whole_number"):
+	if row["purchase_uom"] in netting.whole_number_uoms:
 		required_qty = ceil(required_qty)
 
 	if include_safety_stock:
 		required_qty += flt(row["safety_stock"])
 
-	item_details = frappe.get_cached_value("Item", row.item_code, ["purchase_uom", "stock_uom"], as_dict=1)
+	item_details = netting.items[row.item_code]
 
 	conversion_factor = 1.0
 	if (
@@ -1283,9 +1465,7 @@ def get_material_request_items(
 		and item_details.purchase_uom
 		and item_details.purchase_uom != item_details.stock_uom
 	):
-		conversion_factor = (
-			get_conversion_factor(row.item_code, item_details.purchase_uom).get("conversion_factor") or 1.0
-		)
+		conversion_factor = netting.get_conversion_factor(row.item_code, item_details.purchase_uom)
 
 	if required_qty > 0:
 		return {
@@ -1298,7 +1478,7 @@ def get_material_request_items(
 			"warehouse": warehouse
 			or row.get("source_warehouse")
 			or row.get("default_warehouse")
-			or item_group_defaults.get("default_warehouse"),
+			or netting.item_group_warehouses.get((company, item_details.item_group)),
 			"safety_stock": row.safety_stock,
 			"actual_qty": bin_dict.get("actual_qty", 0),
 			"projected_qty": bin_dict.get("projected_qty", 0),
@@ -1444,16 +1624,40 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 	if isinstance(doc, str):
 		doc = frappe._dict(json.loads(doc))
 
-	if warehouses:
-		warehouses = list(set(get_warehouse_list(warehouses)))
+	return get_items_for_material_requests_of_plans([doc], warehouses, get_parent_warehouse_data)[0]
 
-		if (
-			doc.get("for_warehouse")
-			and not get_parent_warehouse_data
-			and doc.get("for_warehouse") in warehouses
-		):
-			warehouses.remove(doc.get("for_warehouse"))
 
+def get_items_for_material_requests_of_plans(docs, warehouses=None, get_parent_warehouse_data=None):
+	"""Material Request Plan Items of each plan, in the order of `docs`.
+
+	The demand of every plan is exploded first, then the Bins, items and UOMs of all the demanded items
+	are read together. Each plan is still netted on its own, as if it was planned alone.
+	"""
+	explosions = {}
+	demands = []
+	for doc in docs:
+		company = doc.get("company")
+		if company not in explosions:
+			explosions[company] = PlanningExplosion(company)
+
+		demands.append(get_material_request_demand(doc, explosions[company]))
+
+	netting = MaterialRequestNetting()
+	for doc, demand in zip(docs, demands, strict=True):
+		netting.load(
+			doc.get("company"),
+			[details for item_dict in demand.so_item_details.values() for details in item_dict.values()],
+			demand.warehouse,
+		)
+
+	return [
+		get_netted_material_request_items(doc, demand, netting, warehouses, get_parent_warehouse_data)
+		for doc, demand in zip(docs, demands, strict=True)
+	]
+
+
+def get_material_request_demand(doc, explosion):
+	"""Required qty of each item for each sales order of the plan, from the BOMs of its rows."""
 	doc["mr_items"] = []
 
 	po_items = doc.get("po_items") if doc.get("po_items") else doc.get("items")
@@ -1523,6 +1727,7 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 							include_non_stock_items,
 							sub_assembly_items,
 							planned_qty=planned_qty,
+							explosion=explosion,
 						)
 
 				elif data.get("include_exploded_items") and include_subcontracted_items:
@@ -1534,6 +1739,7 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 						include_non_stock_items,
 						planned_qty=planned_qty,
 						doc=doc,
+						explosion=explosion,
 					)
 				else:
 					item_details = get_subitems(
@@ -1546,6 +1752,7 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 						include_subcontracted_items,
 						1,
 						planned_qty=planned_qty,
+						explosion=explosion,
 					)
 		elif data.get("item_code"):
 			item_master = frappe.get_doc("Item", data["item_code"]).as_dict()
@@ -1583,13 +1790,34 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 			else:
 				so_item_details[sales_order][item_code] = details
 
+	return frappe._dict(
+		{
+			"so_item_details": so_item_details,
+			"ignore_existing_ordered_qty": ignore_existing_ordered_qty,
+			"include_safety_stock": include_safety_stock,
+			"warehouse": warehouse,
+		}
+	)
+
+
+def get_netted_material_request_items(doc, demand, netting, warehouses=None, get_parent_warehouse_data=None):
+	company = doc.get("company")
+	ignore_existing_ordered_qty = demand.ignore_existing_ordered_qty
+	warehouse = demand.warehouse
+
+	if warehouses:
+		warehouses = list(set(get_warehouse_list(warehouses)))
+
+		if (
+			doc.get("for_warehouse")
+			and not get_parent_warehouse_data
+			and doc.get("for_warehouse") in warehouses
+		):
+			warehouses.remove(doc.get("for_warehouse"))
+
 	mr_items = []
-	for sales_order in so_item_details:
-		item_dict = so_item_details[sales_order]
+	for sales_order, item_dict in demand.so_item_details.items():
 		for details in item_dict.values():
-			bin_dict = get_bin_details(details, doc.company, warehouse)
-			bin_dict = bin_dict[0] if bin_dict else {}
-
 			if details.qty > 0:
 				items = get_material_request_items(
 					doc,
@@ -1597,9 +1825,10 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 					sales_order,
 					company,
 					ignore_existing_ordered_qty,
-					include_safety_stock,
+					demand.include_safety_stock,
 					warehouse,
-					bin_dict,
+					netting.get_bin_details(company, details, warehouse),
+					netting=netting,
 				)
 				if items:
 					mr_items.append(items)
@@ -1607,7 +1836,7 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 	if (not ignore_existing_ordered_qty or get_parent_warehouse_data) and warehouses:
 		new_mr_items = []
 		for item in mr_items:
-			get_materials_from_other_locations(item, warehouses, new_mr_items, company)
+			get_materials_from_other_locations(item, warehouses, new_mr_items, company, netting=netting)
 
 		mr_items = new_mr_items
 
@@ -1627,12 +1856,14 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 	return mr_items
 
 
-def get_materials_from_other_locations(item, warehouses, new_mr_items, company):
+def get_materials_from_other_locations(item, warehouses, new_mr_items, company, netting=None):
 	from erpnext.stock.doctype.pick_list.pick_list import get_available_item_locations
 
-	stock_uom, purchase_uom = frappe.db.get_value(
-		"Item", item.get("item_code"), ["stock_uom", "purchase_uom"]
-	)
+	if not netting:
+		netting = MaterialRequestNetting()
+		netting.load(company, [frappe._dict(item)])
+
+	purchase_uom = netting.items[item.get("item_code")].purchase_uom
 
 	locations = get_available_item_locations(
 		item.get("item_code"),
@@ -1674,7 +1905,7 @@ def get_materials_from_other_locations(item, warehouses, new_mr_items, company):
 	if flt(required_qty, precision) > 0:
 		required_qty = required_qty
 
-		if frappe.db.get_value("UOM", purchase_uom, "must_be_whole_number"):
+		if purchase_uom in netting.whole_number_uoms:
 			required_qty = ceil(required_qty)
 
 		item["quantity"] = required_qty / item.get("conversion_factor")
@@ -1693,15 +1924,26 @@ def get_item_data(item_code):
 	}
 
 
-def get_sub_assembly_items(bom_no, bom_data, to_produce_qty, company, warehouse=None, indent=0):
-	data = get_bom_children(parent=bom_no)
-	for d in data:
-		if d.expandable:
+def get_sub_assembly_items(
+	bom_no, bom_data, to_produce_qty, company, warehouse=None, indent=0, explosion=None
+):
+	explosion = explosion or PlanningExplosion(company)
+	bom_items = explosion.get_requirements(bom_no, to_produce_qty)
+	item_master = explosion.get_item_details(
+		[
+			item_code
+			for item_code, child_bom in zip(bom_items["item_code"], bom_items["bom_no"], strict=True)
+			if child_bom
+		]
+	)
+
+	for i, item_code in enumerate(bom_items["item_code"]):
+		if bom_items["bom_no"][i] and (item := item_master.get(item_code)):
 			parent_item_code = frappe.get_cached_value("BOM", bom_no, "item")
-			stock_qty = (d.stock_qty / d.parent_bom_qty) * flt(to_produce_qty)
+			stock_qty = bom_items["stock_qty"][i]
 
 			if warehouse:
-				bin_details = get_bin_details(d, company, for_warehouse=warehouse)
+				bin_details = get_bin_details(item, company, for_warehouse=warehouse)
 
 				for _bin_dict in bin_details:
 					if _bin_dict.projected_qty > 0:
@@ -1716,13 +1958,13 @@ def get_sub_assembly_items(bom_no, bom_data, to_produce_qty, company, warehouse=
 					frappe._dict(
 						{
 							"parent_item_code": parent_item_code,
-							"description": d.description,
-							"production_item": d.item_code,
-							"item_name": d.item_name,
-							"stock_uom": d.stock_uom,
-							"uom": d.stock_uom,
-							"bom_no": d.value,
-							"is_sub_contracted_item": d.is_sub_contracted_item,
+							"description": item.description,
+							"production_item": item_code,
+							"item_name": item.item_name,
+							"stock_uom": item.stock_uom,
+							"uom": item.stock_uom,
+							"bom_no": bom_items["bom_no"][i],
+							"is_sub_contracted_item": item.is_sub_contracted_item,
 							"bom_level": indent,
 							"indent": indent,
 							"stock_qty": stock_qty,
@@ -1730,10 +1972,15 @@ def get_sub_assembly_items(bom_no, bom_data, to_produce_qty, company, warehouse=
 					)
 				)
 
-				if d.value:
-					get_sub_assembly_items(
-						d.value, bom_data, stock_qty, company, warehouse, indent=indent + 1
-					)
+				get_sub_assembly_items(
+					bom_items["bom_no"][i],
+					bom_data,
+					stock_qty,
+					company,
+					warehouse,
+					indent=indent + 1,
+					explosion=explosion,
+				)
 
 
 def set_default_warehouses(row, default_warehouses):
@@ -1805,71 +2052,57 @@ def get_non_completed_production_plans():
 
 
 def get_raw_materials_of_sub_assembly_items(
-	item_details, company, bom_no, include_non_stock_items, sub_assembly_items, planned_qty=1
+	item_details, company, bom_no, include_non_stock_items, sub_assembly_items, planned_qty=1, explosion=None
 ):
-	bei = frappe.qb.DocType("BOM Item")
-	bom = frappe.qb.DocType("BOM")
-	item = frappe.qb.DocType("Item")
-	item_default = frappe.qb.DocType("Item Default")
-	item_uom = frappe.qb.DocType("UOM Conversion Detail")
-
-	items = (
-		frappe.qb.from_(bei)
-		.join(bom)
-		.on(bom.name == bei.parent)
-		.join(item)
-		.on(item.name == bei.item_code)
-		.left_join(item_default)
-		.on((item_default.parent == item.name) & (item_default.company == company))
-		.left_join(item_uom)
-		.on((item.name == item_uom.parent) & (item_uom.uom == item.purchase_uom))
-		.select(
-			(IfNull(Sum(bei.stock_qty / IfNull(bom.quantity, 1)), 0) * planned_qty).as_("qty"),
-			item.item_name,
-			item.name.as_("item_code"),
-			bei.description,
-			bei.stock_uom,
-			bei.bom_no,
-			item.min_order_qty,
-			bei.source_warehouse,
-			item.default_material_request_type,
-			item.min_order_qty,
-			item_default.default_warehouse,
-			item.purchase_uom,
-			item_uom.conversion_factor,
-			item.safety_stock,
-		)
-		.where(
-			(bei.docstatus == 1)
-			& (bom.name == bom_no)
-			& (item.is_stock_item.isin([0, 1]) if include_non_stock_items else item.is_stock_item == 1)
-		)
-		.groupby(bei.item_code, bei.stock_uom)
-	).run(as_dict=True)
+	explosion = explosion or PlanningExplosion(company)
+	bom_items = group_requirements(
+		explosion.get_requirements(bom_no, planned_qty, submitted_only=True),
+		group_by=("item_code", "stock_uom"),
+	)
+	item_master = explosion.get_item_details(bom_items["item_code"])
+
+	for i, item_code in enumerate(bom_items["item_code"]):
+		item = item_master.get(item_code)
+		if not item or not (include_non_stock_items or item.is_stock_item):
+			continue
 
-	for item in items:
-		key = (item.item_code, item.bom_no)
-		if item.bom_no and key not in sub_assembly_items:
+		child_bom = bom_items["bom_no"][i]
+		key = (item_code, child_bom)
+		if child_bom and key not in sub_assembly_items:
 			continue
 
-		if item.bom_no:
-			planned_qty = flt(sub_assembly_items[key])
+		if child_bom:
 			get_raw_materials_of_sub_assembly_items(
 				item_details,
 				company,
-				item.bom_no,
+				child_bom,
 				include_non_stock_items,
 				sub_assembly_items,
-				planned_qty=planned_qty,
+				planned_qty=flt(sub_assembly_items[key]),
+				explosion=explosion,
 			)
 		else:
-			if not item.conversion_factor and item.purchase_uom:
-				item.conversion_factor = get_uom_conversion_factor(item.item_code, item.purchase_uom)
-
-			if details := item_details.get(item.get("item_code")):
-				details.qty += item.get("qty")
+			qty = bom_items["stock_qty"][i]
+			if details := item_details.get(item_code):
+				details.qty += qty
 			else:
-				item_details.setdefault(item.get("item_code"), item)
+				item_details[item_code] = frappe._dict(
+					{
+						"qty": qty,
+						"item_name": item.item_name,
+						"item_code": item_code,
+						"description": bom_items["description"][i],
+						"stock_uom": bom_items["stock_uom"][i],
+						"bom_no": child_bom,
+						"min_order_qty": item.min_order_qty,
+						"source_warehouse": bom_items["source_warehouse"][i],
+						"default_material_request_type": item.default_material_request_type,
+						"default_warehouse": item.default_warehouse,
+						"purchase_uom": item.purchase_uom,
+						"conversion_factor": item.conversion_factor,
+						"safety_stock": item.safety_stock,
+					}
+				)
 
 	return item_details
 
@@ -1708,6 +1708,31 @@ class TestProductionPlan(FrappeTestCase):
 			self.assertEqual(row.production_item, sf_item)
 			self.assertEqual(row.qty, 5.0)
 
+	def test_material_request_items_of_plans(self):
+		from erpnext.manufacturing.doctype.production_plan.production_plan import (
+			get_items_for_material_requests_of_plans,
+		)
+
+		rm_item = make_item(properties={"is_stock_item": 1}).name
+		plans = []
+		for qty in (4, 6):
+			fg_item = make_item(properties={"is_stock_item": 1}).name
+			make_bom(item=fg_item, raw_materials=[rm_item])
+			plans.append(
+				create_production_plan(
+					item_code=fg_item, planned_qty=qty, do_not_save=1, skip_getting_mr_items=1
+				)
+			)
+
+		make_stock_entry(item_code=rm_item, qty=5, target="_Test Warehouse - _TC", rate=100)
+
+		# each plan is netted against the same projected qty, as when planned alone
+		mr_items = get_items_for_material_requests_of_plans([plan.as_dict() for plan in plans])
+		self.assertEqual([[row["quantity"] for row in items] for items in mr_items], [[], [1]])
+
+		for plan, items in zip(plans, mr_items, strict=True):
+			self.assertEqual(get_items_for_material_requests(plan.as_dict()), items)
+
 
 def create_production_plan(**args):
 	"""
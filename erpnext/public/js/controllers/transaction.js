@@ -518,8 +518,7 @@ erpnext.TransactionController = class TransactionController extends erpnext.taxe
 				this.frm.fields_dict["items"].grid.grid_rows[item.idx - 1].remove();
 			} else {
 				item.pricing_rules = ''
-				return this.frm.call({
-					method: "erpnext.stock.get_item_details.get_item_details",
+				return this.call_item_details({
 					child: item,
 					args: {
 						doc: me.frm.doc,
@@ -659,6 +658,60 @@ erpnext.TransactionController = class TransactionController extends erpnext.taxe
 		}
 	}
 
+	call_item_details(opts) {
+		// rows whose items are set together, like pasted or uploaded rows, are fetched in one call
+		return new Promise((resolve, reject) => {
+			this.item_details_queue = this.item_details_queue || [];
+			this.item_details_queue.push({opts, resolve, reject});
+
+			if (this.item_details_queue.length === 1) {
+				setTimeout(() => this.fetch_queued_item_details());
+			}
+		});
+	}
+
+	fetch_queued_item_details() {
+		const queue = this.item_details_queue;
+		this.item_details_queue = [];
+
+		if (queue.length === 1) {
+			const {opts, resolve, reject} = queue[0];
+			return this.frm.call({
+				method: "erpnext.stock.get_item_details.get_item_details",
+				...opts
+			}).then(resolve, reject);
+		}
+
+		return frappe.call({
+			method: "erpnext.stock.get_item_details.get_item_details_batch",
+			args: {
+				doc: this.frm.doc,
+				args_list: queue.map(({opts}) => opts.args.args)
+			}
+		}).then((r) => {
+			const std_field_list = ["doctype"].concat(frappe.model.std_fields_list);
+
+			queue.forEach(({opts, resolve}, i) => {
+				const row_r = {message: (r.message || [])[i]};
+
+				// set on the row like `frm.call` does for a single row
+				const child = locals[opts.child.doctype][opts.child.name];
+				if (child && $.isPlainObject(row_r.message)) {
+					for (const key in row_r.message) {
+						if (!std_field_list.includes(key)) {
+							child[key] = row_r.message[key];
+						}
+					}
+				}
+
+				opts.callback(row_r);
+				resolve(row_r);
+			});
+
+			this.frm.refresh_field(queue[0].opts.child.parentfield);
+		}, (e) => queue.forEach(({reject}) => reject(e)));
+	}
+
 	price_list_rate(doc, cdt, cdn) {
 		var item = frappe.get_doc(cdt, cdn);
 		frappe.model.round_floats_in(item, ["price_list_rate", "discount_percentage"]);
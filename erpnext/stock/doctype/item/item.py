@@ -32,6 +32,10 @@ from erpnext.controllers.item_variant import (
 	validate_item_variant_attributes,
 )
 from erpnext.stock.doctype.item_default.item_default import ItemDefault
+from erpnext.stock.doctype.item_search_token.item_search_token import (
+	delete_item_search_tokens,
+	update_item_search_tokens,
+)
 
 
 class DuplicateReorderRows(frappe.ValidationError):
@@ -220,6 +224,7 @@ class Item(Document):
 	def on_update(self):
 		self.update_variants()
 		self.update_item_price()
+		update_item_search_tokens([self.name])
 
 	def validate_description(self):
 		"""Clean HTML description if set"""
@@ -543,6 +548,7 @@ class Item(Document):
 	def on_trash(self):
 		frappe.db.sql("""delete from tabBin where item_code=%s""", self.name)
 		frappe.db.sql("delete from `tabItem Price` where item_code=%s", self.name)
+		delete_item_search_tokens(self.name)
 		for variant_of in frappe.get_all("Item", filters={"variant_of": self.name}):
 			frappe.delete_doc("Item", variant_of.name)
 
@@ -565,6 +571,7 @@ class Item(Document):
 			)
 
 		frappe.db.set_value("Item", new_name, "item_code", new_name)
+		update_item_search_tokens([new_name])
 
 		if merge:
 			self.set_last_purchase_rate(new_name)
@@ -0,0 +1,163 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import re
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cstr, now, strip_html, unique
+from frappe.utils.background_jobs import is_job_enqueued
+
+REBUILD_JOB_ID = "rebuild_item_search_tokens"
+TOKEN_LENGTH = 3
+
+
+class ItemSearchToken(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		item_code: DF.Link | None
+		token: DF.Data | None
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Item Search Token", ["token", "item_code"])
+	frappe.db.add_index("Item Search Token", ["item_code"])
+
+
+def is_item_search_index_enabled() -> bool:
+	return bool(frappe.db.get_single_value("Stock Settings", "maintain_item_search_index", cache=True))
+
+
+def can_use_item_search_index() -> bool:
+	return is_item_search_index_enabled() and not is_job_enqueued(REBUILD_JOB_ID)
+
+
+def enqueue_rebuild_item_search_tokens():
+	frappe.enqueue(
+		"erpnext.stock.doctype.item_search_token.item_search_token.rebuild_item_search_tokens",
+		queue="long",
+		timeout=7200,
+		job_id=REBUILD_JOB_ID,
+		deduplicate=True,
+		enqueue_after_commit=True,
+		now=frappe.flags.in_test,
+	)
+
+
+def rebuild_item_search_tokens():
+	"""Rebuild the tokens of every item, run when the index is enabled."""
+	if not is_item_search_index_enabled():
+		return
+
+	frappe.db.delete("Item Search Token")
+
+	item_codes = frappe.get_all("Item", pluck="name", order_by="name")
+	for i in range(0, len(item_codes), 1000):
+		insert_item_search_tokens(item_codes[i : i + 1000])
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+
+def update_item_search_tokens(item_codes):
+	"""Replace the tokens of the items, called whenever an item or its child rows change."""
+	if not item_codes or not is_item_search_index_enabled():
+		return
+
+	frappe.db.delete("Item Search Token", {"item_code": ("in", item_codes)})
+	insert_item_search_tokens(item_codes)
+
+
+def delete_item_search_tokens(item_code):
+	frappe.db.delete("Item Search Token", {"item_code": item_code})
+
+
+def insert_item_search_tokens(item_codes):
+	timestamp = now()
+	user = frappe.session.user
+
+	values = [
+		(frappe.generate_hash(length=10), timestamp, timestamp, user, user, item_code, token)
+		for item_code, texts in get_item_search_texts(item_codes).items()
+		for token in get_tokens(texts)
+	]
+
+	if values:
+		frappe.db.bulk_insert(
+			"Item Search Token",
+			fields=["name", "creation", "modified", "owner", "modified_by", "item_code", "token"],
+			values=values,
+		)
+
+
+def get_item_search_texts(item_codes):
+	"""Values item_query matches the search text against, for each item."""
+	fields = unique(
+		["name", "item_code", "item_name", "item_group", "description", *get_item_search_fields()]
+	)
+
+	texts = {}
+	for item in frappe.get_all("Item", filters={"name": ("in", item_codes)}, fields=fields):
+		# the whole description is indexed, items without a token of the search text are not matched at all
+		item.description = strip_html(cstr(item.description))
+		texts[item.name] = [cstr(item.get(field)) for field in fields]
+
+	for doctype, fieldname in (
+		("Item Barcode", "barcode"),
+		("Item Supplier", "supplier_part_no"),
+		("Item Customer Detail", "ref_code"),
+	):
+		for parent, value in frappe.get_all(
+			doctype,
+			filters={"parent": ("in", list(texts)), "parenttype": "Item"},
+			fields=["parent", fieldname],
+			as_list=True,
+		):
+			texts[parent].append(cstr(value))
+
+	return texts
+
+
+def get_item_search_fields():
+	meta = frappe.get_meta("Item", cached=True)
+	return [field for field in meta.get_search_fields() if meta.has_field(field)]
+
+
+def normalize(text):
+	return re.sub(r"\s+", " ", cstr(text).lower())
+
+
+def get_tokens(texts):
+	"""Distinct trigrams of each text, texts are not joined so no token spans two of them."""
+	tokens = set()
+	for text in texts:
+		text = normalize(text)
+		tokens.update(text[i : i + TOKEN_LENGTH] for i in range(len(text) - TOKEN_LENGTH + 1))
+
+	return tokens
+
+
+def get_search_tokens(txt):
+	"""Trigrams every item matching `like %txt%` has.
+
+	`%` and `_` are wildcards in the search text, so only the literal parts between them are used.
+	Returns nothing when no part is long enough, and the search has to scan the items instead.
+	"""
+	return get_tokens(re.split(r"[%_]", cstr(txt)))
+
+
+def get_items_matching_tokens_query(tokens_param, count_param):
+	"""Sub query of the items having every token, for the search text in %(tokens_param)s."""
+	return f"""select item_code from `tabItem Search Token`
+		where token in %({tokens_param})s
+		group by item_code
+		having count(distinct token) = %({count_param})s"""
@@ -0,0 +1,39 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+
+from erpnext.controllers.queries import item_query
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.item_search_token.item_search_token import get_search_tokens
+
+
+class TestItemSearchToken(FrappeTestCase):
+	def test_search_tokens(self):
+		self.assertEqual(get_search_tokens("Ab"), set())
+		self.assertEqual(get_search_tokens("ABc%de_Fgh"), {"abc", "fgh"})
+		self.assertEqual(get_search_tokens("a  bc"), {"a b", " bc"})
+
+	@change_settings("Stock Settings", {"maintain_item_search_index": 1})
+	def test_item_query_with_search_index(self):
+		description = "<p>Blue Widget Housing</p>" + "<p>Long description</p>" * 20 + "<p>Spare Gasket</p>"
+		item = make_item("_Test Item Search Token Item", {"description": description})
+		item.append("barcodes", {"barcode": "9781234567897"})
+		item.append("supplier_items", {"supplier": "_Test Supplier", "supplier_part_no": "SUP-PN-4411"})
+		item.save()
+
+		self.assertTrue(frappe.db.exists("Item Search Token", {"item_code": item.name, "token": "sup"}))
+
+		def search(txt):
+			return [row[0] for row in item_query("Item", txt, "name", 0, 20, filters=None)]
+
+		for txt in ("Search Token It", "widget hous", "spare gask", "456789", "SUP-PN-44", "%Token%Item"):
+			self.assertIn(item.name, search(txt))
+
+		self.assertNotIn(item.name, search("Widget Token"))
+
+		# tokens are replaced when the item changes
+		item.barcodes = []
+		item.save()
+		self.assertNotIn(item.name, search("456789"))
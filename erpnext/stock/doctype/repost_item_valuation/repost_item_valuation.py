@@ -9,6 +9,7 @@ from frappe.model.document import Document
 from frappe.query_builder import DocType, Interval
 from frappe.query_builder.functions import Max, Now
 from frappe.utils import cint, get_link_to_form, get_weekday, getdate, now, nowtime
+from frappe.utils.background_jobs import is_job_enqueued
 from frappe.utils.user import get_users_with_role
 from rq.timeouts import JobTimeoutException
 
@@ -17,12 +18,16 @@ from erpnext.accounts.general_ledger import validate_accounting_period
 from erpnext.accounts.utils import get_future_stock_vouchers, repost_gle_for_stock_vouchers
 from erpnext.stock.stock_ledger import (
 	get_affected_transactions,
+	get_distinct_item_warehouse,
 	get_items_to_be_repost,
 	repost_future_sle,
 )
 
 RecoverableErrors = (JobTimeoutException, QueryDeadlockError, QueryTimeoutError)
 
+# Timeout of a parallel reposting job, in seconds
+REPOST_JOB_TIMEOUT = 7200
+
 
 class RepostItemValuation(Document):
 	# begin: auto-generated types
@@ -433,16 +438,207 @@ def repost_entries():
 
 	riv_entries = get_repost_item_valuation_entries()
 
-	for row in riv_entries:
-		doc = frappe.get_doc("Repost Item Valuation", row.name)
-		if doc.status in ("Queued", "In Progress"):
+	workers = cint(frappe.db.get_single_value("Stock Reposting Settings", "parallel_reposting_workers"))
+	if workers > 1:
+		enqueue_parallel_reposting(riv_entries, workers)
+		return
+
+	repost_entries_in_group([row.name for row in riv_entries])
+
+
+def repost_entries_in_group(riv_names):
+	"""Repost the given entries one after another, in the order they are passed."""
+	for name in riv_names:
+		if not in_configured_timeslot():
+			return
+
+		# a row lock would be released by the commits made while reposting
+		if not claim_repost_entry(name):
+			continue
+
+		try:
+			if frappe.db.get_value("Repost Item Valuation", name, "status") not in ("Queued", "In Progress"):
+				continue
+
+			doc = frappe.get_doc("Repost Item Valuation", name)
 			repost(doc)
 			doc.deduplicate_similar_repost()
+		finally:
+			release_repost_entry(name)
 
-	riv_entries = get_repost_item_valuation_entries()
-	if riv_entries:
+
+def claim_repost_entry(name) -> bool:
+	"""Claim the entry for the current job, so that it is not picked up by another worker.
+
+	The claim expires with the job timeout, in case the worker is killed while reposting.
+	"""
+	return bool(
+		frappe.cache().set(
+			frappe.cache().make_key(get_repost_claim_key(name)), 1, nx=True, ex=REPOST_JOB_TIMEOUT
+		)
+	)
+
+
+def release_repost_entry(name):
+	frappe.cache().delete_value(get_repost_claim_key(name))
+
+
+def get_repost_claim_key(name):
+	return f"repost_item_valuation_claim::{name}"
+
+
+def enqueue_parallel_reposting(riv_entries, workers):
+	"""Split queued entries into independent groups and repost each bucket of groups in its own job.
+
+	Entries that share an item, directly or through dependent vouchers like manufacture and
+	repack, are kept in the same group so that they are reposted sequentially and in order.
+	"""
+	job_ids = [f"repost_item_valuation::{idx}" for idx in range(workers)]
+	if any(is_job_enqueued(job_id) for job_id in job_ids):
+		# wait for the previous run to finish, groups might have changed since
 		return
 
+	buckets = [[] for _ in range(workers)]
+	for group in sorted(get_independent_repost_groups(riv_entries), key=len, reverse=True):
+		min(buckets, key=len).extend(group)
+
+	for job_id, bucket in zip(job_ids, buckets, strict=True):
+		if not bucket:
+			continue
+
+		frappe.enqueue(
+			repost_entries_in_group,
+			riv_names=bucket,
+			queue="long",
+			timeout=REPOST_JOB_TIMEOUT,
+			job_id=job_id,
+			deduplicate=True,
+			now=frappe.flags.in_test,
+		)
+
+
+def get_independent_repost_groups(riv_entries):
+	"""Partition queued entries into connected components of the item and voucher graph.
+
+	Entries are linked through the items they repost and the vouchers whose ledgers they repost.
+	Items are linked when a voucher posted after the earliest entry has SLEs of both, since
+	reposting either item reposts the ledgers of that voucher.
+
+	Returns a list of groups, each group is a list of entry names in the original order.
+	"""
+	parent = {}
+
+	def find(node):
+		parent.setdefault(node, node)
+		while parent[node] != node:
+			parent[node] = parent[parent[node]]
+			node = parent[node]
+		return node
+
+	def union(first, second):
+		parent[find(first)] = find(second)
+
+	items, posting_dates = set(), []
+	for row in riv_entries:
+		doc = frappe.get_doc("Repost Item Valuation", row.name)
+		posting_dates.append(getdate(doc.posting_date))
+
+		for item_code in get_items_of_repost_entry(doc):
+			union(("riv", doc.name), ("item", item_code))
+			items.add(item_code)
+
+		for voucher_type, voucher_no in get_vouchers_of_repost_entry(doc):
+			union(("riv", doc.name), ("voucher", voucher_type, voucher_no))
+
+	# vouchers are linked to the items they post, entries sharing a voucher end up in the same group
+	vouchers = [node[1:] for node in parent if node[0] == "voucher"]
+	for voucher, item_code in get_items_of_vouchers(vouchers):
+		union(("voucher", *voucher), ("item", item_code))
+		items.add(item_code)
+
+	# items posted in the same voucher (repack, manufacture, multi item transactions) are reposted together
+	while items:
+		new_items = set()
+		for item_code, linked_item_code in get_items_of_shared_vouchers(items, min(posting_dates)):
+			if ("item", linked_item_code) not in parent:
+				new_items.add(linked_item_code)
+			union(("item", item_code), ("item", linked_item_code))
+
+		items = new_items
+
+	groups = {}
+	for row in riv_entries:
+		groups.setdefault(find(("riv", row.name)), []).append(row.name)
+
+	return list(groups.values())
+
+
+def get_items_of_repost_entry(doc):
+	items = set()
+	if doc.based_on == "Transaction":
+		items.update(
+			row.get("item_code") for row in get_items_to_be_repost(doc.voucher_type, doc.voucher_no, doc)
+		)
+	elif doc.item_code:
+		items.add(doc.item_code)
+
+	# item-warehouses discovered while the entry was being reposted
+	if doc.reposting_data_file or doc.distinct_item_and_warehouse:
+		items.update(key[0] for key in get_distinct_item_warehouse(doc=doc))
+
+	return items
+
+
+def get_vouchers_of_repost_entry(doc):
+	vouchers = get_affected_transactions(doc)
+	if doc.based_on == "Transaction":
+		vouchers.add((doc.voucher_type, doc.voucher_no))
+
+	return vouchers
+
+
+def get_items_of_shared_vouchers(items, from_date):
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	other_sle = frappe.qb.DocType("Stock Ledger Entry").as_("other_sle")
+
+	return (
+		frappe.qb.from_(sle)
+		.inner_join(other_sle)
+		.on((other_sle.voucher_type == sle.voucher_type) & (other_sle.voucher_no == sle.voucher_no))
+		.select(sle.item_code, other_sle.item_code)
+		.distinct()
+		.where(
+			(sle.item_code.isin(list(items)))
+			& (sle.posting_date >= from_date)
+			& (sle.is_cancelled == 0)
+			& (other_sle.is_cancelled == 0)
+			& (other_sle.item_code != sle.item_code)
+		)
+	).run()
+
+
+def get_items_of_vouchers(vouchers):
+	"""Items posted by each voucher, as ((voucher_type, voucher_no), item_code) pairs."""
+	if not vouchers:
+		return []
+
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	voucher_nos = {voucher_no for _voucher_type, voucher_no in vouchers}
+
+	rows = (
+		frappe.qb.from_(sle)
+		.select(sle.voucher_type, sle.voucher_no, sle.item_code)
+		.distinct()
+		.where(sle.voucher_no.isin(list(voucher_nos)) & (sle.is_cancelled == 0))
+	).run()
+
+	vouchers = set(vouchers)
+	return [
+		((voucher_type, voucher_no), item_code)
+		for voucher_type, voucher_no, item_code in rows
+		if (voucher_type, voucher_no) in vouchers
+	]
+
 
 def get_repost_item_valuation_entries():
 	return frappe.db.sql(
@@ -2,7 +2,7 @@
 # See license.txt
 
 
-from unittest.mock import MagicMock, call
+from unittest.mock import MagicMock, call, patch
 
 import frappe
 from frappe.tests.utils import FrappeTestCase, change_settings
@@ -14,7 +14,9 @@ from erpnext.controllers.stock_controller import create_item_wise_repost_entries
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.purchase_receipt.test_purchase_receipt import make_purchase_receipt
 from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import (
+	get_independent_repost_groups,
 	in_configured_timeslot,
+	repost_entries,
 )
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
 from erpnext.stock.tests.test_utils import StockTestMixin
@@ -420,6 +422,236 @@ class TestRepostItemValuation(FrappeTestCase, StockTestMixin):
 		self.assertRaises(frappe.ValidationError, riv.save)
 		doc.cancel()
 
+	@change_settings(
+		"Stock Reposting Settings",
+		{"stop_reposting_on_convergence": 1, "reposting_checkpoint_interval": 2},
+	)
+	def test_reposting_stops_on_convergence(self):
+		from erpnext.stock.stock_ledger import update_entries_after
+
+		item = self.make_item().name
+		warehouse = "_Test Warehouse - _TC"
+
+		make_stock_entry(
+			item_code=item, to_warehouse=warehouse, qty=5, rate=10, posting_date=add_days(today(), -5)
+		)
+		make_stock_entry(item_code=item, from_warehouse=warehouse, qty=5, posting_date=add_days(today(), -4))
+		for days in (-3, -2, -1):
+			make_stock_entry(
+				item_code=item, to_warehouse=warehouse, qty=1, rate=20, posting_date=add_days(today(), days)
+			)
+
+		processed = []
+		process_sle = update_entries_after.process_sle
+
+		def _process_sle(obj, sle):
+			processed.append(sle.voucher_no)
+			return process_sle(obj, sle)
+
+		with patch.object(update_entries_after, "process_sle", _process_sle):
+			update_entries_after(
+				{
+					"item_code": item,
+					"warehouse": warehouse,
+					"posting_date": add_days(today(), -6),
+					"posting_time": "00:00:00",
+				}
+			)
+
+		# first entry after the reposting timestamp already has the recomputed values
+		self.assertEqual(len(processed), 1)
+
+		bin_values = frappe.db.get_value(
+			"Bin", {"item_code": item, "warehouse": warehouse}, ["actual_qty", "stock_value"], as_dict=1
+		)
+		self.assertEqual(bin_values.actual_qty, 3)
+		self.assertEqual(bin_values.stock_value, 60)
+
+	@change_settings("Stock Reposting Settings", {"reposting_checkpoint_interval": 2})
+	def test_reposting_across_checkpoints(self):
+		from erpnext.stock.stock_ledger import update_entries_after
+
+		item = self.make_item().name
+		warehouse = "_Test Warehouse - _TC"
+
+		# entries with the same posting datetime are split across checkpoints
+		vouchers = [
+			make_stock_entry(
+				item_code=item,
+				to_warehouse=warehouse,
+				qty=1,
+				rate=10,
+				posting_date=add_days(today(), -3),
+				posting_time="10:00:00",
+			).name
+			for _ in range(3)
+		]
+		vouchers += [
+			make_stock_entry(
+				item_code=item, to_warehouse=warehouse, qty=1, rate=10, posting_date=add_days(today(), days)
+			).name
+			for days in (-2, -1)
+		]
+
+		processed = []
+		process_sle = update_entries_after.process_sle
+
+		def _process_sle(obj, sle):
+			processed.append(sle.voucher_no)
+			return process_sle(obj, sle)
+
+		with patch.object(update_entries_after, "process_sle", _process_sle):
+			update_entries_after(
+				{
+					"item_code": item,
+					"warehouse": warehouse,
+					"posting_date": add_days(today(), -4),
+					"posting_time": "00:00:00",
+				}
+			)
+
+		# every entry is reposted once, in posting order
+		self.assertEqual(processed, vouchers)
+
+		bin_values = frappe.db.get_value(
+			"Bin", {"item_code": item, "warehouse": warehouse}, ["actual_qty", "stock_value"], as_dict=1
+		)
+		self.assertEqual(bin_values.actual_qty, 5)
+		self.assertEqual(bin_values.stock_value, 50)
+
+	@change_settings("Stock Reposting Settings", {"stop_reposting_on_convergence": 1})
+	def test_no_convergence_on_negative_stock(self):
+		from erpnext.stock.stock_ledger import NegativeStockError, update_entries_after
+
+		item = self.make_item().name
+		warehouse = "_Test Warehouse - _TC"
+
+		receipt = make_stock_entry(
+			item_code=item, to_warehouse=warehouse, qty=5, rate=10, posting_date=add_days(today(), -5)
+		)
+		make_stock_entry(item_code=item, from_warehouse=warehouse, qty=5, posting_date=add_days(today(), -4))
+		for days in (-3, -2):
+			make_stock_entry(
+				item_code=item, to_warehouse=warehouse, qty=1, rate=20, posting_date=add_days(today(), days)
+			)
+
+		# the issue goes negative once the receipt is reposted, and is skipped with its stored values
+		frappe.db.set_value("Stock Ledger Entry", {"voucher_no": receipt.name}, "actual_qty", 2)
+
+		processed = []
+		process_sle = update_entries_after.process_sle
+
+		def _process_sle(obj, sle):
+			processed.append(sle.voucher_no)
+			return process_sle(obj, sle)
+
+		with patch.object(update_entries_after, "process_sle", _process_sle):
+			self.assertRaises(
+				NegativeStockError,
+				update_entries_after,
+				{
+					"item_code": item,
+					"warehouse": warehouse,
+					"posting_date": add_days(today(), -6),
+					"posting_time": "00:00:00",
+				},
+			)
+
+		self.assertEqual(len(processed), 4)
+
+	def test_independent_repost_groups(self):
+		frappe.flags.dont_execute_stock_reposts = True
+
+		item_a, item_b = self.make_item().name, self.make_item().name
+		warehouse = "_Test Warehouse - _TC"
+
+		entries = []
+		for item_code in (item_a, item_b, item_a):
+			riv = frappe.get_doc(
+				doctype="Repost Item Valuation",
+				based_on="Item and Warehouse",
+				item_code=item_code,
+				warehouse=warehouse,
+				posting_date=today(),
+				posting_time="00:01:00",
+			)
+			riv.submit()
+			self.addCleanup(riv.db_set, "status", "Skipped")
+			entries.append(frappe._dict(name=riv.name))
+
+		groups = get_independent_repost_groups(entries)
+		self.assertEqual(len(groups), 2)
+		self.assertIn([entries[0].name, entries[2].name], groups)
+		self.assertIn([entries[1].name], groups)
+
+	def test_repost_groups_linked_by_voucher(self):
+		frappe.flags.dont_execute_stock_reposts = True
+
+		item_a, item_b, item_c = self.make_item().name, self.make_item().name, self.make_item().name
+		warehouse = "_Test Warehouse - _TC"
+
+		# a single voucher posts both items, reposting either one reposts its ledgers
+		se = make_stock_entry(item_code=item_a, to_warehouse=warehouse, qty=1, rate=10, do_not_save=True)
+		se.append(
+			"items",
+			frappe.copy_doc(se.items[0]).update(
+				{"item_code": item_b, "item_name": item_b, "description": item_b}
+			),
+		)
+		se.insert()
+		se.submit()
+
+		entries = []
+		for item_code in (item_a, item_b, item_c):
+			riv = frappe.get_doc(
+				doctype="Repost Item Valuation",
+				based_on="Item and Warehouse",
+				item_code=item_code,
+				warehouse=warehouse,
+				posting_date=add_days(today(), -1),
+				posting_time="00:01:00",
+			)
+			riv.submit()
+			self.addCleanup(riv.db_set, "status", "Skipped")
+			entries.append(frappe._dict(name=riv.name))
+
+		groups = get_independent_repost_groups(entries)
+		self.assertEqual(len(groups), 2)
+		self.assertIn([entries[0].name, entries[1].name], groups)
+		self.assertIn([entries[2].name], groups)
+
+	@change_settings("Stock Reposting Settings", {"parallel_reposting_workers": 2})
+	def test_parallel_reposting(self):
+		frappe.flags.dont_execute_stock_reposts = True
+
+		warehouse = "_Test Warehouse - _TC"
+		entries = []
+		for item_code in (self.make_item().name, self.make_item().name):
+			make_stock_entry(item_code=item_code, to_warehouse=warehouse, qty=1, rate=10)
+
+			riv = frappe.get_doc(
+				doctype="Repost Item Valuation",
+				based_on="Item and Warehouse",
+				item_code=item_code,
+				warehouse=warehouse,
+				posting_date=add_days(today(), -1),
+				posting_time="00:01:00",
+			)
+			riv.submit()
+			entries.append(frappe._dict(name=riv.name))
+
+		module = "erpnext.stock.doctype.repost_item_valuation.repost_item_valuation"
+		with patch(f"{module}.get_repost_item_valuation_entries", return_value=entries):
+			with patch(f"{module}.frappe.enqueue", wraps=frappe.enqueue) as enqueue:
+				repost_entries()
+
+		# independent entries are reposted in separate jobs
+		buckets = sorted(call.kwargs["riv_names"] for call in enqueue.call_args_list)
+		self.assertEqual(buckets, sorted([entry.name] for entry in entries))
+
+		for entry in entries:
+			self.assertEqual(frappe.db.get_value("Repost Item Valuation", entry.name, "status"), "Completed")
+
 	def test_remove_attached_file(self):
 		item_code = make_item("_Test Remove Attached File Item", properties={"is_stock_item": 1})
 
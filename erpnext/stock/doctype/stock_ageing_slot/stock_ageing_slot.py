@@ -0,0 +1,274 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, get_datetime, getdate, today
+from frappe.utils.background_jobs import is_job_enqueued
+
+from erpnext.stock.report.stock_ageing.stock_ageing import FIFOSlots
+from erpnext.stock.utils import get_sle_chunks
+
+REBUILD_JOB_ID = "rebuild_stock_ageing_slots"
+
+
+class StockAgeingSlot(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		company: DF.Link | None
+		fifo_queue: DF.LongText | None
+		item_code: DF.Link | None
+		posting_datetime: DF.Datetime | None
+		qty_after_transaction: DF.Float
+		rebuild_pending: DF.Check
+		sle_creation: DF.Datetime | None
+		total_qty: DF.Float
+		warehouse: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique(
+		"Stock Ageing Slot", ["item_code", "warehouse"], constraint_name="unique_item_warehouse"
+	)
+
+
+def is_ageing_slot_store_enabled() -> bool:
+	return bool(frappe.db.get_single_value("Stock Settings", "maintain_stock_ageing_slots", cache=True))
+
+
+def can_use_stock_ageing_slots(to_date) -> bool:
+	"""Stored slots hold the latest ageing, so they can only be used for ageing as on today or later."""
+	return (
+		is_ageing_slot_store_enabled()
+		and getdate(to_date) >= getdate(today())
+		and not is_job_enqueued(REBUILD_JOB_ID)
+	)
+
+
+def enqueue_rebuild_stock_ageing_slots():
+	frappe.enqueue(
+		"erpnext.stock.doctype.stock_ageing_slot.stock_ageing_slot.rebuild_stock_ageing_slots",
+		queue="long",
+		timeout=7200,
+		job_id=REBUILD_JOB_ID,
+		deduplicate=True,
+		enqueue_after_commit=True,
+		now=frappe.flags.in_test,
+	)
+
+
+def rebuild_stock_ageing_slots():
+	"""Rebuild the slots of every item-warehouse, run when the store is enabled."""
+	if not is_ageing_slot_store_enabled():
+		return
+
+	for item_code, warehouse in frappe.get_all("Bin", fields=["item_code", "warehouse"], as_list=True):
+		rebuild_stock_ageing_slot(item_code, warehouse)
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+
+def update_stock_ageing_slots(item_code, warehouse, posting_datetime=None, rebuild=False):
+	"""Apply the stock ledger entries posted after the last applied entry to the stored slots.
+
+	A backdated or cancelled entry changes every entry after it, so the slots have to be rebuilt
+	from the first entry of the item-warehouse. The rebuild is enqueued, the slots are marked as
+	pending and the report replays the ledger of the item-warehouse until it is done.
+	"""
+	if not is_ageing_slot_store_enabled():
+		return
+
+	# serial nos keep their first inward date across warehouses, so they are always replayed
+	if frappe.get_cached_value("Item", item_code, "has_serial_no"):
+		return
+
+	slot = get_slot(item_code, warehouse)
+	if not slot:
+		apply_stock_ledger_entries(item_code, warehouse, frappe._dict())
+		return
+
+	if posting_datetime and get_datetime(posting_datetime) < get_datetime(slot.posting_datetime):
+		rebuild = True
+
+	if rebuild or slot.rebuild_pending:
+		if not slot.rebuild_pending:
+			frappe.db.set_value("Stock Ageing Slot", slot.name, "rebuild_pending", 1)
+
+		enqueue_rebuild_stock_ageing_slot(item_code, warehouse)
+		return
+
+	apply_stock_ledger_entries(item_code, warehouse, slot)
+
+
+def enqueue_rebuild_stock_ageing_slot(item_code, warehouse):
+	frappe.enqueue(
+		"erpnext.stock.doctype.stock_ageing_slot.stock_ageing_slot.rebuild_stock_ageing_slot",
+		queue="long",
+		job_id=f"{REBUILD_JOB_ID}::{item_code}::{warehouse}",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		now=frappe.flags.in_test,
+		item_code=item_code,
+		warehouse=warehouse,
+	)
+
+
+def rebuild_stock_ageing_slot(item_code, warehouse):
+	"""Rebuild the slots of the item-warehouse from its first stock ledger entry."""
+	if not is_ageing_slot_store_enabled() or frappe.get_cached_value("Item", item_code, "has_serial_no"):
+		return
+
+	slot = get_slot(item_code, warehouse)
+	apply_stock_ledger_entries(item_code, warehouse, frappe._dict({"name": slot.name if slot else None}))
+
+
+def get_slot(item_code, warehouse):
+	return frappe.db.get_value(
+		"Stock Ageing Slot",
+		{"item_code": item_code, "warehouse": warehouse},
+		[
+			"name",
+			"posting_datetime",
+			"sle_creation",
+			"qty_after_transaction",
+			"total_qty",
+			"fifo_queue",
+			"rebuild_pending",
+		],
+		as_dict=True,
+		for_update=True,
+	)
+
+
+def apply_stock_ledger_entries(item_code, warehouse, slot):
+	"""Add the entries posted after the slot to it, replaying all the entries if the slot has none."""
+	key = (item_code, warehouse)
+	fifo_slots = FIFOSlots(frappe._dict({"show_warehouse_wise_stock": True}))
+	fifo_slots.bundle_wise_serial_nos = frappe._dict()
+	if slot.posting_datetime:
+		fifo_slots.item_details[key] = {
+			"details": frappe._dict(),
+			"fifo_queue": load_fifo_queue(slot.fifo_queue),
+			"qty_after_transaction": flt(slot.qty_after_transaction),
+			"total_qty": flt(slot.total_qty),
+		}
+
+	last_sle = None
+	for sle_entries in get_sle_chunks(get_stock_ledger_query(item_code, warehouse, slot)):
+		for sle in sle_entries:
+			fifo_slots.add_entry(sle)
+			last_sle = sle
+
+	if not last_sle:
+		if slot.name and not slot.posting_datetime:
+			# no active entries are left for the item-warehouse
+			frappe.delete_doc("Stock Ageing Slot", slot.name, ignore_permissions=True, force=True)
+
+		return
+
+	item_details = fifo_slots.item_details[key]
+	values = {
+		"posting_datetime": last_sle.posting_datetime,
+		"sle_creation": last_sle.creation,
+		"qty_after_transaction": flt(item_details["qty_after_transaction"]),
+		"total_qty": flt(item_details["total_qty"]),
+		"fifo_queue": dump_fifo_queue(item_details["fifo_queue"]),
+		"rebuild_pending": 0,
+	}
+
+	if slot.name:
+		frappe.db.set_value("Stock Ageing Slot", slot.name, values)
+	else:
+		frappe.get_doc(
+			{
+				"doctype": "Stock Ageing Slot",
+				"item_code": item_code,
+				"warehouse": warehouse,
+				"company": frappe.get_cached_value("Warehouse", warehouse, "company"),
+				**values,
+			}
+		).insert(ignore_permissions=True)
+
+
+def update_stock_ageing_slots_after_repost(item_code, warehouse, posting_date):
+	"""Reposting only changes the running balance of later entries.
+
+	Slots use the running balance to get the qty of Stock Reconciliation entries, so they are
+	rebuilt only if such an entry exists after the reposting date.
+	"""
+	if not is_ageing_slot_store_enabled():
+		return
+
+	if frappe.db.exists(
+		"Stock Ledger Entry",
+		{
+			"item_code": item_code,
+			"warehouse": warehouse,
+			"voucher_type": "Stock Reconciliation",
+			"posting_date": (">=", posting_date),
+			"is_cancelled": 0,
+		},
+	):
+		update_stock_ageing_slots(item_code, warehouse, rebuild=True)
+		return
+
+	frappe.db.set_value(
+		"Stock Ageing Slot",
+		{"item_code": item_code, "warehouse": warehouse},
+		"qty_after_transaction",
+		flt(frappe.db.get_value("Bin", {"item_code": item_code, "warehouse": warehouse}, "actual_qty")),
+	)
+
+
+def get_stock_ledger_query(item_code, warehouse, slot):
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+
+	query = (
+		frappe.qb.from_(sle)
+		.select(
+			sle.item_code.as_("name"),
+			sle.warehouse,
+			sle.actual_qty,
+			sle.qty_after_transaction,
+			sle.posting_date,
+			sle.posting_datetime,
+			sle.creation,
+			sle.voucher_type,
+			sle.voucher_no,
+			sle.serial_no,
+			sle.serial_and_batch_bundle,
+			sle.has_serial_no,
+		)
+		.where((sle.item_code == item_code) & (sle.warehouse == warehouse) & (sle.is_cancelled == 0))
+		.orderby(sle.posting_datetime)
+		.orderby(sle.creation)
+		.orderby(sle.actual_qty)
+	)
+
+	if slot.posting_datetime:
+		query = query.where(
+			(sle.posting_datetime > slot.posting_datetime)
+			| ((sle.posting_datetime == slot.posting_datetime) & (sle.creation > slot.sle_creation))
+		)
+
+	return query
+
+
+def load_fifo_queue(fifo_queue: str | None) -> list:
+	return [[flt(qty), getdate(posting_date)] for qty, posting_date in json.loads(fifo_queue or "[]")]
+
+
+def dump_fifo_queue(fifo_queue: list) -> str:
+	return json.dumps([[qty, str(posting_date)] for qty, posting_date in fifo_queue], separators=(",", ":"))
@@ -0,0 +1,78 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+from frappe.utils import add_days, getdate, today
+
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_ageing_slot.stock_ageing_slot import load_fifo_queue
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.report.stock_ageing.stock_ageing import FIFOSlots
+
+
+class TestStockAgeingSlot(FrappeTestCase):
+	@change_settings("Stock Settings", {"maintain_stock_ageing_slots": 1})
+	def test_slots_updated_on_stock_transactions(self):
+		item_code = make_item("_Test Stock Ageing Slot Item", {"is_stock_item": 1}).name
+		warehouse = "_Test Warehouse - _TC"
+
+		make_stock_entry(
+			item_code=item_code, target=warehouse, qty=10, basic_rate=100, posting_date=add_days(today(), -10)
+		)
+		make_stock_entry(
+			item_code=item_code, target=warehouse, qty=5, basic_rate=100, posting_date=add_days(today(), -5)
+		)
+		make_stock_entry(item_code=item_code, source=warehouse, qty=12, posting_date=today())
+
+		filters = {"item_code": item_code, "warehouse": warehouse}
+		fifo_queue = load_fifo_queue(frappe.db.get_value("Stock Ageing Slot", filters, "fifo_queue"))
+		self.assertEqual(fifo_queue, [[3.0, getdate(add_days(today(), -5))]])
+
+		# backdated entry rebuilds the slots
+		make_stock_entry(
+			item_code=item_code, target=warehouse, qty=4, basic_rate=100, posting_date=add_days(today(), -20)
+		)
+
+		fifo_queue = load_fifo_queue(frappe.db.get_value("Stock Ageing Slot", filters, "fifo_queue"))
+		self.assertEqual(
+			fifo_queue, [[2.0, getdate(add_days(today(), -10))], [5.0, getdate(add_days(today(), -5))]]
+		)
+
+		# report reads the stored slots
+		slots = FIFOSlots(
+			frappe._dict({"company": "_Test Company", "to_date": today(), **filters})
+		).generate()
+		self.assertEqual(slots[item_code]["fifo_queue"], fifo_queue)
+		self.assertEqual(slots[item_code]["total_qty"], 7.0)
+
+	@change_settings("Stock Settings", {"maintain_stock_ageing_slots": 1})
+	def test_slots_rebuilt_on_cancel(self):
+		item_code = make_item(properties={"is_stock_item": 1}).name
+		warehouse = "_Test Warehouse - _TC"
+		filters = {"item_code": item_code, "warehouse": warehouse}
+
+		receipt = make_stock_entry(
+			item_code=item_code, target=warehouse, qty=10, basic_rate=100, posting_date=add_days(today(), -10)
+		)
+		make_stock_entry(
+			item_code=item_code, target=warehouse, qty=5, basic_rate=100, posting_date=add_days(today(), -5)
+		)
+
+		receipt.cancel()
+
+		slot = frappe.db.get_value(
+			"Stock Ageing Slot", filters, ["fifo_queue", "rebuild_pending"], as_dict=True
+		)
+		self.assertEqual(load_fifo_queue(slot.fifo_queue), [[5.0, getdate(add_days(today(), -5))]])
+		self.assertFalse(slot.rebuild_pending)
+
+		# slots waiting to be rebuilt are replayed from the ledger by the report
+		frappe.db.set_value(
+			"Stock Ageing Slot", filters, {"rebuild_pending": 1, "fifo_queue": "[]", "total_qty": 0}
+		)
+		slots = FIFOSlots(
+			frappe._dict({"company": "_Test Company", "to_date": today(), **filters})
+		).generate()
+		self.assertEqual(slots[item_code]["fifo_queue"], [[5.0, getdate(add_days(today(), -5))]])
+		self.assertEqual(slots[item_code]["total_qty"], 5.0)
@@ -0,0 +1,169 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Max
+from frappe.utils import add_months, flt, get_last_day, getdate, now, today
+
+from erpnext.stock.report.stock_balance.stock_balance import StockBalanceReport
+
+
+class StockBalanceSnapshot(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		bal_qty: DF.Float
+		bal_val: DF.Currency
+		company: DF.Link | None
+		item_code: DF.Link | None
+		posting_date: DF.Date | None
+		val_rate: DF.Currency
+		warehouse: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+class StockBalanceSnapshotBuilder(StockBalanceReport):
+	"""Stock Balance report which only uses the previous snapshot as opening balance."""
+
+	def get_closing_balance(self):
+		return []
+
+
+def on_doctype_update():
+	frappe.db.add_index("Stock Balance Snapshot", ["company", "posting_date"])
+	frappe.db.add_index("Stock Balance Snapshot", ["item_code", "warehouse", "posting_date"])
+
+
+def is_snapshot_enabled() -> bool:
+	return bool(frappe.db.get_single_value("Stock Settings", "maintain_stock_balance_snapshots", cache=True))
+
+
+def create_stock_balance_snapshots():
+	"""Create month end snapshots of stock balance for all companies, called monthly via hooks.py."""
+	if not is_snapshot_enabled():
+		return
+
+	posting_date = get_last_day(add_months(today(), -1))
+	for company in frappe.get_all("Company", pluck="name"):
+		if frappe.db.exists("Stock Balance Snapshot", {"company": company, "posting_date": posting_date}):
+			continue
+
+		make_stock_balance_snapshot(company, posting_date)
+		frappe.db.commit()
+
+
+def make_stock_balance_snapshot(company, posting_date):
+	"""Store the balance of every item-warehouse of the company as on the posting date.
+
+	The previous snapshot is used as opening balance, so only the SLEs posted after it are read.
+	"""
+	_columns, data = StockBalanceSnapshotBuilder(
+		frappe._dict({"company": company, "from_date": posting_date, "to_date": posting_date})
+	).run()
+
+	insert_snapshot_rows(
+		[
+			(row.company, row.item_code, row.warehouse, posting_date, row.bal_qty, row.bal_val, row.val_rate)
+			for row in data
+		]
+	)
+
+
+def insert_snapshot_rows(rows):
+	if not rows:
+		return
+
+	timestamp = now()
+	user = frappe.session.user
+
+	frappe.db.bulk_insert(
+		"Stock Balance Snapshot",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"company",
+			"item_code",
+			"warehouse",
+			"posting_date",
+			"bal_qty",
+			"bal_val",
+			"val_rate",
+		],
+		values=[(frappe.generate_hash(length=10), timestamp, timestamp, user, user, *row) for row in rows],
+	)
+
+
+def get_latest_snapshot_date(company, before_date):
+	"""Date of the latest snapshot of the company strictly before `before_date`."""
+	snapshot = frappe.qb.DocType("Stock Balance Snapshot")
+
+	posting_date = (
+		frappe.qb.from_(snapshot)
+		.select(Max(snapshot.posting_date))
+		.where((snapshot.company == company) & (snapshot.posting_date < before_date))
+	).run()
+
+	return posting_date[0][0] if posting_date else None
+
+
+def update_stock_balance_snapshots(item_code, warehouse, posting_date):
+	"""Refresh snapshots of the item-warehouse on or after the posting date from its latest SLEs."""
+	if not is_snapshot_enabled():
+		return
+
+	company = frappe.get_cached_value("Warehouse", warehouse, "company")
+	snapshot_dates = frappe.get_all(
+		"Stock Balance Snapshot",
+		filters={"company": company, "posting_date": (">=", getdate(posting_date))},
+		pluck="posting_date",
+		distinct=True,
+	)
+
+	if not snapshot_dates:
+		return
+
+	frappe.db.delete(
+		"Stock Balance Snapshot",
+		{"item_code": item_code, "warehouse": warehouse, "posting_date": ("in", snapshot_dates)},
+	)
+
+	rows = []
+	for snapshot_date in snapshot_dates:
+		sle = frappe.get_all(
+			"Stock Ledger Entry",
+			filters={
+				"item_code": item_code,
+				"warehouse": warehouse,
+				"is_cancelled": 0,
+				"posting_date": ("<=", snapshot_date),
+			},
+			fields=["qty_after_transaction", "stock_value", "valuation_rate"],
+			order_by="posting_datetime desc, creation desc",
+			limit=1,
+		)
+
+		if sle and (flt(sle[0].qty_after_transaction) or flt(sle[0].stock_value)):
+			rows.append(
+				(
+					company,
+					item_code,
+					warehouse,
+					snapshot_date,
+					sle[0].qty_after_transaction,
+					sle[0].stock_value,
+					sle[0].valuation_rate,
+				)
+			)
+
+	insert_snapshot_rows(rows)
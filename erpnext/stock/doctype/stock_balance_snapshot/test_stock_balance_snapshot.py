@@ -0,0 +1,57 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+from frappe.utils import add_days, today
+
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+	make_stock_balance_snapshot,
+)
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+
+
+class TestStockBalanceSnapshot(FrappeTestCase):
+	@change_settings("Stock Settings", {"maintain_stock_balance_snapshots": 1})
+	def test_snapshot_refreshed_by_backdated_entries(self):
+		item_code = make_item(properties={"is_stock_item": 1, "valuation_method": "Moving Average"}).name
+		warehouse = "_Test Warehouse - _TC"
+		snapshot_date = add_days(today(), -2)
+
+		make_stock_entry(
+			item_code=item_code, to_warehouse=warehouse, qty=10, rate=100, posting_date=add_days(today(), -5)
+		)
+		make_stock_balance_snapshot("_Test Company", snapshot_date)
+		self.assertSnapshot(item_code, warehouse, snapshot_date, 10, 1000)
+
+		# entries after the snapshot date leave it unchanged
+		make_stock_entry(item_code=item_code, to_warehouse=warehouse, qty=5, rate=100)
+		self.assertSnapshot(item_code, warehouse, snapshot_date, 10, 1000)
+
+		receipt = make_stock_entry(
+			item_code=item_code, to_warehouse=warehouse, qty=5, rate=200, posting_date=add_days(today(), -4)
+		)
+		self.assertSnapshot(item_code, warehouse, snapshot_date, 15, 2000)
+
+		issue = make_stock_entry(
+			item_code=item_code, from_warehouse=warehouse, qty=3, posting_date=add_days(today(), -3)
+		)
+		self.assertSnapshot(item_code, warehouse, snapshot_date, 12, 1600)
+
+		issue.cancel()
+		self.assertSnapshot(item_code, warehouse, snapshot_date, 15, 2000)
+
+		receipt.cancel()
+		self.assertSnapshot(item_code, warehouse, snapshot_date, 10, 1000)
+
+	def assertSnapshot(self, item_code, warehouse, posting_date, bal_qty, bal_val):
+		snapshots = frappe.get_all(
+			"Stock Balance Snapshot",
+			filters={"item_code": item_code, "warehouse": warehouse, "posting_date": posting_date},
+			fields=["bal_qty", "bal_val"],
+		)
+
+		self.assertEqual(len(snapshots), 1)
+		self.assertEqual(snapshots[0].bal_qty, bal_qty)
+		self.assertEqual(snapshots[0].bal_val, bal_val)
@@ -1709,6 +1709,135 @@ class TestStockEntry(FrappeTestCase):
 			mr.cancel()
 			mr.delete()
 
+	def test_preview_reorder_item(self):
+		from erpnext.stock.reorder_item import preview_reorder_item
+
+		item_doc = make_item("Test Reorder Preview Item", properties={"is_stock_item": 1})
+		if not item_doc.reorder_levels:
+			item_doc.append(
+				"reorder_levels",
+				{
+					"warehouse_reorder_level": 5,
+					"warehouse_reorder_qty": 10,
+					"warehouse": "_Test Warehouse - _TC",
+					"material_request_type": "Purchase",
+				},
+			)
+			item_doc.save(ignore_permissions=True)
+
+		make_stock_entry(item_code=item_doc.name, target="_Test Warehouse - _TC", qty=2, basic_rate=100)
+		mr_count = frappe.db.count("Material Request Item", {"item_code": item_doc.name})
+
+		rows = [
+			row
+			for request in preview_reorder_item()
+			for row in request["items"]
+			if row["item_code"] == item_doc.name
+		]
+
+		# projected qty 2 is below the reorder level 5, the reorder qty is more than the shortage of 3
+		self.assertEqual(len(rows), 1)
+		self.assertEqual(rows[0]["qty"], 10)
+		self.assertEqual(rows[0]["warehouse"], "_Test Warehouse - _TC")
+		self.assertEqual(frappe.db.count("Material Request Item", {"item_code": item_doc.name}), mr_count)
+
+	def test_preview_reorder_item_for_variants(self):
+		from erpnext.controllers.item_variant import create_variant, get_variant
+		from erpnext.stock.reorder_item import preview_reorder_item
+
+		template = make_item(
+			"Test Reorder Template Item",
+			properties={"is_stock_item": 1, "has_variants": 1, "attributes": [{"attribute": "Test Size"}]},
+		)
+		template.set(
+			"reorder_levels",
+			[
+				{
+					"warehouse_reorder_level": 5,
+					"warehouse_reorder_qty": 10,
+					"warehouse": "_Test Warehouse - _TC",
+					"material_request_type": "Purchase",
+				}
+			],
+		)
+		template.save(ignore_permissions=True)
+
+		variants = {}
+		for size, reorder_levels in (
+			("Small", []),
+			(
+				"Large",
+				[
+					{
+						"warehouse_reorder_level": 3,
+						"warehouse_reorder_qty": 4,
+						"warehouse": "_Test Warehouse 1 - _TC",
+						"material_request_type": "Purchase",
+					}
+				],
+			),
+		):
+			variant_name = get_variant(template.name, {"Test Size": size})
+			variant = (
+				frappe.get_doc("Item", variant_name)
+				if variant_name
+				else create_variant(template.name, {"Test Size": size})
+			)
+
+			variant.set("reorder_levels", reorder_levels)
+			variant.save(ignore_permissions=True)
+			variants[size] = variant.name
+
+		def get_planned_rows(item_code):
+			return [
+				(row["warehouse"], row["qty"])
+				for request in preview_reorder_item()
+				for row in request["items"]
+				if row["item_code"] == item_code
+			]
+
+		# the variant without reorder levels of its own is reordered from the level of its template
+		self.assertEqual(get_planned_rows(variants["Small"]), [("_Test Warehouse - _TC", 10)])
+
+		# the variant with reorder levels of its own does not use the levels of its template
+		self.assertEqual(get_planned_rows(variants["Large"]), [("_Test Warehouse 1 - _TC", 4)])
+
+		# the template itself holds no stock and is never reordered
+		self.assertEqual(get_planned_rows(template.name), [])
+
+	def test_planned_material_requests_are_split(self):
+		from erpnext.stock.reorder_item import (
+			MAX_ITEMS_PER_MATERIAL_REQUEST,
+			get_planned_material_requests,
+		)
+
+		items = [
+			{
+				"item_code": f"_Test Reorder Split Item {i}",
+				"warehouse": "_Test Warehouse - _TC",
+				"reorder_qty": 1,
+				"item_details": frappe._dict(
+					{
+						"name": f"_Test Reorder Split Item {i}",
+						"item_name": f"_Test Reorder Split Item {i}",
+						"stock_uom": "Nos",
+					}
+				),
+			}
+			for i in range(MAX_ITEMS_PER_MATERIAL_REQUEST + 1)
+		]
+
+		planned = get_planned_material_requests(
+			{"Purchase": {}, "Transfer": {"_Test Company": items}, "Material Issue": {}, "Manufacture": {}}
+		)
+
+		self.assertEqual([len(request["items"]) for request in planned], [MAX_ITEMS_PER_MATERIAL_REQUEST, 1])
+		self.assertEqual({request["material_request_type"] for request in planned}, {"Material Transfer"})
+		self.assertEqual(
+			[row["item_code"] for request in planned for row in request["items"]],
+			[d["item_code"] for d in items],
+		)
+
 	def test_use_serial_and_batch_fields(self):
 		item = make_item(
 			"Test Use Serial and Batch Item SN Item",
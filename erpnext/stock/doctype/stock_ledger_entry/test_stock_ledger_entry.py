@@ -3,6 +3,7 @@
 
 import json
 import time
+from unittest.mock import Mock, patch
 from uuid import uuid4
 
 import frappe
@@ -26,7 +27,11 @@ from erpnext.stock.doctype.stock_ledger_entry.stock_ledger_entry import BackDate
 from erpnext.stock.doctype.stock_reconciliation.test_stock_reconciliation import (
 	create_stock_reconciliation,
 )
-from erpnext.stock.stock_ledger import get_previous_sle
+from erpnext.stock.stock_ledger import (
+	get_previous_sle,
+	get_previous_sle_of_current_voucher,
+	get_previous_sle_of_item_warehouses,
+)
 from erpnext.stock.tests.test_utils import StockTestMixin
 
 
@@ -971,6 +976,20 @@ class TestStockLedgerEntry(FrappeTestCase, StockTestMixin):
 		# same exact queue should be transferred
 		self.assertSLEs(repack, [{"incoming_rate": sum(rates) * 10}], sle_filters={"item_code": packed.name})
 
+	def test_fifo_valuation_rate_after_issue(self):
+		item = make_item(properties={"valuation_method": "FIFO"}).name
+		warehouse = "_Test Warehouse - _TC"
+
+		receipt1 = make_stock_entry(item_code=item, target=warehouse, qty=10, rate=10)
+		self.assertSLEs(receipt1, [{"stock_queue": [[10, 10]], "valuation_rate": 10}])
+
+		receipt2 = make_stock_entry(item_code=item, target=warehouse, qty=10, rate=20)
+		self.assertSLEs(receipt2, [{"stock_queue": [[10, 10], [10, 20]], "valuation_rate": 15}])
+
+		# the issue consumes the older bin first, only stock received at 20 remains
+		issue = make_stock_entry(item_code=item, source=warehouse, qty=15)
+		self.assertSLEs(issue, [{"stock_queue": [[5, 20]], "stock_value": 100, "valuation_rate": 20}])
+
 	def test_negative_fifo_valuation(self):
 		"""
 		When stock goes negative discard FIFO queue.
@@ -1177,6 +1196,64 @@ class TestStockLedgerEntry(FrappeTestCase, StockTestMixin):
 		self.assertEqual(sle[0].qty_after_transaction, 105)
 		self.assertEqual(sle[0].actual_qty, 5)
 
+	def test_previous_sle_of_item_warehouses(self):
+		item = make_item().name
+		warehouses = ["_Test Warehouse - _TC", "Stores - _TC"]
+
+		for warehouse in warehouses:
+			make_stock_entry(
+				item_code=item, to_warehouse=warehouse, qty=10, rate=10, posting_date=add_days(today(), -2)
+			)
+
+		make_stock_entry(
+			item_code=item, to_warehouse=warehouses[0], qty=5, rate=10, posting_date=add_days(today(), -1)
+		)
+
+		sl_entries = [
+			frappe._dict(item_code=item, warehouse=warehouse, posting_date=today(), posting_time="23:59:59")
+			for warehouse in warehouses
+		]
+
+		previous_sles = get_previous_sle_of_item_warehouses(sl_entries)
+		for sle in sl_entries:
+			expected_sle = get_previous_sle_of_current_voucher(frappe._dict(sle))
+			self.assertEqual(previous_sles[(sle.item_code, sle.warehouse)].name, expected_sle.name)
+
+		self.assertEqual(previous_sles[(item, warehouses[0])].qty_after_transaction, 15)
+		self.assertEqual(previous_sles[(item, warehouses[1])].qty_after_transaction, 10)
+
+	def test_bins_locked_upfront(self):
+		item = make_item().name
+		warehouses = ["_Test Warehouse - _TC", "Stores - _TC"]
+
+		make_stock_entry(item_code=item, to_warehouse=warehouses[1], qty=5, rate=10)
+
+		with patch("erpnext.stock.stock_ledger.record_bin_lock_waits") as record_bin_lock_waits:
+			se = make_stock_entry(
+				item_code=item, from_warehouse=warehouses[1], to_warehouse=warehouses[0], qty=5
+			)
+
+		voucher_type, voucher_no, lock_waits = record_bin_lock_waits.call_args.args
+		self.assertEqual((voucher_type, voucher_no), ("Stock Entry", se.name))
+		self.assertEqual(set(lock_waits), {(item, warehouse) for warehouse in warehouses})
+
+	def test_bins_locked_before_entries_are_cancelled(self):
+		from erpnext.stock import stock_ledger
+
+		item = make_item().name
+		se = make_stock_entry(item_code=item, to_warehouse="_Test Warehouse - _TC", qty=5, rate=10)
+
+		calls = Mock()
+		with patch("erpnext.stock.stock_ledger.lock_bins", wraps=stock_ledger.lock_bins) as lock_bins:
+			with patch(
+				"erpnext.stock.stock_ledger.set_as_cancel", wraps=stock_ledger.set_as_cancel
+			) as set_as_cancel:
+				calls.attach_mock(lock_bins, "lock_bins")
+				calls.attach_mock(set_as_cancel, "set_as_cancel")
+				se.cancel()
+
+		self.assertEqual([call[0] for call in calls.mock_calls], ["lock_bins", "set_as_cancel"])
+
 	def test_backdated_sle_with_same_timestamp(self):
 		item = make_item().name
 		warehouse = "_Test Warehouse - _TC"
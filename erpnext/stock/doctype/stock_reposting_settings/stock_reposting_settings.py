@@ -24,7 +24,10 @@ class StockRepostingSettings(Document):
 			"", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
 		]
 		notify_reposting_error_to_role: DF.Link | None
+		parallel_reposting_workers: DF.Int
+		reposting_checkpoint_interval: DF.Int
 		start_time: DF.Time | None
+		stop_reposting_on_convergence: DF.Check
 	# end: auto-generated types
 
 	def validate(self):
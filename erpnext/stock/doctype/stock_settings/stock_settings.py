@@ -45,6 +45,9 @@ class StockSettings(Document):
 		enable_stock_reservation: DF.Check
 		item_group: DF.Link | None
 		item_naming_by: DF.Literal["Item Code", "Naming Series"]
+		maintain_item_search_index: DF.Check
+		maintain_stock_ageing_slots: DF.Check
+		maintain_stock_balance_snapshots: DF.Check
 		mr_qty_allowance: DF.Float
 		naming_series_prefix: DF.Data | None
 		over_delivery_receipt_allowance: DF.Float
@@ -97,6 +100,8 @@ class StockSettings(Document):
 		self.validate_warehouses()
 		self.cant_change_valuation_method()
 		self.validate_clean_description_html()
+		self.validate_stock_ageing_slots()
+		self.validate_item_search_index()
 		self.validate_pending_reposts()
 		self.validate_stock_reservation()
 		self.change_precision_for_for_sales()
@@ -158,6 +163,24 @@ class StockSettings(Document):
 				enqueue_after_commit=True,
 			)
 
+	def validate_stock_ageing_slots(self):
+		if self.maintain_stock_ageing_slots and self.has_value_changed("maintain_stock_ageing_slots"):
+			from erpnext.stock.doctype.stock_ageing_slot.stock_ageing_slot import (
+				enqueue_rebuild_stock_ageing_slots,
+			)
+
+			# slots are not maintained while disabled, rebuild them from the stock ledger
+			enqueue_rebuild_stock_ageing_slots()
+
+	def validate_item_search_index(self):
+		if self.maintain_item_search_index and self.has_value_changed("maintain_item_search_index"):
+			from erpnext.stock.doctype.item_search_token.item_search_token import (
+				enqueue_rebuild_item_search_tokens,
+			)
+
+			# tokens are not maintained while disabled, rebuild them for every item
+			enqueue_rebuild_item_search_tokens()
+
 	def validate_pending_reposts(self):
 		if self.stock_frozen_upto:
 			check_pending_reposting(self.stock_frozen_upto)
@@ -23,6 +23,7 @@ from erpnext.setup.utils import get_exchange_rate
 from erpnext.stock.doctype.item.item import get_item_defaults, get_uom_conv_factor
 from erpnext.stock.doctype.item_manufacturer.item_manufacturer import get_item_manufacturer_part_no
 from erpnext.stock.doctype.price_list.price_list import get_price_list_details
+from erpnext.utilities.regional import temporary_flag
 
 sales_doctypes = ["Quotation", "Sales Order", "Delivery Note", "Sales Invoice", "POS Invoice"]
 purchase_doctypes = [
@@ -129,6 +130,117 @@ def get_item_details(args, doc=None, for_validate=False, overwrite_warehouse=Tru
 	return out
 
 
+@frappe.whitelist()
+def get_item_details_batch(args_list, doc=None, for_validate=False, overwrite_warehouse=True):
+	"""Item details of every row in `args_list`, in the same order.
+
+	Item Price, Bin, UOM conversion and Item Tax rows of all the items are fetched upfront,
+	so that adding many rows to a document does not make a round trip per row.
+	"""
+	args_list = [process_args(args) for args in process_string_args(args_list)]
+	if isinstance(doc, str):
+		doc = json.loads(doc)
+
+	item_codes = {args.item_code for args in args_list}
+	price_lists = {args.price_list for args in args_list}
+
+	with temporary_flag("item_details_prefetch", prefetch_item_details(item_codes, price_lists)):
+		return [get_item_details(args, doc, for_validate, overwrite_warehouse) for args in args_list]
+
+
+def prefetch_item_details(item_codes, price_lists):
+	"""Rows used by get_item_details for the items, set as `frappe.flags.item_details_prefetch`."""
+	item_codes = [item_code for item_code in item_codes if item_code]
+	price_lists = [price_list for price_list in price_lists if price_list]
+
+	prefetch = frappe._dict(
+		{
+			"items": {},
+			"item_codes": set(),
+			"price_lists": set(price_lists),
+			"item_prices": {},
+			"packing_units": {},
+			"bins": {},
+			"child_warehouses": {},
+			"conversion_factors": {},
+			"items_with_taxes": set(),
+		}
+	)
+
+	if not item_codes:
+		return prefetch
+
+	for item in frappe.get_all(
+		"Item",
+		filters={"name": ("in", item_codes)},
+		fields=[
+			"name",
+			"variant_of",
+			"stock_uom",
+			"default_item_manufacturer",
+			"default_manufacturer_part_no",
+		],
+	):
+		prefetch.items[item.name] = item
+
+	prefetch.item_codes = set(prefetch.items) | {
+		d.variant_of for d in prefetch.items.values() if d.variant_of
+	}
+	all_item_codes = list(prefetch.item_codes)
+
+	if price_lists:
+		item_prices = frappe.get_all(
+			"Item Price",
+			filters={"item_code": ("in", all_item_codes), "price_list": ("in", price_lists)},
+			fields=[
+				"name",
+				"item_code",
+				"price_list",
+				"price_list_rate",
+				"uom",
+				"batch_no",
+				"customer",
+				"supplier",
+				"valid_from",
+				"valid_upto",
+				"packing_unit",
+			],
+		)
+
+		# same order as get_item_price
+		item_prices.sort(
+			key=lambda d: (getdate(d.valid_from or "1900-01-01"), cstr(d.batch_no), cstr(d.uom)), reverse=True
+		)
+
+		for d in item_prices:
+			prefetch.item_prices.setdefault((d.item_code, d.price_list), []).append(d)
+			prefetch.packing_units[d.name] = d.packing_unit
+
+	bin = frappe.qb.DocType("Bin")
+	wh = frappe.qb.DocType("Warehouse")
+	for d in (
+		frappe.qb.from_(bin)
+		.inner_join(wh)
+		.on(bin.warehouse == wh.name)
+		.select(bin.item_code, bin.warehouse, bin.projected_qty, bin.actual_qty, bin.reserved_qty, wh.company)
+		.where(bin.item_code.isin(list(prefetch.items)))
+	).run(as_dict=True):
+		prefetch.bins.setdefault(d.item_code, []).append(d)
+
+	for d in frappe.get_all(
+		"UOM Conversion Detail",
+		filters={"parent": ("in", all_item_codes), "parenttype": "Item"},
+		fields=["parent", "uom", "conversion_factor"],
+	):
+		prefetch.conversion_factors[(d.parent, d.uom)] = d.conversion_factor
+
+	prefetch.items_with_taxes = set(
+		frappe.get_all("Item Tax", filters={"parent": ("in", all_item_codes)}, pluck="parent", distinct=True)
+	)
+
+	return prefetch
+
+
 def remove_standard_fields(details):
 	for key in child_table_fields + default_fields:
 		details.pop(key, None)
@@ -268,7 +380,7 @@ def get_basic_details(args, item, overwrite_warehouse=True):
 	if not item:
 		item = frappe.get_doc("Item", args.get("item_code"))
 
-	if item.variant_of and not item.taxes and frappe.db.exists("Item Tax", {"parent": item.variant_of}):
+	if item.variant_of and not item.taxes and has_item_taxes(item.variant_of):
 		item.update_template_tables()
 
 	item_defaults = get_item_defaults(item.name, args.company)
@@ -434,9 +546,13 @@ def get_basic_details(args, item, overwrite_warehouse=True):
 			out["manufacturer_part_no"] = None
 			out["manufacturer"] = None
 	else:
-		data = frappe.get_value(
-			"Item", item.name, ["default_item_manufacturer", "default_manufacturer_part_no"], as_dict=1
-		)
+		prefetch = frappe.flags.item_details_prefetch
+		if prefetch and item.name in prefetch.items:
+			data = prefetch.items[item.name]
+		else:
+			data = frappe.get_value(
+				"Item", item.name, ["default_item_manufacturer", "default_manufacturer_part_no"], as_dict=1
+			)
 
 		if data:
 			out.update(
@@ -457,6 +573,14 @@ def get_basic_details(args, item, overwrite_warehouse=True):
 	return out
 
 
+def has_item_taxes(item_code):
+	prefetch = frappe.flags.item_details_prefetch
+	if prefetch and item_code in prefetch.item_codes:
+		return item_code in prefetch.items_with_taxes
+
+	return bool(frappe.db.exists("Item Tax", {"parent": item_code}))
+
+
 def get_item_warehouse(item, args, overwrite_warehouse, defaults=None):
 	if not defaults:
 		defaults = frappe._dict(
@@ -911,6 +1035,10 @@ def get_item_price(args, item_code, ignore_party=False) -> list[dict]:
 	:param item_code: str, Item Doctype field item_code
 	"""
 
+	prefetch = frappe.flags.item_details_prefetch
+	if prefetch and item_code in prefetch.item_codes and args.get("price_list") in prefetch.price_lists:
+		return get_prefetched_item_price(prefetch, args, item_code, ignore_party)
+
 	ip = frappe.qb.DocType("Item Price")
 	query = (
 		frappe.qb.from_(ip)
@@ -944,6 +1072,34 @@ def get_item_price(args, item_code, ignore_party=False) -> list[dict]:
 	return query.run(as_dict=True)
 
 
+def get_prefetched_item_price(prefetch, args, item_code, ignore_party=False) -> list[dict]:
+	"""Same as `get_item_price`, from the Item Price rows prefetched for the item."""
+	transaction_date = getdate(args["transaction_date"]) if args.get("transaction_date") else None
+
+	for d in prefetch.item_prices.get((item_code, args.get("price_list")), []):
+		if cstr(d.uom) not in ("", args.get("uom")) or cstr(d.batch_no) not in ("", args.get("batch_no")):
+			continue
+
+		if not ignore_party:
+			if args.get("customer"):
+				if d.customer != args.get("customer"):
+					continue
+			elif args.get("supplier"):
+				if d.supplier != args.get("supplier"):
+					continue
+			elif d.customer or d.supplier:
+				continue
+
+		if transaction_date and not (
+			getdate(d.valid_from or "2000-01-01") <= transaction_date <= getdate(d.valid_upto or "2500-12-31")
+		):
+			continue
+
+		return [frappe._dict({"name": d.name, "price_list_rate": d.price_list_rate, "uom": d.uom})]
+
+	return []
+
+
 def get_price_list_rate_for(args, item_code):
 	"""
 	:param customer: link to Customer DocType
@@ -1005,9 +1161,14 @@ def check_packing_list(price_list_rate_name, desired_qty, item_code):
 	"""
 
 	flag = True
-	item_price = frappe.get_doc("Item Price", price_list_rate_name)
-	if item_price.packing_unit:
-		packing_increment = desired_qty % item_price.packing_unit
+	prefetch = frappe.flags.item_details_prefetch
+	if prefetch and price_list_rate_name in prefetch.packing_units:
+		packing_unit = prefetch.packing_units[price_list_rate_name]
+	else:
+		packing_unit = frappe.get_doc("Item Price", price_list_rate_name).packing_unit
+
+	if packing_unit:
+		packing_increment = desired_qty % packing_unit
 
 		if packing_increment != 0:
 			flag = False
@@ -1142,6 +1303,17 @@ def get_pos_profile(company, pos_profile=None, user=None):
 
 @frappe.whitelist()
 def get_conversion_factor(item_code, uom):
+	prefetch = frappe.flags.item_details_prefetch
+	if prefetch and item_code in prefetch.items:
+		item = prefetch.items[item_code]
+		conversion_factor = prefetch.conversion_factors.get(
+			(item_code, uom)
+		) or prefetch.conversion_factors.get((item.variant_of, uom))
+		if not conversion_factor:
+			conversion_factor = get_uom_conv_factor(uom, item.stock_uom)
+
+		return {"conversion_factor": conversion_factor or 1.0}
+
 	variant_of = frappe.db.get_value("Item", item_code, "variant_of", cache=True)
 	filters = {"parent": item_code, "uom": uom}
 
@@ -1166,6 +1338,10 @@ def get_projected_qty(item_code, warehouse):
 
 @frappe.whitelist()
 def get_bin_details(item_code, warehouse, company=None, include_child_warehouses=False):
+	prefetch = frappe.flags.item_details_prefetch
+	if prefetch and item_code in prefetch.items:
+		return get_prefetched_bin_details(prefetch, item_code, warehouse, company, include_child_warehouses)
+
 	bin_details = {"projected_qty": 0, "actual_qty": 0, "reserved_qty": 0}
 
 	if warehouse:
@@ -1192,6 +1368,32 @@ def get_bin_details(item_code, warehouse, company=None, include_child_warehouses
 	return bin_details
 
 
+def get_prefetched_bin_details(prefetch, item_code, warehouse, company=None, include_child_warehouses=False):
+	"""Same as `get_bin_details`, from the Bin rows prefetched for the item."""
+	from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
+
+	bin_details = {"projected_qty": 0, "actual_qty": 0, "reserved_qty": 0}
+	bins = prefetch.bins.get(item_code, [])
+
+	if warehouse:
+		if include_child_warehouses:
+			if warehouse not in prefetch.child_warehouses:
+				prefetch.child_warehouses[warehouse] = set(get_child_warehouses(warehouse))
+			warehouses = prefetch.child_warehouses[warehouse]
+		else:
+			warehouses = {warehouse}
+
+		for d in bins:
+			if d.warehouse in warehouses:
+				for key in bin_details:
+					bin_details[key] += flt(d.get(key))
+
+	if company:
+		bin_details["company_total_stock"] = sum(flt(d.actual_qty) for d in bins if d.company == company)
+
+	return bin_details
+
+
 def get_company_total_stock(item_code, company):
 	bin = frappe.qb.DocType("Bin")
 	wh = frappe.qb.DocType("Warehouse")
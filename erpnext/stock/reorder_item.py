@@ -7,10 +7,13 @@ from math import ceil
 
 import frappe
 from frappe import _
-from frappe.utils import add_days, cint, flt, nowdate
+from frappe.utils import add_days, cint, create_batch, flt, nowdate
 
 import erpnext
 
+# items of each Material Request, requests with more items are split
+MAX_ITEMS_PER_MATERIAL_REQUEST = 500
+
 
 def reorder_item():
 	"""Reorder item if stock reaches reorder level"""
@@ -22,76 +25,38 @@ def reorder_item():
 		return _reorder_item()
 
 
-def _reorder_item():
-	material_requests = {"Purchase": {}, "Transfer": {}, "Material Issue": {}, "Manufacture": {}}
-	warehouse_company = frappe._dict(
-		frappe.db.sql(
-			"""select name, company from `tabWarehouse`
-		where disabled=0"""
-		)
-	)
-	default_company = (
-		erpnext.get_default_company() or frappe.db.sql("""select name from tabCompany limit 1""")[0][0]
-	)
-
-	items_to_consider = get_items_for_reorder()
-
-	if not items_to_consider:
-		return
-
-	item_warehouse_projected_qty = get_item_warehouse_projected_qty(items_to_consider)
-
-	def add_to_material_request(**kwargs):
-		if isinstance(kwargs, dict):
-			kwargs = frappe._dict(kwargs)
-
-		if kwargs.warehouse not in warehouse_company:
-			# a disabled warehouse
-			return
+@frappe.whitelist()
+def preview_reorder_item():
+	"""Material Requests the next reorder run would create, without creating them."""
+	frappe.has_permission("Material Request", "create", throw=True)
 
-		reorder_level = flt(kwargs.reorder_level)
-		reorder_qty = flt(kwargs.reorder_qty)
-
-		# projected_qty will be 0 if Bin does not exist
-		if kwargs.warehouse_group:
-			projected_qty = flt(
-				item_warehouse_projected_qty.get(kwargs.item_code, {}).get(kwargs.warehouse_group)
-			)
-		else:
-			projected_qty = flt(item_warehouse_projected_qty.get(kwargs.item_code, {}).get(kwargs.warehouse))
+	if not (frappe.db.a_row_exists("Company") and frappe.db.a_row_exists("Fiscal Year")):
+		return []
 
-		if (reorder_level or reorder_qty) and projected_qty <= reorder_level:
-			deficiency = reorder_level - projected_qty
-			if deficiency > reorder_qty:
-				reorder_qty = deficiency
+	return _reorder_item(dry_run=True)
 
-			company = warehouse_company.get(kwargs.warehouse) or default_company
 
-			material_requests[kwargs.material_request_type].setdefault(company, []).append(
-				{
-					"item_code": kwargs.item_code,
-					"warehouse": kwargs.warehouse,
-					"reorder_qty": reorder_qty,
-					"item_details": kwargs.item_details,
-				}
-			)
+def _reorder_item(dry_run=False):
+	material_requests = {"Purchase": {}, "Transfer": {}, "Material Issue": {}, "Manufacture": {}}
+	default_company = (
+		erpnext.get_default_company() or frappe.db.sql("""select name from tabCompany limit 1""")[0][0]
+	)
 
-	for item_code, reorder_levels in items_to_consider.items():
-		for d in reorder_levels:
-			if d.has_variants:
-				continue
-
-			add_to_material_request(
-				item_code=item_code,
-				warehouse=d.warehouse,
-				reorder_level=d.warehouse_reorder_level,
-				reorder_qty=d.warehouse_reorder_qty,
-				material_request_type=d.material_request_type,
-				warehouse_group=d.warehouse_group,
-				item_details=frappe._dict(
+	for d in get_reorder_shortages():
+		reorder_qty = flt(d.warehouse_reorder_qty)
+		deficiency = flt(d.warehouse_reorder_level) - flt(d.projected_qty)
+		if deficiency > reorder_qty:
+			reorder_qty = deficiency
+
+		material_requests[d.material_request_type].setdefault(d.company or default_company, []).append(
+			{
+				"item_code": d.item_code,
+				"warehouse": d.warehouse,
+				"reorder_qty": reorder_qty,
+				"item_details": frappe._dict(
 					{
-						"item_code": item_code,
-						"name": item_code,
+						"item_code": d.item_code,
+						"name": d.item_code,
 						"item_name": d.item_name,
 						"item_group": d.item_group,
 						"brand": d.brand,
@@ -100,152 +65,124 @@ def _reorder_item():
 						"purchase_uom": d.purchase_uom,
 					}
 				),
-			)
-
-	if material_requests:
-		return create_material_request(material_requests)
-
-
-def get_items_for_reorder() -> dict[str, list]:
-	reorder_table = frappe.qb.DocType("Item Reorder")
-	item_table = frappe.qb.DocType("Item")
-
-	query = (
-		frappe.qb.from_(reorder_table)
-		.inner_join(item_table)
-		.on(reorder_table.parent == item_table.name)
-		.select(
-			reorder_table.warehouse,
-			reorder_table.warehouse_group,
-			reorder_table.material_request_type,
-			reorder_table.warehouse_reorder_level,
-			reorder_table.warehouse_reorder_qty,
-			item_table.name,
-			item_table.stock_uom,
-			item_table.purchase_uom,
-			item_table.description,
-			item_table.item_name,
-			item_table.item_group,
-			item_table.brand,
-			item_table.variant_of,
-			item_table.has_variants,
+			}
 		)
-		.where(
-			(item_table.disabled == 0)
-			& (item_table.is_stock_item == 1)
-			& (
-				(item_table.end_of_life.isnull())
-				| (item_table.end_of_life > nowdate())
-				| (item_table.end_of_life == "0000-00-00")
-			)
-		)
-	)
-
-	data = query.run(as_dict=True)
-	itemwise_reorder = frappe._dict({})
-	for d in data:
-		itemwise_reorder.setdefault(d.name, []).append(d)
 
-	itemwise_reorder = get_reorder_levels_for_variants(itemwise_reorder)
-
-	return itemwise_reorder
+	if dry_run:
+		return get_planned_material_requests(material_requests)
+
+	return create_material_request(material_requests)
+
+
+def get_reorder_shortages() -> list[dict]:
+	"""Reorder levels at or above the projected qty, with the projected qty of their warehouse.
+
+	Variants without reorder levels of their own use the levels of their template. The projected qty of
+	a level with a warehouse group is the total of all warehouses under the group.
+	"""
+	item_conditions = """{item}.disabled = 0 and {item}.is_stock_item = 1
+		and ({item}.end_of_life is null or {item}.end_of_life > %(today)s
+			or {item}.end_of_life = '0000-00-00')"""
+
+	return frappe.db.sql(
+		f"""
+		select * from (
+			select
+				reorder.*,
+				warehouse.company,
+				ifnull(
+					(
+						select sum(bin.projected_qty)
+						from `tabBin` bin
+						inner join `tabWarehouse` bin_warehouse on bin_warehouse.name = bin.warehouse
+						where bin.item_code = reorder.item_code
+							and bin_warehouse.lft >= target.lft and bin_warehouse.rgt <= target.rgt
+					),
+					0
+				) as projected_qty
+			from (
+				select
+					item.name as item_code, item.item_name, item.item_group, item.brand, item.description,
+					item.stock_uom, item.purchase_uom, ir.warehouse, ir.warehouse_group,
+					ir.material_request_type, ir.warehouse_reorder_level, ir.warehouse_reorder_qty
+				from `tabItem` item
+				inner join `tabItem Reorder` ir on ir.parent = item.name and ir.parenttype = 'Item'
+				where {item_conditions.format(item="item")} and item.has_variants = 0
+
+				union all
+
+				select
+					item.name as item_code, item.item_name, item.item_group, item.brand, item.description,
+					item.stock_uom, item.purchase_uom, ir.warehouse, ir.warehouse_group,
+					ir.material_request_type, ir.warehouse_reorder_level, ir.warehouse_reorder_qty
+				from `tabItem` item
+				inner join `tabItem` template on template.name = item.variant_of
+				inner join `tabItem Reorder` ir on ir.parent = template.name and ir.parenttype = 'Item'
+				where {item_conditions.format(item="item")} and {item_conditions.format(item="template")}
+					and item.has_variants = 0
+					and not exists (
+						select name from `tabItem Reorder` own
+						where own.parent = item.name and own.parenttype = 'Item'
+					)
+			) reorder
+			inner join `tabWarehouse` warehouse
+				on warehouse.name = reorder.warehouse and warehouse.disabled = 0
+			left join `tabWarehouse` target
+				on target.name = ifnull(nullif(reorder.warehouse_group, ''), reorder.warehouse)
+		) levels
+		where (levels.warehouse_reorder_level != 0 or levels.warehouse_reorder_qty != 0)
+			and levels.projected_qty <= levels.warehouse_reorder_level
+		order by levels.item_code, levels.warehouse
+		""",
+		{"today": nowdate()},
+		as_dict=True,
+	)
 
 
-def get_reorder_levels_for_variants(itemwise_reorder):
-	item_table = frappe.qb.DocType("Item")
+def get_planned_material_requests(material_requests):
+	"""Material Requests to create, one per company and type, split every MAX_ITEMS_PER_MATERIAL_REQUEST items."""
+	rows = [
+		(request_type, d)
+		for request_type in material_requests
+		for items in material_requests[request_type].values()
+		for d in items
+	]
 
-	query = (
-		frappe.qb.from_(item_table)
-		.select(
-			item_table.name,
-			item_table.variant_of,
-		)
-		.where(
-			(item_table.disabled == 0)
-			& (item_table.is_stock_item == 1)
-			& (
-				(item_table.end_of_life.isnull())
-				| (item_table.end_of_life > nowdate())
-				| (item_table.end_of_life == "0000-00-00")
-			)
-			& (item_table.variant_of.notnull())
+	conversion_factors = get_purchase_conversion_factors(
+		[d["item_details"] for request_type, d in rows if request_type == "Purchase"]
+	)
+	whole_number_uoms = set(
+		frappe.get_all(
+			"UOM",
+			filters={
+				"must_be_whole_number": 1,
+				"name": (
+					"in",
+					list(
+						{d["item_details"].stock_uom for _request_type, d in rows}
+						| {d["item_details"].purchase_uom for _request_type, d in rows}
+					),
+				),
+			},
+			pluck="name",
 		)
 	)
 
-	variants_item = query.run(as_dict=True)
-	for row in variants_item:
-		if not itemwise_reorder.get(row.name) and itemwise_reorder.get(row.variant_of):
-			itemwise_reorder.setdefault(row.name, []).extend(itemwise_reorder.get(row.variant_of, []))
-
-	return itemwise_reorder
-
-
-def get_item_warehouse_projected_qty(items_to_consider):
-	item_warehouse_projected_qty = {}
-	items_to_consider = list(items_to_consider.keys())
-
-	for item_code, warehouse, projected_qty in frappe.db.sql(
-		"""select item_code, warehouse, projected_qty
-		from tabBin where item_code in ({})
-			and (warehouse != '' and warehouse is not null)""".format(
-			", ".join(["%s"] * len(items_to_consider))
-		),
-		items_to_consider,
-	):
-		if item_code not in item_warehouse_projected_qty:
-			item_warehouse_projected_qty.setdefault(item_code, {})
-
-		if warehouse not in item_warehouse_projected_qty.get(item_code):
-			item_warehouse_projected_qty[item_code][warehouse] = flt(projected_qty)
-
-		warehouse_doc = frappe.get_doc("Warehouse", warehouse)
-
-		while warehouse_doc.parent_warehouse:
-			if not item_warehouse_projected_qty.get(item_code, {}).get(warehouse_doc.parent_warehouse):
-				item_warehouse_projected_qty.setdefault(item_code, {})[warehouse_doc.parent_warehouse] = flt(
-					projected_qty
-				)
-			else:
-				item_warehouse_projected_qty[item_code][warehouse_doc.parent_warehouse] += flt(projected_qty)
-			warehouse_doc = frappe.get_doc("Warehouse", warehouse_doc.parent_warehouse)
-
-	return item_warehouse_projected_qty
-
-
-def create_material_request(material_requests):
-	"""Create indent on reaching reorder level"""
-	mr_list = []
-	exceptions_list = []
-
-	def _log_exception(mr):
-		if frappe.local.message_log:
-			exceptions_list.extend(frappe.local.message_log)
-			frappe.local.message_log = []
-		else:
-			exceptions_list.append(frappe.get_traceback(with_context=True))
-
-		mr.log_error("Unable to create material request")
-
-	company_wise_mr = frappe._dict({})
+	planned = []
 	for request_type in material_requests:
-		for company in material_requests[request_type]:
-			try:
-				items = material_requests[request_type][company]
-				if not items:
-					continue
-
-				mr = frappe.new_doc("Material Request")
-				mr.update(
+		for company, items in material_requests[request_type].items():
+			for batch in create_batch(items, MAX_ITEMS_PER_MATERIAL_REQUEST):
+				request = frappe._dict(
 					{
 						"company": company,
-						"transaction_date": nowdate(),
 						"material_request_type": "Material Transfer"
 						if request_type == "Transfer"
 						else request_type,
+						"items": [],
 					}
 				)
 
-				for d in items:
+				for d in batch:
 					d = frappe._dict(d)
 					item = d.get("item_details")
 					uom = item.stock_uom
@@ -254,22 +191,13 @@ def create_material_request(material_requests):
 					if request_type == "Purchase":
 						uom = item.purchase_uom or item.stock_uom
 						if uom != item.stock_uom:
-							conversion_factor = (
-								frappe.db.get_value(
-									"UOM Conversion Detail",
-									{"parent": item.name, "uom": uom},
-									"conversion_factor",
-								)
-								or 1.0
-							)
-
-					must_be_whole_number = frappe.db.get_value("UOM", uom, "must_be_whole_number", cache=True)
+							conversion_factor = conversion_factors.get((item.name, uom)) or 1.0
+
 					qty = d.reorder_qty / conversion_factor
-					if must_be_whole_number:
+					if uom in whole_number_uoms:
 						qty = ceil(qty)
 
-					mr.append(
-						"items",
+					request["items"].append(
 						{
 							"doctype": "Material Request Item",
 							"item_code": d.item_code,
@@ -283,20 +211,85 @@ def create_material_request(material_requests):
 							"description": item.description,
 							"item_group": item.item_group,
 							"brand": item.brand,
-						},
+						}
 					)
 
-				schedule_dates = [d.schedule_date for d in mr.items]
-				mr.schedule_date = max(schedule_dates or [nowdate()])
-				mr.flags.ignore_mandatory = True
-				mr.insert()
-				mr.submit()
-				mr_list.append(mr)
+				planned.append(request)
+
+	return planned
+
+
+def get_purchase_conversion_factors(items):
+	item_uoms = {
+		(item.name, item.purchase_uom)
+		for item in items
+		if item.purchase_uom and item.purchase_uom != item.stock_uom
+	}
+	if not item_uoms:
+		return {}
+
+	conversion_factors = {}
+	for d in frappe.get_all(
+		"UOM Conversion Detail",
+		filters={
+			"parenttype": "Item",
+			"parent": ("in", list({item_code for item_code, _uom in item_uoms})),
+			"uom": ("in", list({uom for _item_code, uom in item_uoms})),
+		},
+		fields=["parent", "uom", "conversion_factor"],
+	):
+		conversion_factors.setdefault((d.parent, d.uom), d.conversion_factor)
+
+	return conversion_factors
+
 
-				company_wise_mr.setdefault(company, []).append(mr)
+def create_material_request(material_requests):
+	"""Create indent on reaching reorder level"""
+	mr_list = []
+	exceptions_list = []
+
+	def _log_exception(mr):
+		if frappe.local.message_log:
+			exceptions_list.extend(frappe.local.message_log)
+			frappe.local.message_log = []
+		else:
+			exceptions_list.append(frappe.get_traceback(with_context=True))
+
+		mr.log_error("Unable to create material request")
+
+	company_wise_mr = frappe._dict({})
+	for request in get_planned_material_requests(material_requests):
+		mr = frappe.new_doc("Material Request")
+
+		try:
+			frappe.db.savepoint("reorder_material_request")
+			mr.update(
+				{
+					"company": request.company,
+					"transaction_date": nowdate(),
+					"material_request_type": request.material_request_type,
+				}
+			)
+
+			for d in request["items"]:
+				mr.append("items", d)
+
+			schedule_dates = [d.schedule_date for d in mr.items]
+			mr.schedule_date = max(schedule_dates or [nowdate()])
+			mr.flags.ignore_mandatory = True
+			mr.insert()
+			mr.submit()
+			mr_list.append(mr)
+
+			company_wise_mr.setdefault(request.company, []).append(mr)
+
+		except Exception:
+			frappe.db.rollback(save_point="reorder_material_request")
+			_log_exception(mr)
 
-			except Exception:
-				_log_exception(mr)
+		if not frappe.flags.in_test:
+			# each request is committed on its own, so rows are not locked for the whole run
+			frappe.db.commit()  # nosemgrep
 
 	if company_wise_mr:
 		if getattr(frappe.local, "reorder_email_notify", None) is None:
@@ -2,14 +2,15 @@
 # License: GNU General Public License v3. See license.txt
 
 
-from collections.abc import Iterator
 from operator import itemgetter
 
 import frappe
 from frappe import _
+from frappe.query_builder import Criterion
 from frappe.utils import cint, date_diff, flt
 
 from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos
+from erpnext.stock.utils import get_sle_chunks
 
 Filters = frappe._dict
 
@@ -212,6 +213,8 @@ class FIFOSlots:
 		self.item_details = {}
 		self.transferred_item_details = {}
 		self.serial_no_batch_purchase_details = {}
+		self.bundle_wise_serial_nos = None
+		self.last_posting_date = None
 		self.filters = filters
 		self.sle = sle
 
@@ -226,51 +229,79 @@ class FIFOSlots:
 		}
 		"""
 
+		if self.sle is None:
+			from erpnext.stock.doctype.stock_ageing_slot.stock_ageing_slot import (
+				can_use_stock_ageing_slots,
+			)
+
+			self.prepare_bundle_wise_serial_nos()
+
+			# stored slots cover non serialized items, serialized items and pending slots are replayed
+			use_stored_slots = bool(self.filters.get("company")) and can_use_stock_ageing_slots(
+				self.filters.get("to_date")
+			)
+			if use_stored_slots:
+				self.__load_stored_slots()
+
+			sle_query = self.__get_stock_ledger_entries(use_stored_slots=use_stored_slots)
+			for stock_ledger_entries in get_sle_chunks(sle_query):
+				for d in stock_ledger_entries:
+					self.add_entry(d)
+		else:
+			for d in self.sle:
+				self.add_entry(d)
+
+		return self.get_slots()
+
+	def prepare_bundle_wise_serial_nos(self) -> None:
+		"Fetch serial nos of bundles upfront, ledger entries are streamed and no query can be run meanwhile."
+		self.bundle_wise_serial_nos = self.__get_bundle_wise_serial_nos()
+
+	def add_entry(self, d: dict) -> None:
+		"Update FIFO Queue of the item-warehouse with the ledger entry."
 		from erpnext.stock.doctype.serial_and_batch_bundle.test_serial_and_batch_bundle import (
 			get_serial_nos_from_bundle,
 		)
 
-		stock_ledger_entries = self.sle
+		self.__release_transfer_buckets(d)
+		key, fifo_queue, transferred_item_key = self.__init_key_stores(d)
 
-		bundle_wise_serial_nos = frappe._dict({})
-		if stock_ledger_entries is None:
-			bundle_wise_serial_nos = self.__get_bundle_wise_serial_nos()
-
-		with frappe.db.unbuffered_cursor():
-			if stock_ledger_entries is None:
-				stock_ledger_entries = self.__get_stock_ledger_entries()
-
-			for d in stock_ledger_entries:
-				key, fifo_queue, transferred_item_key = self.__init_key_stores(d)
-
-				if d.voucher_type == "Stock Reconciliation":
-					# get difference in qty shift as actual qty
-					prev_balance_qty = self.item_details[key].get("qty_after_transaction", 0)
-					d.actual_qty = flt(d.qty_after_transaction) - flt(prev_balance_qty)
-
-				serial_nos = get_serial_nos(d.serial_no) if d.serial_no else []
-				if d.serial_and_batch_bundle and d.has_serial_no:
-					if bundle_wise_serial_nos:
-						serial_nos = bundle_wise_serial_nos.get(d.serial_and_batch_bundle) or []
-					else:
-						serial_nos = get_serial_nos_from_bundle(d.serial_and_batch_bundle) or []
-
-				if d.actual_qty > 0:
-					self.__compute_incoming_stock(d, fifo_queue, transferred_item_key, serial_nos)
-				else:
-					self.__compute_outgoing_stock(d, fifo_queue, transferred_item_key, serial_nos)
+		if d.voucher_type == "Stock Reconciliation":
+			# get difference in qty shift as actual qty
+			prev_balance_qty = self.item_details[key].get("qty_after_transaction", 0)
+			d.actual_qty = flt(d.qty_after_transaction) - flt(prev_balance_qty)
 
-				self.__update_balances(d, key)
+		serial_nos = get_serial_nos(d.serial_no) if d.serial_no else []
+		if d.serial_and_batch_bundle and d.has_serial_no:
+			if self.bundle_wise_serial_nos is not None:
+				serial_nos = self.bundle_wise_serial_nos.get(d.serial_and_batch_bundle) or []
+			else:
+				serial_nos = get_serial_nos_from_bundle(d.serial_and_batch_bundle) or []
+
+		if d.actual_qty > 0:
+			self.__compute_incoming_stock(d, fifo_queue, transferred_item_key, serial_nos)
+		else:
+			self.__compute_outgoing_stock(d, fifo_queue, transferred_item_key, serial_nos)
 
-			# Note that stock_ledger_entries is an iterator, you can not reuse it  like a list
-			del stock_ledger_entries
+		self.__update_balances(d, key)
 
+	def get_slots(self) -> dict:
 		if not self.filters.get("show_warehouse_wise_stock"):
 			# (Item 1, WH 1), (Item 1, WH 2) => (Item 1)
 			self.item_details = self.__aggregate_details_by_item(self.item_details)
 
 		return self.item_details
 
+	def __release_transfer_buckets(self, row: dict) -> None:
+		"""
+		Transfer buckets are only consumed within the same voucher, and all entries of a voucher
+		share the posting date. Drop them once the ledger moves to a later date.
+		"""
+		if self.last_posting_date is not None and row.posting_date > self.last_posting_date:
+			self.transferred_item_details.clear()
+
+		self.last_posting_date = row.posting_date
+
 	def __init_key_stores(self, row: dict) -> tuple:
 		"Initialise keys and FIFO Queue."
 
@@ -396,7 +427,54 @@ class FIFOSlots:
 
 		return item_aggregated_data
 
-	def __get_stock_ledger_entries(self) -> Iterator[dict]:
+	def __load_stored_slots(self) -> None:
+		from erpnext.stock.doctype.stock_ageing_slot.stock_ageing_slot import load_fifo_queue
+
+		slot = frappe.qb.DocType("Stock Ageing Slot")
+		item = self.__get_item_query()  # used as derived table in slot query
+
+		slot_query = (
+			frappe.qb.from_(slot)
+			.from_(item)
+			.select(
+				item.name,
+				item.item_name,
+				item.item_group,
+				item.brand,
+				item.description,
+				item.stock_uom,
+				item.has_serial_no,
+				slot.warehouse,
+				slot.qty_after_transaction,
+				slot.total_qty,
+				slot.fifo_queue,
+				slot.rebuild_pending,
+			)
+			.where(
+				(slot.item_code == item.name)
+				& (slot.company == self.filters.get("company"))
+				& (item.has_serial_no == 0)
+			)
+		)
+
+		slot_query = self.__apply_warehouse_filters(slot, slot_query)
+
+		# slots waiting to be rebuilt are replayed from the ledger
+		self.pending_slots = []
+		for row in slot_query.run(as_dict=True):
+			if row.pop("rebuild_pending"):
+				self.pending_slots.append((row.name, row.warehouse))
+				continue
+
+			self.item_details[(row.name, row.warehouse)] = {
+				"details": row,
+				"fifo_queue": load_fifo_queue(row.pop("fifo_queue")),
+				"qty_after_transaction": row.pop("qty_after_transaction"),
+				"total_qty": row.pop("total_qty"),
+				"has_serial_no": row.has_serial_no,
+			}
+
+	def __get_stock_ledger_entries(self, use_stored_slots: bool = False):
 		sle = frappe.qb.DocType("Stock Ledger Entry")
 		item = self.__get_item_query()  # used as derived table in sle query
 
@@ -429,8 +507,25 @@ class FIFOSlots:
 			)
 		)
 
+		if use_stored_slots:
+			sle_query = sle_query.where(
+				Criterion.any(
+					[item.has_serial_no == 1]
+					+ [
+						(sle.item_code == item_code) & (sle.warehouse == warehouse)
+						for item_code, warehouse in self.pending_slots
+					]
+				)
+			)
+
+		sle_query = self.__apply_warehouse_filters(sle, sle_query)
+		sle_query = sle_query.orderby(sle.posting_date, sle.posting_time, sle.creation, sle.actual_qty)
+
+		return sle_query
+
+	def __apply_warehouse_filters(self, table, query):
 		if self.filters.get("warehouse"):
-			sle_query = self.__get_warehouse_conditions(sle, sle_query)
+			query = self.__get_warehouse_conditions(table, query)
 		elif self.filters.get("warehouse_type"):
 			warehouses = frappe.get_all(
 				"Warehouse",
@@ -439,11 +534,9 @@ class FIFOSlots:
 			)
 
 			if warehouses:
-				sle_query = sle_query.where(sle.warehouse.isin(warehouses))
-
-		sle_query = sle_query.orderby(sle.posting_date, sle.posting_time, sle.creation, sle.actual_qty)
+				query = query.where(table.warehouse.isin(warehouses))
 
-		return sle_query.run(as_dict=True, as_iterator=True)
+		return query
 
 	def __get_bundle_wise_serial_nos(self) -> dict:
 		bundle = frappe.qb.DocType("Serial and Batch Bundle")
@@ -457,12 +550,11 @@ class FIFOSlots:
 			.where(
 				(bundle.docstatus == 1)
 				& (entry.serial_no.isnotnull())
-				& (bundle.company == self.filters.get("company"))
 				& (bundle.posting_date <= self.filters.get("to_date"))
 			)
 		)
 
-		for field in ["item_code"]:
+		for field in ["company", "item_code"]:
 			if self.filters.get(field):
 				query = query.where(bundle[field] == self.filters.get(field))
 
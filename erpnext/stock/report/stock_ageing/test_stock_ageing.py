@@ -722,6 +722,50 @@ class TestStockAgeing(FrappeTestCase):
 		self.assertEqual(bal_qty, 0.9)
 		self.assertEqual(bal_qty, range_qty_sum)
 
+	def test_transfer_buckets_released_on_next_date(self):
+		"Transfer buckets of earlier vouchers are dropped once the ledger moves to a later date."
+		sle = [
+			frappe._dict(
+				name="Flask Item",
+				actual_qty=100,
+				qty_after_transaction=100,
+				warehouse="WH 1",
+				posting_date="2021-12-01",
+				voucher_type="Stock Entry",
+				voucher_no="001",
+				has_serial_no=False,
+				serial_no=None,
+			),
+			frappe._dict(
+				name="Flask Item",
+				actual_qty=(-40),
+				qty_after_transaction=60,
+				warehouse="WH 1",
+				posting_date="2021-12-02",
+				voucher_type="Delivery Note",
+				voucher_no="002",
+				has_serial_no=False,
+				serial_no=None,
+			),
+			frappe._dict(
+				name="Flask Item",
+				actual_qty=(-10),
+				qty_after_transaction=50,
+				warehouse="WH 1",
+				posting_date="2021-12-03",
+				voucher_type="Delivery Note",
+				voucher_no="003",
+				has_serial_no=False,
+				serial_no=None,
+			),
+		]
+
+		fifo_slots = FIFOSlots(self.filters, sle)
+		slots = fifo_slots.generate()
+
+		self.assertEqual(list(fifo_slots.transferred_item_details), [("003", "Flask Item", "WH 1")])
+		self.assertEqual(slots["Flask Item"]["fifo_queue"], [[50.0, "2021-12-01"]])
+
 
 def generate_item_and_item_wh_wise_slots(filters, sle):
 	"Return results with and without 'show_warehouse_wise_stock'"
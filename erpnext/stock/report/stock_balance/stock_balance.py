@@ -8,7 +8,7 @@ from typing import Any, TypedDict
 import frappe
 from frappe import _
 from frappe.query_builder import Order
-from frappe.query_builder.functions import Coalesce
+from frappe.query_builder.functions import Coalesce, Max
 from frappe.utils import add_days, cint, date_diff, flt, getdate
 from frappe.utils.nestedset import get_descendants_of
 
@@ -16,7 +16,7 @@ import erpnext
 from erpnext.stock.doctype.inventory_dimension.inventory_dimension import get_inventory_dimensions
 from erpnext.stock.doctype.warehouse.warehouse import apply_warehouse_filter
 from erpnext.stock.report.stock_ageing.stock_ageing import FIFOSlots, get_average_age
-from erpnext.stock.utils import add_additional_uom_columns
+from erpnext.stock.utils import add_additional_uom_columns, get_sle_chunks
 
 
 class StockBalanceFilter(TypedDict):
@@ -48,7 +48,7 @@ class StockBalanceReport:
 		self.start_from = None
 		self.data = []
 		self.columns = []
-		self.sle_entries: list[SLEntry] = []
+		self.fifo_slots = None
 		self.set_company_currency()
 
 	def set_company_currency(self) -> None:
@@ -76,6 +76,13 @@ class StockBalanceReport:
 		self.opening_data = frappe._dict({})
 
 		closing_balance = self.get_closing_balance()
+		snapshot_date = self.get_stock_balance_snapshot_date()
+		if snapshot_date and (
+			not closing_balance or getdate(snapshot_date) >= getdate(closing_balance[0].to_date)
+		):
+			self.prepare_opening_data_from_snapshot(snapshot_date)
+			return
+
 		if not closing_balance:
 			return
 
@@ -89,17 +96,63 @@ class StockBalanceReport:
 			if group_by_key not in self.opening_data:
 				self.opening_data.setdefault(group_by_key, entry)
 
+	def get_stock_balance_snapshot_date(self):
+		"""Latest Stock Balance Snapshot before the from date, if it can be used as opening balance."""
+		if (
+			self.filters.get("ignore_closing_balance")
+			or self.filters.get("show_stock_ageing_data")
+			or not self.filters.get("company")
+			or any(self.filters.get(fieldname) for fieldname in self.inventory_dimensions)
+			or not frappe.db.get_single_value(
+				"Stock Settings", "maintain_stock_balance_snapshots", cache=True
+			)
+		):
+			return
+
+		snapshot = frappe.qb.DocType("Stock Balance Snapshot")
+		snapshot_date = (
+			frappe.qb.from_(snapshot)
+			.select(Max(snapshot.posting_date))
+			.where((snapshot.company == self.filters.company) & (snapshot.posting_date < self.from_date))
+		).run()
+
+		return snapshot_date[0][0] if snapshot_date else None
+
+	def prepare_opening_data_from_snapshot(self, snapshot_date) -> None:
+		snapshot = frappe.qb.DocType("Stock Balance Snapshot")
+		item_table = frappe.qb.DocType("Item")
+
+		query = (
+			frappe.qb.from_(snapshot)
+			.inner_join(item_table)
+			.on(snapshot.item_code == item_table.name)
+			.select(
+				snapshot.company,
+				snapshot.item_code,
+				snapshot.warehouse,
+				snapshot.bal_qty,
+				snapshot.bal_val,
+				snapshot.val_rate,
+				item_table.item_group,
+				item_table.stock_uom,
+				item_table.item_name,
+			)
+			.where((snapshot.company == self.filters.company) & (snapshot.posting_date == snapshot_date))
+		)
+
+		query = self.apply_warehouse_filters(query, snapshot)
+		query = self.apply_items_filters(query, item_table)
+
+		self.start_from = add_days(snapshot_date, 1)
+		for entry in query.run(as_dict=True):
+			self.opening_data.setdefault(self.get_group_by_key(entry), entry)
+
 	def prepare_new_data(self):
 		self.item_warehouse_map = self.get_item_warehouse_map()
-
-		if self.filters.get("show_stock_ageing_data"):
-			self.filters["show_warehouse_wise_stock"] = True
-			item_wise_fifo_queue = FIFOSlots(self.filters, self.sle_entries).generate()
+		item_wise_fifo_queue = self.fifo_slots.get_slots() if self.fifo_slots else {}
 
 		_func = itemgetter(1)
 
-		del self.sle_entries
-
 		sre_details = self.get_sre_reserved_qty_details()
 
 		variant_values = {}
@@ -152,22 +205,24 @@ class StockBalanceReport:
 		item_warehouse_map = {}
 		self.opening_vouchers = self.get_opening_vouchers()
 
+		self.fifo_slots = None
 		if self.filters.get("show_stock_ageing_data"):
-			self.sle_entries = self.sle_query.run(as_dict=True)
-
-		# HACK: This is required to avoid causing db query in flt
-		_system_settings = frappe.get_cached_doc("System Settings")
-		with frappe.db.unbuffered_cursor():
-			if not self.filters.get("show_stock_ageing_data"):
-				self.sle_entries = self.sle_query.run(as_dict=True, as_iterator=True)
+			self.filters["show_warehouse_wise_stock"] = True
+			self.fifo_slots = FIFOSlots(self.filters)
+			self.fifo_slots.prepare_bundle_wise_serial_nos()
 
-			for entry in self.sle_entries:
+		# aggregate balances and ageing in a single pass over the ledger
+		for sle_entries in get_sle_chunks(self.sle_query):
+			for entry in sle_entries:
 				group_by_key = self.get_group_by_key(entry)
 				if group_by_key not in item_warehouse_map:
 					self.initialize_data(item_warehouse_map, group_by_key, entry)
 
 				self.prepare_item_warehouse_map(item_warehouse_map, entry, group_by_key)
 
+				if self.fifo_slots:
+					self.fifo_slots.add_entry(entry)
+
 				if self.opening_data.get(group_by_key):
 					del self.opening_data[group_by_key]
 
@@ -244,7 +299,7 @@ class StockBalanceReport:
 				"out_val": 0.0,
 				"bal_qty": opening_data.get("bal_qty") or 0.0,
 				"bal_val": opening_data.get("bal_val") or 0.0,
-				"val_rate": 0.0,
+				"val_rate": opening_data.get("val_rate") or 0.0,
 			}
 		)
 
@@ -2,7 +2,7 @@ from typing import Any
 
 import frappe
 from frappe import _dict
-from frappe.tests.utils import FrappeTestCase
+from frappe.tests.utils import FrappeTestCase, change_settings
 from frappe.utils import today
 
 from erpnext.stock.doctype.item.test_item import make_item
@@ -126,6 +126,34 @@ class TestStockBalance(FrappeTestCase):
 		self.assertInvariants(rows)
 		self.assertPartialDictEq({"opening_qty": 6, "in_qty": 0}, rows[0])
 
+	@change_settings("Stock Settings", {"maintain_stock_balance_snapshots": 1})
+	def test_opening_balance_from_snapshot(self):
+		from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+			make_stock_balance_snapshot,
+		)
+
+		self.generate_stock_ledger(
+			self.item.name,
+			[
+				_dict(qty=1, rate=1, posting_date="2021-01-01"),
+				_dict(qty=2, rate=2, posting_date="2021-01-02"),
+				_dict(qty=3, rate=3, posting_date="2021-01-03"),
+			],
+		)
+		make_stock_balance_snapshot("_Test Company", "2021-01-02")
+
+		filters = self.filters.update({"from_date": "2021-01-03"})
+		rows = stock_balance(filters)
+		self.assertInvariants(rows)
+		self.assertPartialDictEq({"opening_qty": 3, "opening_val": 5, "in_qty": 3}, rows[0])
+		self.assertEqual(rows, stock_balance(filters.copy().update({"ignore_closing_balance": 1})))
+
+		# backdated entry refreshes the snapshot
+		self.generate_stock_ledger(self.item.name, [_dict(qty=4, rate=4, posting_date="2021-01-01")])
+		rows = stock_balance(filters)
+		self.assertInvariants(rows)
+		self.assertPartialDictEq({"opening_qty": 7, "opening_val": 21, "in_qty": 3}, rows[0])
+
 	def test_uom_converted_info(self):
 		self.item.append("uoms", {"conversion_factor": 5, "uom": "Box"})
 		self.item.save()
@@ -6,6 +6,12 @@ from typing import Any, TypedDict
 import frappe
 from frappe import _
 from frappe.query_builder.functions import Sum
+from frappe.utils import add_days, flt, today
+
+from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+	get_latest_snapshot_date,
+	is_snapshot_enabled,
+)
 
 
 class StockBalanceFilter(TypedDict):
@@ -35,11 +41,34 @@ def get_warehouse_wise_balance(filters: StockBalanceFilter) -> list[SLEntry]:
 		.groupby(sle.warehouse)
 	)
 
+	snapshot_balance = frappe._dict()
 	if filters.get("company"):
 		query = query.where(sle.company == filters.get("company"))
 
-	data = query.run(as_list=True)
-	return frappe._dict(data) if data else frappe._dict()
+		if is_snapshot_enabled() and (
+			snapshot_date := get_latest_snapshot_date(filters.get("company"), add_days(today(), 1))
+		):
+			snapshot_balance = get_snapshot_balance(filters.get("company"), snapshot_date)
+			query = query.where(sle.posting_date > snapshot_date)
+
+	data = frappe._dict(query.run(as_list=True) or [])
+	for warehouse, stock_balance in snapshot_balance.items():
+		data[warehouse] = flt(data.get(warehouse)) + flt(stock_balance)
+
+	return data
+
+
+def get_snapshot_balance(company, snapshot_date):
+	snapshot = frappe.qb.DocType("Stock Balance Snapshot")
+
+	data = (
+		frappe.qb.from_(snapshot)
+		.select(snapshot.warehouse, Sum(snapshot.bal_val))
+		.where((snapshot.company == company) & (snapshot.posting_date == snapshot_date))
+		.groupby(snapshot.warehouse)
+	).run(as_list=True)
+
+	return frappe._dict(data)
 
 
 def get_warehouses(report_filters: StockBalanceFilter):
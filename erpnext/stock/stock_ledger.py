@@ -4,10 +4,12 @@
 import copy
 import gzip
 import json
+import time
 
 import frappe
 from frappe import _, bold, scrub
 from frappe.model.meta import get_field_precision
+from frappe.monitor import add_data_to_monitor
 from frappe.query_builder.functions import Sum
 from frappe.utils import (
 	add_to_date,
@@ -15,6 +17,7 @@ from frappe.utils import (
 	cstr,
 	flt,
 	format_date,
+	get_datetime,
 	get_link_to_form,
 	getdate,
 	now,
@@ -42,7 +45,18 @@ from erpnext.stock.utils import (
 	get_stock_balance,
 	get_valuation_method,
 )
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation, round_off_if_near_zero
+from erpnext.stock.valuation import (
+	FIFOValuation,
+	LIFOValuation,
+	dump_stock_queue,
+	round_off_if_near_zero,
+)
+
+# Number of future SLEs fetched and locked at a time while reposting
+DEFAULT_CHECKPOINT_INTERVAL = 1000
+
+# Bin lock waits of a voucher longer than this (in seconds) are logged
+BIN_LOCK_WAIT_LOG_THRESHOLD = 1
 
 
 class NegativeStockError(frappe.ValidationError):
@@ -65,8 +79,14 @@ def make_sl_entries(sl_entries, allow_negative_stock=False, via_landed_cost_vouc
 	                        stock)
 	"""
 	from erpnext.controllers.stock_controller import future_sle_exists
+	from erpnext.stock.doctype.stock_ageing_slot.stock_ageing_slot import update_stock_ageing_slots
+	from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+		update_stock_balance_snapshots,
+	)
 
 	if sl_entries:
+		lock_bins(sl_entries)
+
 		cancel = sl_entries[0].get("is_cancelled")
 		if cancel:
 			validate_cancellation(sl_entries)
@@ -75,6 +95,13 @@ def make_sl_entries(sl_entries, allow_negative_stock=False, via_landed_cost_vouc
 		args = get_args_for_future_sle(sl_entries[0])
 		future_sle_exists(args, sl_entries)
 
+		previous_sles = get_previous_sle_of_item_warehouses(sl_entries)
+		bins_to_update = {}
+
+		# snapshots and ageing slots are updated once all the entries of the voucher are posted,
+		# inward and outward entries of the same voucher consume each other
+		item_warehouses_to_update = {}
+
 		for sle in sl_entries:
 			if sle.serial_no and not via_landed_cost_voucher:
 				validate_serial_no(sle)
@@ -107,14 +134,126 @@ def make_sl_entries(sl_entries, allow_negative_stock=False, via_landed_cost_vouc
 			is_stock_item = frappe.get_cached_value("Item", args.get("item_code"), "is_stock_item")
 			if is_stock_item:
 				bin_name = get_or_make_bin(args.get("item_code"), args.get("warehouse"))
-				args.reserved_stock = flt(frappe.db.get_value("Bin", bin_name, "reserved_stock"))
+				if bin_name not in bins_to_update:
+					args.reserved_stock = flt(frappe.db.get_value("Bin", bin_name, "reserved_stock"))
+					# only the first entry of the item-warehouse can use the prefetched previous entry
+					args.previous_sle = previous_sles.get((args.item_code, args.warehouse))
+				else:
+					args.reserved_stock = bins_to_update[bin_name].reserved_stock
+
 				repost_current_voucher(args, allow_negative_stock, via_landed_cost_voucher)
-				update_bin_qty(bin_name, args)
+				add_to_bin_update(bins_to_update, bin_name, args)
+				item_warehouses_to_update[(args.item_code, args.warehouse)] = args.posting_datetime
 			else:
 				frappe.msgprint(
 					_("Item {0} ignored since it is not a stock item").format(args.get("item_code"))
 				)
 
+		# update every bin once, in the same order across transactions to avoid deadlocks
+		for bin_name in sorted(bins_to_update):
+			update_bin_qty(bin_name, bins_to_update[bin_name])
+
+		for (item_code, warehouse), posting_datetime in item_warehouses_to_update.items():
+			update_stock_balance_snapshots(item_code, warehouse, posting_datetime)
+			update_stock_ageing_slots(item_code, warehouse, posting_datetime, rebuild=cancel)
+
+
+def lock_bins(sl_entries):
+	"""Lock the Bins of all the entries in the order of Bin name, before any SLE is written or locked.
+
+	Reposting also locks the Bin of an item-warehouse before locking its future SLEs, so the Bin
+	lock of an item-warehouse is always taken before its SLE locks, including on cancel.
+	"""
+	bins = {}
+	for item_code, warehouse in sorted({(sle.item_code, sle.warehouse) for sle in sl_entries}):
+		if frappe.get_cached_value("Item", item_code, "is_stock_item"):
+			bins[get_or_make_bin(item_code, warehouse)] = (item_code, warehouse)
+
+	lock_waits = {}
+	for bin_name in sorted(bins):
+		start = time.monotonic()
+		frappe.db.get_value("Bin", bin_name, "name", for_update=True)
+		lock_waits[bins[bin_name]] = time.monotonic() - start
+
+	record_bin_lock_waits(sl_entries[0].voucher_type, sl_entries[0].voucher_no, lock_waits)
+
+
+def record_bin_lock_waits(voucher_type, voucher_no, lock_waits):
+	"""Add the lock wait of the voucher to the monitor log, and log the item-warehouses of slow waits."""
+	total_wait = sum(lock_waits.values())
+	add_data_to_monitor(bin_lock_wait=round(total_wait, 3))
+
+	if total_wait < BIN_LOCK_WAIT_LOG_THRESHOLD:
+		return
+
+	frappe.logger("stock").info(
+		{
+			"event": "bin_lock_wait",
+			"voucher_type": voucher_type,
+			"voucher_no": voucher_no,
+			"lock_wait": round(total_wait, 3),
+			"bins": [
+				{"item_code": item_code, "warehouse": warehouse, "lock_wait": round(wait, 3)}
+				for (item_code, warehouse), wait in lock_waits.items()
+				if wait >= 0.01
+			],
+		}
+	)
+
+
+def get_previous_sle_of_item_warehouses(sl_entries):
+	"""Previous SLE of every item-warehouse of the voucher, fetched in a single query.
+
+	Must be called before any entry of the voucher is posted. Returns an empty dict if the
+	entries are not posted at the same time, the previous SLEs are then fetched for each entry.
+	"""
+	if any(sle.get("creation_time") for sle in sl_entries):
+		return {}
+
+	posting_datetimes = {get_combine_datetime(sle.posting_date, sle.posting_time) for sle in sl_entries}
+	if len(posting_datetimes) != 1:
+		return {}
+
+	item_warehouses = {(sle.item_code, sle.warehouse) for sle in sl_entries}
+	conditions = " or ".join(["(item_code = %s and warehouse = %s)"] * len(item_warehouses))
+	values = [value for item_warehouse in item_warehouses for value in item_warehouse]
+
+	previous_sles = {item_warehouse: frappe._dict() for item_warehouse in item_warehouses}
+	for sle in frappe.db.sql(  # nosemgrep
+		f"""
+		select *, posting_datetime as "timestamp"
+		from `tabStock Ledger Entry`
+		where name in (
+			select name from (
+				select name, row_number() over (
+					partition by item_code, warehouse order by posting_datetime desc, creation desc
+				) as row_no
+				from `tabStock Ledger Entry`
+				where is_cancelled = 0
+					and posting_datetime <= %s
+					and ({conditions})
+			) latest_sle
+			where row_no = 1
+		)
+		for update""",
+		(posting_datetimes.pop(), *values),
+		as_dict=1,
+	):
+		previous_sles[(sle.item_code, sle.warehouse)] = sle
+
+	return previous_sles
+
+
+def add_to_bin_update(bins_to_update, bin_name, args):
+	"""Merge the qty changes of all the entries of a bin, so that the bin is updated once."""
+	if bin_name not in bins_to_update:
+		bins_to_update[bin_name] = args
+		return
+
+	bin_args = bins_to_update[bin_name]
+	for field in ("ordered_qty", "reserved_qty", "indented_qty", "planned_qty"):
+		bin_args[field] = flt(bin_args.get(field)) + flt(args.get(field))
+
 
 def repost_current_voucher(args, allow_negative_stock=False, via_landed_cost_voucher=False):
 	if args.get("actual_qty") or args.get("voucher_type") == "Stock Reconciliation":
@@ -135,6 +274,8 @@ def repost_current_voucher(args, allow_negative_stock=False, via_landed_cost_vou
 					"sle_id": args.get("name"),
 					"creation": args.get("creation"),
 					"reserved_stock": args.get("reserved_stock"),
+					"posting_datetime": args.get("posting_datetime"),
+					"previous_sle": args.get("previous_sle"),
 				},
 				allow_negative_stock=allow_negative_stock,
 				via_landed_cost_voucher=via_landed_cost_voucher,
@@ -271,6 +412,7 @@ def repost_future_sle(
 				"distinct_item_warehouses": distinct_item_warehouses,
 				"items_to_be_repost": args,
 				"current_index": i,
+				"repost_doc_name": doc.name if doc else None,
 			},
 			allow_negative_stock=allow_negative_stock,
 			via_landed_cost_voucher=via_landed_cost_voucher,
@@ -508,6 +650,16 @@ def get_current_index(doc=None):
 		return doc.current_index
 
 
+def get_valuation_snapshot(sle):
+	"""Valuation state stored on the SLE, used to detect when reposting has converged."""
+	return (
+		flt(sle.qty_after_transaction, 6),
+		flt(sle.stock_value, 6),
+		flt(sle.valuation_rate, 6),
+		json.loads(sle.stock_queue or "[]") if isinstance(sle.stock_queue, str) else sle.stock_queue,
+	)
+
+
 class update_entries_after:
 	"""
 	update valution rate and qty after transaction
@@ -589,7 +741,10 @@ class update_entries_after:
 		"""
 		self.data.setdefault(args.warehouse, frappe._dict())
 		warehouse_dict = self.data[args.warehouse]
-		previous_sle = get_previous_sle_of_current_voucher(args)
+		previous_sle = args.get("previous_sle")
+		if previous_sle is None:
+			previous_sle = get_previous_sle_of_current_voucher(args)
+
 		warehouse_dict.previous_sle = previous_sle
 
 		for key in ("qty_after_transaction", "valuation_rate", "stock_value"):
@@ -611,21 +766,108 @@ class update_entries_after:
 			if not future_sle_exists(self.args):
 				self.update_bin()
 		else:
-			entries_to_fix = self.get_future_entries_to_fix()
+			self.process_future_entries()
+
+		if self.exceptions:
+			self.raise_exceptions()
+
+	def process_future_entries(self):
+		"""Repost future entries of the item-warehouse in chunks of `checkpoint_interval` entries.
+
+		Each processed SLE already stores the running qty, value and queue, so it acts as a
+		valuation checkpoint. When `stop_reposting_on_convergence` is enabled, reposting stops as
+		soon as the recomputed values match the values stored on the SLE, since every later
+		entry would be recomputed to the values it already has.
+		"""
+		from erpnext.stock.doctype.stock_ageing_slot.stock_ageing_slot import (
+			update_stock_ageing_slots_after_repost,
+		)
+		from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+			update_stock_balance_snapshots,
+		)
+
+		settings = frappe.get_cached_doc("Stock Reposting Settings")
+		checkpoint_interval = cint(settings.reposting_checkpoint_interval) or DEFAULT_CHECKPOINT_INTERVAL
+		stop_on_convergence = cint(settings.stop_reposting_on_convergence)
+
+		# the Bin is locked before the SLEs of the item-warehouse, like in make_sl_entries
+		bin_name = get_or_make_bin(self.item_code, self.args.warehouse)
+		frappe.db.get_value("Bin", bin_name, "name", for_update=True)
 
-			i = 0
-			while i < len(entries_to_fix):
-				sle = entries_to_fix[i]
-				i += 1
+		processed, last_sle, converged = 0, None, False
+		while not converged:
+			entries_to_fix = self.get_future_entries_to_fix(limit=checkpoint_interval, after_sle=last_sle)
+
+			for sle in entries_to_fix:
+				stored_values = get_valuation_snapshot(sle)
 
 				self.process_sle(sle)
-				self.update_bin_data(sle)
+				processed += 1
+				last_sle = sle
 
 				if sle.dependant_sle_voucher_detail_no:
-					entries_to_fix = self.get_dependent_entries_to_fix(entries_to_fix, sle)
+					self.get_dependent_entries_to_fix(entries_to_fix, sle)
 
-		if self.exceptions:
-			self.raise_exceptions()
+				# an entry skipped for negative stock keeps its stored values without having converged
+				if stop_on_convergence and not self.exceptions and self.has_converged(stored_values, sle):
+					converged = True
+					break
+
+			if last_sle:
+				self.publish_checkpoint_progress(last_sle, processed, converged)
+
+			if len(entries_to_fix) < checkpoint_interval:
+				break
+
+		if converged:
+			# values of the remaining entries are unchanged, sync bin with the latest entry
+			last_sle = self.get_last_sle_of_warehouse() or last_sle
+
+		if last_sle:
+			self.update_bin_data(last_sle)
+			update_stock_balance_snapshots(self.item_code, self.args.warehouse, self.args.posting_date)
+			update_stock_ageing_slots_after_repost(
+				self.item_code, self.args.warehouse, self.args.posting_date
+			)
+
+	def has_converged(self, stored_values, sle) -> bool:
+		# entries at the reposting timestamp are the ones that changed, never stop on them
+		if get_datetime(sle.posting_datetime) <= get_combine_datetime(
+			self.args.posting_date, self.args.posting_time or "00:00:00"
+		):
+			return False
+
+		return stored_values == get_valuation_snapshot(sle)
+
+	def get_last_sle_of_warehouse(self):
+		sle = frappe.get_all(
+			"Stock Ledger Entry",
+			filters={"item_code": self.item_code, "warehouse": self.args.warehouse, "is_cancelled": 0},
+			fields=["item_code", "warehouse", "qty_after_transaction", "stock_value", "valuation_rate"],
+			order_by="posting_datetime desc, creation desc",
+			limit=1,
+		)
+
+		return sle[0] if sle else None
+
+	def publish_checkpoint_progress(self, sle, processed, converged):
+		if not self.args.repost_doc_name:
+			return
+
+		frappe.publish_realtime(
+			"item_reposting_checkpoint",
+			{
+				"name": self.args.repost_doc_name,
+				"item_code": self.item_code,
+				"warehouse": self.args.warehouse,
+				"processed_entries": processed,
+				"checkpoint": sle.name,
+				"posting_date": sle.posting_date,
+				"converged": converged,
+			},
+			doctype="Repost Item Valuation",
+			docname=self.args.repost_doc_name,
+		)
 
 	def process_sle_against_current_timestamp(self):
 		sl_entries = self.get_sle_against_current_voucher()
@@ -657,13 +899,13 @@ class update_entries_after:
 			as_dict=1,
 		)
 
-	def get_future_entries_to_fix(self):
+	def get_future_entries_to_fix(self, limit=None, after_sle=None):
 		# includes current entry!
 		args = self.data[self.args.warehouse].previous_sle or frappe._dict(
 			{"item_code": self.item_code, "warehouse": self.args.warehouse}
 		)
 
-		return list(self.get_sle_after_datetime(args))
+		return list(self.get_sle_after_datetime(args, limit=limit, after_sle=after_sle))
 
 	def get_dependent_entries_to_fix(self, entries_to_fix, sle):
 		dependant_sle = get_sle_by_voucher_detail_no(
@@ -864,7 +1106,7 @@ class update_entries_after:
 		sle.qty_after_transaction = self.wh_data.qty_after_transaction
 		sle.valuation_rate = self.wh_data.valuation_rate
 		sle.stock_value = self.wh_data.stock_value
-		sle.stock_queue = json.dumps(self.wh_data.stock_queue)
+		sle.stock_queue = dump_stock_queue(self.wh_data.stock_queue)
 
 		if not sle.is_adjustment_entry or not self.args.get("sle_id"):
 			sle.stock_value_difference = stock_value_difference
@@ -1332,11 +1574,7 @@ class update_entries_after:
 			self.wh_data.qty_after_transaction + actual_qty
 		)
 
-		if self.valuation_method == "LIFO":
-			stock_queue = LIFOValuation(self.wh_data.stock_queue)
-		else:
-			stock_queue = FIFOValuation(self.wh_data.stock_queue)
-
+		stock_queue = self.get_stock_queue()
 		_prev_qty, prev_stock_value = stock_queue.get_total_stock_and_value()
 
 		if actual_qty > 0:
@@ -1367,10 +1605,25 @@ class update_entries_after:
 			self.wh_data.stock_queue.append(
 				[0, sle.incoming_rate or sle.outgoing_rate or self.wh_data.valuation_rate]
 			)
+			self.wh_data.valuation_queue = None
+		else:
+			self.wh_data.valuation_queue = (stock_queue, self.wh_data.stock_queue)
 
 		if self.wh_data.qty_after_transaction:
 			self.wh_data.valuation_rate = self.wh_data.stock_value / self.wh_data.qty_after_transaction
 
+	def get_stock_queue(self):
+		"""Reuse the valuation queue of the previous entry unless the stock queue was reset since."""
+		if self.wh_data.get("valuation_queue"):
+			stock_queue, state = self.wh_data.valuation_queue
+			if state is self.wh_data.stock_queue:
+				return stock_queue
+
+		if self.valuation_method == "LIFO":
+			return LIFOValuation(self.wh_data.stock_queue)
+
+		return FIFOValuation(self.wh_data.stock_queue)
+
 	def update_batched_values(self, sle):
 		from erpnext.stock.serial_batch_bundle import BatchNoValuation
 
@@ -1441,9 +1694,26 @@ class update_entries_after:
 		sle = sle[0] if sle else frappe._dict()
 		return sle
 
-	def get_sle_after_datetime(self, args):
-		"""get Stock Ledger Entries after a particular datetime, for reposting"""
-		return get_stock_ledger_entries(args, ">", "asc", for_update=True, check_serial_no=False)
+	def get_sle_after_datetime(self, args, limit=None, after_sle=None):
+		"""get Stock Ledger Entries after a particular datetime, for reposting
+
+		Entries are fetched in pages of `limit` entries, a page starts after the last entry of the
+		previous page (`after_sle`) by posting datetime and creation.
+		"""
+		extra_cond = None
+		if after_sle:
+			args = frappe._dict(
+				args,
+				after_posting_datetime=after_sle.posting_datetime,
+				after_creation=after_sle.creation,
+			)
+			extra_cond = """ and (posting_datetime > %(after_posting_datetime)s
+				or (posting_datetime = %(after_posting_datetime)s and creation > %(after_creation)s))"""
+
+		limit = f"limit {cint(limit)}" if limit else None
+		return get_stock_ledger_entries(
+			args, ">", "asc", limit, for_update=True, check_serial_no=False, extra_cond=extra_cond
+		)
 
 	def raise_exceptions(self):
 		msg_list = []
@@ -2,7 +2,7 @@ import frappe
 from frappe.test_runner import make_test_records
 from frappe.tests.utils import FrappeTestCase
 
-from erpnext.stock.get_item_details import get_item_details
+from erpnext.stock.get_item_details import get_item_details, get_item_details_batch
 
 test_ignore = ["BOM"]
 test_dependencies = ["Customer", "Supplier", "Item", "Price List", "Item Price"]
@@ -34,3 +34,42 @@ class TestGetItemDetail(FrappeTestCase):
 		)
 		details = get_item_details(args)
 		self.assertEqual(details.get("price_list_rate"), 100)
+
+	def test_get_item_details_batch(self):
+		args_list = [
+			frappe._dict(
+				{
+					"item_code": item_code,
+					"company": "_Test Company",
+					"conversion_rate": 1.0,
+					"price_list_currency": "USD",
+					"plc_conversion_rate": 1.0,
+					"doctype": "Purchase Order",
+					"name": None,
+					"supplier": "_Test Supplier",
+					"transaction_date": None,
+					"price_list": "_Test Buying Price List",
+					"warehouse": "_Test Warehouse - _TC",
+					"is_subcontracted": 0,
+					"ignore_pricing_rule": 1,
+					"qty": 1,
+				}
+			)
+			for item_code in ["_Test Item", "_Test Item 2", "_Test Item"]
+		]
+
+		expected = [get_item_details(args.copy()) for args in args_list]
+		details = get_item_details_batch([args.copy() for args in args_list])
+
+		self.assertEqual(len(details), 3)
+		for row, expected_row in zip(details, expected, strict=True):
+			for fieldname in (
+				"item_code",
+				"price_list_rate",
+				"conversion_factor",
+				"actual_qty",
+				"projected_qty",
+			):
+				self.assertEqual(row.get(fieldname), expected_row.get(fieldname))
+
+		self.assertFalse(frappe.flags.item_details_prefetch)
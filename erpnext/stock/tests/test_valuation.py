@@ -8,7 +8,12 @@ from hypothesis import strategies as st
 
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation, round_off_if_near_zero
+from erpnext.stock.valuation import (
+	FIFOValuation,
+	LIFOValuation,
+	dump_stock_queue,
+	round_off_if_near_zero,
+)
 
 qty_gen = st.floats(min_value=-1e6, max_value=1e6)
 value_gen = st.floats(min_value=1, max_value=1e6)
@@ -124,6 +129,22 @@ class TestFIFOValuation(unittest.TestCase):
 		self.queue.add_stock(5, 17)
 		self.queue.add_stock(8, 11)
 
+	def test_totals_on_large_queue(self):
+		self.queue = FIFOValuation([[1, rate] for rate in range(1, 10001)])
+		self.assertEqual(self.queue.get_total_stock_and_value(), (10000, 50005000))
+
+		for _ in range(5000):
+			self.queue.remove_stock(1)
+			self.queue.add_stock(1, 10)
+
+		self.assertEqual(len(self.queue.state), 5001)
+		self.assertEqual(self.queue.get_total_stock_and_value(), (10000, 37552500))
+
+	def test_compact_stock_queue(self):
+		self.queue.add_stock(1, 10)
+		self.queue.add_stock(2, 20)
+		self.assertEqual(dump_stock_queue(self.queue.state), "[[1,10],[2,20]]")
+
 	@given(stock_queue_generator)
 	def test_fifo_qty_hypothesis(self, stock_queue):
 		self.queue = FIFOValuation([])
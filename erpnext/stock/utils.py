@@ -3,6 +3,8 @@
 
 
 import json
+from collections.abc import Iterator
+from itertools import islice
 
 import frappe
 from frappe import _
@@ -19,6 +21,8 @@ from erpnext.stock.valuation import FIFOValuation, LIFOValuation
 
 BarcodeScanResult = dict[str, str | None]
 
+SLE_CHUNK_SIZE = 10000
+
 
 class InvalidWarehouseCompany(frappe.ValidationError):
 	pass
@@ -521,6 +525,21 @@ def add_additional_uom_columns(columns, result, include_uom, conversion_factors)
 		result[row_idx] = row
 
 
+def get_sle_chunks(query, chunk_size: int = SLE_CHUNK_SIZE) -> Iterator[list[dict]]:
+	"""Stream the rows of a Stock Ledger Entry query in chunks using an unbuffered (server side) cursor.
+
+	Rows are not loaded in memory upfront, so reports should aggregate every chunk as it arrives.
+	No other query can be run on the connection until all the chunks are consumed.
+	"""
+	# HACK: This is required to avoid causing db query in flt
+	frappe.get_cached_doc("System Settings")
+
+	with frappe.db.unbuffered_cursor():
+		rows = query.run(as_dict=True, as_iterator=True)
+		while chunk := list(islice(rows, chunk_size)):
+			yield chunk
+
+
 def get_incoming_outgoing_rate_for_cancel(item_code, voucher_type, voucher_no, voucher_detail_no):
 	outgoing_rate = frappe.db.sql(
 		"""SELECT CASE WHEN actual_qty = 0 THEN 0 ELSE abs(stock_value_difference / actual_qty) END
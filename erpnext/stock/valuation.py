@@ -1,4 +1,6 @@
+import json
 from abc import ABC, abstractmethod, abstractproperty
+from collections import deque
 from collections.abc import Callable
 from typing import NewType
 
@@ -26,26 +28,39 @@ class BinWiseValuation(ABC):
 	def state(self) -> list[StockBin]:
 		pass
 
-	def get_total_stock_and_value(self) -> tuple[float, float]:
-		total_qty = 0.0
-		total_value = 0.0
+	def set_totals(self) -> None:
+		"""Compute running totals from bins, called once when the queue is loaded."""
+		self.total_qty = 0.0
+		self.total_value = 0.0
+
+		for stock_bin in self.state:
+			self.add_to_totals(stock_bin)
+
+	def add_to_totals(self, stock_bin: StockBin) -> None:
+		self.total_qty += flt(stock_bin[QTY])
+		self.total_value += flt(stock_bin[QTY]) * flt(stock_bin[RATE])
 
-		for qty, rate in self.state:
-			total_qty += flt(qty)
-			total_value += flt(qty) * flt(rate)
+	def remove_from_totals(self, stock_bin: StockBin) -> None:
+		self.total_qty -= flt(stock_bin[QTY])
+		self.total_value -= flt(stock_bin[QTY]) * flt(stock_bin[RATE])
 
-		return round_off_if_near_zero(total_qty), round_off_if_near_zero(total_value)
+		if not len(self):
+			# avoid carrying floating point residue once queue is exhausted
+			self.total_qty = self.total_value = 0.0
+
+	def get_total_stock_and_value(self) -> tuple[float, float]:
+		return round_off_if_near_zero(self.total_qty), round_off_if_near_zero(self.total_value)
 
 	def __repr__(self):
-		return str(self.state)
+		return str(list(self.state))
 
 	def __iter__(self):
 		return iter(self.state)
 
 	def __eq__(self, other):
 		if isinstance(other, list):
-			return self.state == other
-		return type(self) == type(other) and self.state == other.state
+			return list(self.state) == other
+		return type(self) == type(other) and list(self.state) == list(other.state)
 
 
 class FIFOValuation(BinWiseValuation):
@@ -55,22 +70,31 @@ class FIFOValuation(BinWiseValuation):
 	Qty consumption happens on First In First Out basis.
 
 	Queue is implemented using "bins" of [qty, rate].
+	Implementation detail: bins are kept in a deque so that consumption
+	from the front is O(1), totals are maintained as bins change.
 
 	ref: https://en.wikipedia.org/wiki/FIFO_and_LIFO_accounting
 	"""
 
 	# specifying the attributes to save resources
 	# ref: https://docs.python.org/3/reference/datamodel.html#slots
-	__slots__ = ["queue"]
+	__slots__ = ["queue", "total_qty", "total_value"]
 
 	def __init__(self, state: list[StockBin] | None):
-		self.queue: list[StockBin] = state if state is not None else []
+		self.queue: deque[StockBin] = deque(state if state is not None else [])
+		self.set_totals()
 
 	@property
-	def state(self) -> list[StockBin]:
-		"""Get current state of queue."""
+	def state(self) -> deque[StockBin]:
+		"""Get current state of queue, the live deque which is copied only when serialized."""
 		return self.queue
 
+	def __iter__(self):
+		return iter(self.queue)
+
+	def __len__(self):
+		return len(self.queue)
+
 	def add_stock(self, qty: float, rate: float) -> None:
 		"""Update fifo queue with new stock.
 
@@ -83,17 +107,22 @@ class FIFOValuation(BinWiseValuation):
 
 		# last row has the same rate, merge new bin.
 		if self.queue[-1][RATE] == rate:
+			self.remove_from_totals(self.queue[-1])
 			self.queue[-1][QTY] += qty
+			self.add_to_totals(self.queue[-1])
 		else:
 			# Item has a positive balance qty, add new entry
 			if self.queue[-1][QTY] > 0:
 				self.queue.append([qty, rate])
+				self.add_to_totals(self.queue[-1])
 			else:  # negative balance qty
+				self.remove_from_totals(self.queue[-1])
 				qty = self.queue[-1][QTY] + qty
 				if qty > 0:  # new balance qty is positive
 					self.queue[-1] = [qty, rate]
 				else:  # new balance qty is still negative, maintain same rate
 					self.queue[-1][QTY] = qty
+				self.add_to_totals(self.queue[-1])
 
 	def remove_stock(
 		self, qty: float, outgoing_rate: float = 0.0, rate_generator: Callable[[], float] | None = None
@@ -133,18 +162,26 @@ class FIFOValuation(BinWiseValuation):
 			if qty >= fifo_bin[QTY]:
 				# consume current bin
 				qty = round_off_if_near_zero(qty - fifo_bin[QTY])
-				to_consume = self.queue.pop(index)
+				if index:
+					to_consume = self.queue[index]
+					del self.queue[index]
+				else:
+					to_consume = self.queue.popleft()
+				self.remove_from_totals(to_consume)
 				consumed_bins.append(list(to_consume))
 
 				if not self.queue and qty:
 					# stock finished, qty still remains to be withdrawn
 					# negative stock, keep in as a negative bin
 					self.queue.append([-qty, outgoing_rate or fifo_bin[RATE]])
+					self.add_to_totals(self.queue[-1])
 					consumed_bins.append([qty, outgoing_rate or fifo_bin[RATE]])
 					break
 			else:
 				# qty found in current bin consume it and exit
+				self.remove_from_totals(fifo_bin)
 				fifo_bin[QTY] = round_off_if_near_zero(fifo_bin[QTY] - qty)
+				self.add_to_totals(fifo_bin)
 				consumed_bins.append([qty, fifo_bin[RATE]])
 				qty = 0
 
@@ -165,16 +202,20 @@ class LIFOValuation(BinWiseValuation):
 
 	# specifying the attributes to save resources
 	# ref: https://docs.python.org/3/reference/datamodel.html#slots
-	__slots__ = ["stack"]
+	__slots__ = ["stack", "total_qty", "total_value"]
 
 	def __init__(self, state: list[StockBin] | None):
 		self.stack: list[StockBin] = state if state is not None else []
+		self.set_totals()
 
 	@property
 	def state(self) -> list[StockBin]:
 		"""Get current state of stack."""
 		return self.stack
 
+	def __len__(self):
+		return len(self.stack)
+
 	def add_stock(self, qty: float, rate: float) -> None:
 		"""Update lifo stack with new stock.
 
@@ -189,17 +230,22 @@ class LIFOValuation(BinWiseValuation):
 
 		# last row has the same rate, merge new bin.
 		if self.stack[-1][RATE] == rate:
+			self.remove_from_totals(self.stack[-1])
 			self.stack[-1][QTY] += qty
+			self.add_to_totals(self.stack[-1])
 		else:
 			# Item has a positive balance qty, add new entry
 			if self.stack[-1][QTY] > 0:
 				self.stack.append([qty, rate])
+				self.add_to_totals(self.stack[-1])
 			else:  # negative balance qty
+				self.remove_from_totals(self.stack[-1])
 				qty = self.stack[-1][QTY] + qty
 				if qty > 0:  # new balance qty is positive
 					self.stack[-1] = [qty, rate]
 				else:  # new balance qty is still negative, maintain same rate
 					self.stack[-1][QTY] = qty
+				self.add_to_totals(self.stack[-1])
 
 	def remove_stock(
 		self, qty: float, outgoing_rate: float = 0.0, rate_generator: Callable[[], float] | None = None
@@ -228,17 +274,21 @@ class LIFOValuation(BinWiseValuation):
 				# consume current bin
 				qty = round_off_if_near_zero(qty - stock_bin[QTY])
 				to_consume = self.stack.pop(index)
+				self.remove_from_totals(to_consume)
 				consumed_bins.append(list(to_consume))
 
 				if not self.stack and qty:
 					# stock finished, qty still remains to be withdrawn
 					# negative stock, keep in as a negative bin
 					self.stack.append([-qty, outgoing_rate or stock_bin[RATE]])
+					self.add_to_totals(self.stack[-1])
 					consumed_bins.append([qty, outgoing_rate or stock_bin[RATE]])
 					break
 			else:
 				# qty found in current bin consume it and exit
+				self.remove_from_totals(stock_bin)
 				stock_bin[QTY] = round_off_if_near_zero(stock_bin[QTY] - qty)
+				self.add_to_totals(stock_bin)
 				consumed_bins.append([qty, stock_bin[RATE]])
 				qty = 0
 
@@ -253,3 +303,8 @@ def round_off_if_near_zero(number: float, precision: int = 7) -> float:
 		return 0.0
 
 	return flt(number)
+
+
+def dump_stock_queue(stock_queue: list[StockBin] | deque[StockBin]) -> str:
+	"""Serialise stock queue for `stock_queue` field of SLE without whitespace."""
+	return json.dumps(list(stock_queue), separators=(",", ":"))